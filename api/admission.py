@@ -0,0 +1,215 @@
+"""
+Admission control for API routes
+
+Routes are split into a heavy pool (wide scans, batches) and a light pool
+(point lookups), each with its own concurrency limit and bounded wait queue,
+so a burst of snapshot requests cannot starve /pricing/current. A request
+that finds its queue full, or waits longer than queue_timeout_s, is refused
+with 503 and Retry-After before it touches SQL Server. Each pool also owns a
+thread pool of the same size that runs its handlers' blocking pyodbc calls,
+so a slow heavy query holds a heavy worker, not the event loop or the
+threads light lookups run on.
+
+Date-range endpoints also pass an estimated cost guard: days in the window
+times the (sku, region, channel) keys it can match. Requests over the budget
+are rejected, or with oversize: downgrade narrowed to the most recent days
+that fit.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Iterable, Optional, Tuple
+
+DEFAULTS = {
+    'enabled': True,
+    'heavy': {'concurrency': 4, 'queue_size': 32, 'queue_timeout_s': 2.0, 'retry_after_s': 2},
+    'light': {'concurrency': 32, 'queue_size': 256, 'queue_timeout_s': 0.5, 'retry_after_s': 1},
+    'heavy_routes': [
+        '/pricing/history', '/pricing/bi-snapshot', '/pricing/margin-snapshot', '/pricing/overrides',
+        '/pricing/as-of/batch', '/pricing/net-price/batch', '/pricing/rules/evaluate',
+    ],
+    # Everything else under these prefixes is light; other routes are not gated
+    'light_prefixes': ['/pricing/'],
+    # Cost guard for date-range reads, in key-days
+    'max_range_cost': 3660,
+    # Keys assumed for each of region_code / channel_code left unset
+    'unscoped_fanout': 5,
+    # reject | downgrade
+    'oversize': 'reject',
+}
+
+class Overloaded(Exception):
+    """No slot within the queue limits; send 503 with Retry-After"""
+
+    def __init__(self, message: str, retry_after_s: int):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+class CostExceeded(ValueError):
+    """Estimated cost is over max_range_cost and oversize is reject"""
+
+def get_admission_settings(config: dict) -> dict:
+    """api.admission merged over DEFAULTS (pool sections merged key by key)"""
+    configured = ((config.get('api') or {}).get('admission')) or {}
+    settings = dict(DEFAULTS)
+    settings.update(configured)
+    for pool in ('heavy', 'light'):
+        settings[pool] = dict(DEFAULTS[pool], **(configured.get(pool) or {}))
+    return settings
+
+class AdmissionPool:
+    """Concurrency limit with a bounded, time-limited wait queue"""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout_s: float, retry_after_s: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+        self._slots = asyncio.Semaphore(concurrency)
+        # One worker per slot: an admitted request never waits for a thread
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'admission-{name}')
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_wait_ms = 0.0
+        self.total_wait_ms = 0.0
+
+    async def acquire(self):
+        if not self._slots.locked():
+            await self._slots.acquire()
+        else:
+            if self.waiting >= self.queue_size:
+                self.rejected_queue_full += 1
+                raise Overloaded(f"{self.name} pool queue is full ({self.queue_size} waiting)", self.retry_after_s)
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                raise Overloaded(f"{self.name} pool: no slot within {self.queue_timeout_s}s", self.retry_after_s)
+            finally:
+                self.waiting -= 1
+            waited_ms = (time.perf_counter() - started) * 1000
+            self.queued += 1
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+        self.admitted += 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the body of the with-block; raises Overloaded instead of entering"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(self, fn, *args):
+        """fn(*args) on this pool's worker threads"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def stats(self) -> dict:
+        return {
+            'concurrency': self.concurrency,
+            'queue_size': self.queue_size,
+            'queue_timeout_s': self.queue_timeout_s,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected_queue_full': self.rejected_queue_full,
+            'rejected_timeout': self.rejected_timeout,
+            'avg_wait_ms': round(self.total_wait_ms / self.queued, 1) if self.queued else 0.0,
+            'max_wait_ms': round(self.max_wait_ms, 1),
+        }
+
+class AdmissionController:
+    """Maps request paths to pools and applies the range cost guard"""
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+        self.enabled = bool(settings['enabled'])
+        self.pools = {
+            name: AdmissionPool(
+                name,
+                int(settings[name]['concurrency']),
+                int(settings[name]['queue_size']),
+                float(settings[name]['queue_timeout_s']),
+                int(settings[name]['retry_after_s']),
+            )
+            for name in ('heavy', 'light')
+        }
+        self.heavy_routes = set(settings['heavy_routes'])
+        self.light_prefixes = tuple(settings['light_prefixes'])
+        self.max_range_cost = int(settings['max_range_cost'])
+        self.unscoped_fanout = int(settings['unscoped_fanout'])
+        self.oversize = str(settings['oversize']).lower()
+        self.cost_rejected = 0
+        self.cost_downgraded = 0
+
+    def pool_for(self, path: str) -> Optional[AdmissionPool]:
+        if not self.enabled:
+            return None
+        if path in self.heavy_routes:
+            return self.pools['heavy']
+        if path.startswith(self.light_prefixes):
+            return self.pools['light']
+        return None
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.executor.shutdown(wait=False)
+
+    def range_cost(self, from_day: date, to_day: date, scoped: Iterable[Optional[str]]) -> int:
+        """Days in [from_day, to_day] times the keys the unset scope parts can match"""
+        days = max((to_day - from_day).days + 1, 0)
+        fanout = 1
+        for part in scoped:
+            if part is None:
+                fanout *= self.unscoped_fanout
+        return days * fanout
+
+    def guard_range(self, from_day: date, to_day: date, scoped: Iterable[Optional[str]]) -> Tuple[date, bool]:
+        """
+        (from_day to use, downgraded) for a date-range read; CostExceeded when the
+        estimate is over max_range_cost and oversize is reject
+        """
+        scoped = list(scoped)
+        cost = self.range_cost(from_day, to_day, scoped)
+        if not self.enabled or cost <= self.max_range_cost:
+            return from_day, False
+        fanout = self.range_cost(to_day, to_day, scoped)
+        max_days = self.max_range_cost // fanout
+        if self.oversize != 'downgrade' or max_days < 1:
+            self.cost_rejected += 1
+            raise CostExceeded(
+                f"Request too expensive: estimated cost {cost} key-days exceeds {self.max_range_cost}. "
+                f"Narrow the date range (at most {max_days} days) or set region_code/channel_code"
+            )
+        self.cost_downgraded += 1
+        return to_day - timedelta(days=max_days - 1), True
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'pools': {name: pool.stats() for name, pool in self.pools.items()},
+            'cost_guard': {
+                'max_range_cost': self.max_range_cost,
+                'oversize': self.oversize,
+                'rejected': self.cost_rejected,
+                'downgraded': self.cost_downgraded,
+            },
+        }
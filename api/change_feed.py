@@ -0,0 +1,290 @@
+"""
+Change feed over pricing.etl_change_log
+
+Each sp_refresh_pricing_mart run logs the fact_price_history and
+fact_discount_events rows it inserted or end-dated (OUTPUT clauses). Consumers
+read them with /pricing/changes?since_run_id= and then follow next_cursor,
+which encodes the run they started from and the last change_id they were
+given. The cursor stays valid across later runs, so a consumer can store it
+and resume with only what changed since.
+
+ChangeWatcher pushes the same information as server-sent events: one shared
+poll of etl_run_history per process, however many clients are subscribed,
+and one event per new SUCCESS run listing the (sku, region, channel) keys it
+changed, filtered per subscriber.
+"""
+
+import asyncio
+import base64
+import binascii
+import time
+from collections import deque
+from typing import Callable, List, Optional, Set, Tuple
+
+from fast_json import dumps
+
+CHANGES_QUERY = "EXEC pricing.sp_get_price_changes ?, ?, ?"
+
+LATEST_RUN_QUERY = """
+    SELECT MAX(run_id) AS latest_run_id
+    FROM pricing.etl_run_history
+    WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+"""
+
+NEW_RUNS_QUERY = """
+    SELECT run_id, finished_at, rows_loaded, rows_rejected
+    FROM pricing.etl_run_history
+    WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS' AND run_id > ?
+    ORDER BY run_id
+"""
+
+STREAM_DEFAULTS = {
+    # One etl_run_history poll per interval per process, only while someone is subscribed
+    'poll_interval_s': 2.0,
+    # SSE comment sent when idle so proxies keep the connection open
+    'heartbeat_s': 15.0,
+    # Events buffered per subscriber; a client that falls further behind is disconnected
+    'queue_size': 64,
+    'max_subscribers': 10000,
+    # Keys listed per event; beyond this the event is marked truncated (page /pricing/changes)
+    'max_keys_per_event': 5000,
+    # Recent run events kept for clients reconnecting with Last-Event-ID
+    'replay_runs': 16,
+    'page_size': 10000,
+}
+
+KEEPALIVE = b": keepalive\n\n"
+OVERFLOW = (b"event: overflow\ndata: {\"detail\":\"Subscriber fell behind; reconnect with Last-Event-ID "
+            b"or page /pricing/changes\"}\n\n")
+
+def encode_cursor(since_run_id: int, after_change_id: Optional[int]) -> str:
+    """Opaque, URL-safe cursor for (since_run_id, last change_id returned)"""
+    raw = f"{since_run_id}:{'' if after_change_id is None else after_change_id}"
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[int, Optional[int]]:
+    """(since_run_id, after_change_id) from encode_cursor output; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"malformed cursor: {cursor!r}")
+    since, _, after = raw.partition(':')
+    if not since.isdigit() or (after and not after.isdigit()):
+        raise ValueError(f"malformed cursor: {cursor!r}")
+    return int(since), int(after) if after else None
+
+def parse_filter(value: Optional[str]) -> Optional[Set[str]]:
+    """Comma-separated filter values, or None for no filter"""
+    if value is None:
+        return None
+    items = {item.strip() for item in value.split(',') if item.strip()}
+    return items or None
+
+def sse_event(event: str, event_id: int, payload: dict) -> bytes:
+    """One server-sent event; the JSON body is a single line"""
+    return b"event: %s\nid: %d\ndata: %s\n\n" % (event.encode('ascii'), event_id, dumps(payload))
+
+class TooManySubscribers(Exception):
+    """max_subscribers reached"""
+
+class Subscription:
+    """One SSE client: its filters and a bounded queue of encoded events"""
+
+    def __init__(self, skus: Optional[Set[str]], regions: Optional[Set[str]], channels: Optional[Set[str]],
+                 queue_size: int):
+        self.skus = skus
+        self.regions = regions
+        self.channels = channels
+        self.unfiltered = skus is None and regions is None and channels is None
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def matches(self, key: dict) -> bool:
+        return ((self.skus is None or key['sku'] in self.skus)
+                and (self.regions is None or key['region_code'] in self.regions)
+                and (self.channels is None or key['channel_code'] in self.channels))
+
+    def offer(self, chunk: bytes) -> bool:
+        """Queue chunk without waiting; False (and overflowed) when the client is too far behind"""
+        try:
+            self.queue.put_nowait(chunk)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+    async def next_chunk(self, timeout: float) -> Optional[bytes]:
+        """Next event, KEEPALIVE after timeout idle seconds, or None once overflowed and drained"""
+        if self.overflowed and self.queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return KEEPALIVE
+
+class ChangeWatcher:
+    """Shared etl_run_history poller that fans run events out to subscriptions"""
+
+    def __init__(self, settings: dict, fetch_rows: Callable, fetch_all: Callable):
+        self.settings = settings
+        self.poll_interval_s = float(settings['poll_interval_s'])
+        self.heartbeat_s = float(settings['heartbeat_s'])
+        self.queue_size = int(settings['queue_size'])
+        self.max_subscribers = int(settings['max_subscribers'])
+        self.max_keys_per_event = int(settings['max_keys_per_event'])
+        self.page_size = int(settings['page_size'])
+        self.fetch_rows = fetch_rows
+        self.fetch_all = fetch_all
+        self.subscribers = set()
+        self.recent = deque(maxlen=int(settings['replay_runs']))
+        self.last_run_id = None
+        self._task = None
+        self.polls = 0
+        self.poll_errors = 0
+        self.last_error = None
+        self.last_poll_at = None
+        self.runs_published = 0
+        self.events_queued = 0
+        self.overflows = 0
+
+    def subscribe(self, skus: Optional[Set[str]] = None, regions: Optional[Set[str]] = None,
+                  channels: Optional[Set[str]] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """New subscription; with last_event_id, buffered runs after it are replayed first"""
+        if len(self.subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f"{self.max_subscribers} subscribers already connected")
+        sub = Subscription(skus, regions, channels, self.queue_size)
+        if last_event_id is not None:
+            for event in self.recent:
+                if event['run_id'] > last_event_id:
+                    self._deliver(sub, event)
+        self.subscribers.add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self.subscribers.discard(sub)
+
+    async def _run(self):
+        while True:
+            if self.subscribers:
+                try:
+                    await self.poll()
+                except Exception as e:
+                    self.poll_errors += 1
+                    self.last_error = str(e)
+            await asyncio.sleep(self.poll_interval_s)
+
+    async def poll(self):
+        """Check for new SUCCESS runs and publish one event per run"""
+        loop = asyncio.get_running_loop()
+        self.polls += 1
+        self.last_poll_at = time.time()
+        latest = (await loop.run_in_executor(None, self.fetch_all, LATEST_RUN_QUERY, None))[0]['latest_run_id']
+        if latest is None:
+            return
+        if self.last_run_id is None:
+            # First poll sets the baseline: only runs that finish from now on are pushed
+            self.last_run_id = latest
+            return
+        if latest <= self.last_run_id:
+            return
+        events = await loop.run_in_executor(None, self._load_events, self.last_run_id)
+        for event in events:
+            self._publish(event)
+            self.last_run_id = event['run_id']
+
+    def _load_events(self, since_run_id: int) -> List[dict]:
+        """Events for SUCCESS runs after since_run_id, with their changed keys from etl_change_log"""
+        runs = self.fetch_all(NEW_RUNS_QUERY, (since_run_id,))
+        if not runs:
+            return []
+        through_run_id = runs[-1]['run_id']
+        keys_by_run = {run['run_id']: {} for run in runs}
+        after_change_id = None
+        while True:
+            columns, rows = self.fetch_rows(CHANGES_QUERY, (since_run_id, after_change_id, self.page_size))
+            col = {name: i for i, name in enumerate(columns)}
+            for row in rows:
+                run_id = row[col['run_id']]
+                if run_id > through_run_id:
+                    # Committed after the run list was read; picked up by the next poll
+                    break
+                counts = keys_by_run[run_id].setdefault(
+                    (row[col['sku']], row[col['region_code']], row[col['channel_code']]), [0, 0])
+                counts[0 if row[col['entity']] == 'price' else 1] += 1
+            else:
+                if len(rows) == self.page_size:
+                    after_change_id = rows[-1][col['change_id']]
+                    continue
+            break
+
+        events = []
+        previous_run_id = since_run_id
+        for run in runs:
+            keys = [
+                {'sku': sku, 'region_code': region, 'channel_code': channel,
+                 'price_changes': counts[0], 'discount_changes': counts[1]}
+                for (sku, region, channel), counts in sorted(keys_by_run[run['run_id']].items())
+            ]
+            events.append({
+                'run_id': run['run_id'],
+                'finished_at': run['finished_at'],
+                'rows_loaded': run['rows_loaded'],
+                'rows_rejected': run['rows_rejected'],
+                'keys': keys,
+                # /pricing/changes cursor for this run's full change rows
+                'changes_cursor': encode_cursor(previous_run_id, None),
+            })
+            previous_run_id = run['run_id']
+        return events
+
+    def _encode(self, event: dict, keys: List[dict]) -> bytes:
+        payload = {name: value for name, value in event.items() if name != 'keys'}
+        payload['key_count'] = len(keys)
+        payload['change_count'] = sum(k['price_changes'] + k['discount_changes'] for k in keys)
+        payload['truncated'] = len(keys) > self.max_keys_per_event
+        payload['keys'] = keys[:self.max_keys_per_event]
+        return sse_event('price_changes', event['run_id'], payload)
+
+    def _deliver(self, sub: Subscription, event: dict, shared: Optional[bytes] = None) -> Optional[bytes]:
+        """Queue event for sub (filtered copy, or the shared unfiltered encoding); returns the shared encoding"""
+        if sub.unfiltered:
+            shared = shared or self._encode(event, event['keys'])
+            chunk = shared
+        else:
+            keys = [key for key in event['keys'] if sub.matches(key)]
+            if not keys:
+                return shared
+            chunk = self._encode(event, keys)
+        if sub.offer(chunk):
+            self.events_queued += 1
+        return shared
+
+    def _publish(self, event: dict):
+        self.recent.append(event)
+        self.runs_published += 1
+        # Unfiltered subscribers all get the same bytes, encoded once
+        shared = None
+        for sub in list(self.subscribers):
+            shared = self._deliver(sub, event, shared)
+            if sub.overflowed:
+                self.overflows += 1
+                self.subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self.subscribers),
+            'unfiltered_subscribers': sum(1 for sub in self.subscribers if sub.unfiltered),
+            'watching': self._task is not None and not self._task.done(),
+            'last_run_id': self.last_run_id,
+            'poll_interval_s': self.poll_interval_s,
+            'polls': self.polls,
+            'poll_errors': self.poll_errors,
+            'last_error': self.last_error,
+            'last_poll_at': self.last_poll_at,
+            'runs_published': self.runs_published,
+            'events_queued': self.events_queued,
+            'overflows': self.overflows,
+            'replay_buffer': [event['run_id'] for event in self.recent],
+        }
@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+A dashboard opening in many browsers sends the same /pricing/bi-snapshot
+request dozens of times within milliseconds. The first request for a key
+runs the query in a worker thread; requests for the same key that arrive
+while it is in flight await that execution and share its result. The key is
+dropped as soon as the execution finishes, so nothing is cached: a request
+that arrives afterwards runs a fresh query.
+
+Results are shared between callers, so they must be treated as read-only.
+Coalescing is per process (per uvicorn worker).
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+def query_key(query: str, params: Optional[Tuple]) -> Tuple[str, Tuple]:
+    """Whitespace-normalized SQL plus its parameters"""
+    return ' '.join(query.split()), tuple(params or ())
+
+class SingleFlight:
+    """Shares one in-flight execution per key between concurrent awaiters"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.executions = Counter()
+        self.coalesced = Counter()
+        self.errors = Counter()
+
+    async def run(self, label: str, key: Hashable, fn: Callable, *args, executor: Optional[Executor] = None) -> Any:
+        """fn(*args) in a worker thread of executor (default: the loop's), or the result of the identical call already running"""
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            with self._lock:
+                self.executions[label] += 1
+            return await loop.run_in_executor(executor, fn, *args)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced[label] += 1
+            else:
+                future = loop.run_in_executor(executor, fn, *args)
+                self._inflight[key] = future
+                self.executions[label] += 1
+                future.add_done_callback(lambda done: self._finished(label, key, done))
+        # shield: a caller that disconnects must not cancel the query for the others
+        return await asyncio.shield(future)
+
+    def _finished(self, label: str, key: Hashable, future: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if not future.cancelled() and future.exception() is not None:
+                self.errors[label] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            labels = sorted(set(self.executions) | set(self.coalesced))
+            per_label = {
+                label: {
+                    'executions': self.executions[label],
+                    'coalesced': self.coalesced[label],
+                    'errors': self.errors[label],
+                }
+                for label in labels
+            }
+            in_flight = len(self._inflight)
+        executions = sum(v['executions'] for v in per_label.values())
+        coalesced = sum(v['coalesced'] for v in per_label.values())
+        return {
+            'enabled': self.enabled,
+            'in_flight': in_flight,
+            'executions': executions,
+            'coalesced': coalesced,
+            # Share of requests that did not need their own query
+            'coalesced_ratio': round(coalesced / (executions + coalesced), 4) if executions + coalesced else 0.0,
+            'routes': per_label,
+        }
@@ -1,103 +1,161 @@
 """
 Database connection and query helpers
+Reads go through the read-replica router (replica.py) when api.read_replica is enabled
+fetch_all can return dicts, a shared-header tuple list or columns (pricing_db.results);
+stream_rows yields rows lazily for reads too large to hold
 """
 
-import pyodbc
-import yaml
+import json
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Optional, Any
-
-def load_config(config_path='../etl/config.yaml'):
-    """Load database configuration from ETL config file"""
-    config_file = Path(__file__).parent.parent / 'etl' / 'config.yaml'
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
-
-def get_connection_string(config):
-    """Build SQL Server connection string"""
-    db = config['database']
-    driver = db['driver']
-    server = db['server']
-    port = db['port']
-    database = db['database']
-    username = db['username']
-    password = db['password']
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server},{port};"
-        f"DATABASE={database};"
-        f"UID={username};"
-        f"PWD={password};"
-        f"TrustServerCertificate=yes;"
-    )
+from typing import Callable, Iterator, List, Tuple, Optional, Any
+
+import pyodbc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect, connection, timed_execute, shape_result, iter_cursor
+from pricing_db.results import FETCH_BATCH
+from replica import ReplicaRouter, get_read_replica_settings
+
+router = ReplicaRouter(load_config(), get_read_replica_settings(load_config()))
 
 def get_conn():
     """Create and return a new database connection"""
-    config = load_config()
-    conn_str = get_connection_string(config)
-    return pyodbc.connect(conn_str, autocommit=True)
+    return connect(load_config(), autocommit=True)
+
+def _routed(read: Callable, query: str, params: Optional[Tuple]):
+    """Run read(config, query, params) on the replica when it is fresh, else on the primary"""
+    config, route = router.choose()
+    if route == 'replica':
+        try:
+            result = read(config, query, params)
+            router.record(route)
+            return result
+        except pyodbc.Error as e:
+            router.replica_failed(e)
+            route = 'primary_fallback'
+    router.record(route)
+    return read(router.primary_config, query, params)
+
+def _fetch_rows(config: dict, query: str, params: Optional[Tuple]) -> Tuple[List[str], List[Any]]:
+    with connection(config) as conn:
+        cursor = conn.cursor()
+        try:
+            timed_execute(cursor, query, params)
 
-def fetch_all(query: str, params: Optional[Tuple] = None) -> List[dict]:
+            # Skip DECLARE results if present (no result set)
+            while cursor.description is None:
+                if not cursor.nextset():
+                    break
+
+            # Get column names from first result set with data
+            columns = [column[0] for column in cursor.description] if cursor.description else []
+
+            rows = cursor.fetchall() if columns else []
+            return columns, rows
+        finally:
+            cursor.close()
+
+def _fetch_one(config: dict, query: str, params: Optional[Tuple]) -> Optional[dict]:
+    with connection(config) as conn:
+        cursor = conn.cursor()
+        try:
+            timed_execute(cursor, query, params)
+
+            # Get column names
+            columns = [column[0] for column in cursor.description] if cursor.description else []
+
+            # Fetch one row and convert to dict
+            row = cursor.fetchone() if columns else None
+            if row:
+                return dict(zip(columns, row))
+            return None
+        finally:
+            cursor.close()
+
+def fetch_rows(query: str, params: Optional[Tuple] = None) -> Tuple[List[str], List[Any]]:
+    """
+    Execute query and return (column names, rows) with rows as cursor tuples
+    Cheaper than fetch_all when the caller serializes the tuples directly (fast_json)
+    Supports multi-statement queries (e.g., DECLARE variable; SELECT ...)
+    """
+    return _routed(_fetch_rows, query, params)
+
+def fetch_all(query: str, params: Optional[Tuple] = None, shape: str = 'dicts') -> Any:
     """
     Execute query and return all rows as list of dictionaries
+    shape='tuples' returns Rows(columns, rows) and shape='columns' a {column: array} dict
+    (NumPy arrays for numeric/date columns when installed) - both skip the per-row dict
     Uses parameterized queries for safety
     Supports multi-statement queries (e.g., DECLARE variable; SELECT ...)
     """
-    conn = None
-    cursor = None
-    try:
-        conn = get_conn()
+    columns, rows = fetch_rows(query, params)
+    return shape_result(columns, rows, shape)
+
+@contextmanager
+def _stream(config: dict, query: str, params: Optional[Tuple], batch_size: int):
+    with connection(config) as conn:
         cursor = conn.cursor()
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        # Skip DECLARE results if present (no result set)
-        while cursor.description is None:
-            if not cursor.nextset():
-                break
-        
-        # Get column names from first result set with data
-        columns = [column[0] for column in cursor.description] if cursor.description else []
-        
-        # Fetch all rows and convert to dict
-        rows = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in rows]
-    finally:
-        if cursor:
+        try:
+            timed_execute(cursor, query, params)
+
+            # Skip DECLARE results if present (no result set)
+            while cursor.description is None:
+                if not cursor.nextset():
+                    break
+
+            columns = [column[0] for column in cursor.description] if cursor.description else []
+            yield columns, (iter_cursor(cursor, batch_size) if columns else iter(()))
+        finally:
             cursor.close()
-        if conn:
-            conn.close()
+
+@contextmanager
+def stream_rows(query: str, params: Optional[Tuple] = None,
+                batch_size: int = FETCH_BATCH) -> Iterator[Tuple[List[str], Iterator[tuple]]]:
+    """
+    Execute query and yield (column names, lazy row iterator) for the with-block
+    Rows are fetched batch_size at a time, so memory stays flat however many there are;
+    the pooled connection is held until the block exits
+    """
+    config, route = router.choose()
+    if route == 'replica':
+        opened = False
+        try:
+            with _stream(config, query, params, batch_size) as result:
+                opened = True
+                router.record(route)
+                yield result
+            return
+        except pyodbc.Error as e:
+            # Only a replica that failed before any row was handed out can fall back
+            if opened:
+                raise
+            router.replica_failed(e)
+            route = 'primary_fallback'
+    router.record(route)
+    with _stream(router.primary_config, query, params, batch_size) as result:
+        yield result
 
 def fetch_one(query: str, params: Optional[Tuple] = None) -> Optional[dict]:
     """
     Execute query and return first row as dictionary, or None if no rows
     Uses parameterized queries for safety
     """
-    conn = None
-    cursor = None
-    try:
-        conn = get_conn()
-        cursor = conn.cursor()
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        # Get column names
-        columns = [column[0] for column in cursor.description] if cursor.description else []
-        
-        # Fetch one row and convert to dict
-        row = cursor.fetchone()
-        if row:
-            return dict(zip(columns, row))
-        return None
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    return _routed(_fetch_one, query, params)
+
+def fetch_batch(query: str, items: List[tuple]) -> List[Optional[dict]]:
+    """
+    Run a set-based batch procedure in one round trip: items go in as one JSON
+    array parameter, and each result row carries the item_index it answers.
+    Returns one dict (or None) per item, in item order.
+    """
+    columns, rows = fetch_rows(query, (json.dumps(items, default=str),))
+    position = columns.index('item_index')
+    results = [None] * len(items)
+    for row in rows:
+        record = dict(zip(columns, row))
+        del record['item_index']
+        results[row[position]] = record
+    return results
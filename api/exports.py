@@ -0,0 +1,81 @@
+"""
+Serving BI snapshot export files (etl/export_snapshots.py)
+
+Files are streamed straight from a read-only memory map in 1 MiB slices, so
+the page cache is shared between concurrent downloads and no file is ever
+read fully into Python. Single byte ranges (Range: bytes=...) are honoured,
+which lets Parquet/Arrow readers fetch just the footer and the row groups
+or record batches they need.
+"""
+
+import mmap
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CHUNK_SIZE = 1 << 20
+
+MEDIA_TYPES = {
+    '.parquet': 'application/vnd.apache.parquet',
+    '.arrow': 'application/vnd.apache.arrow.file',
+    '.json': 'application/json',
+}
+
+class RangeNotSatisfiable(ValueError):
+    """Range header lies outside the file"""
+
+def export_root(config: dict) -> Path:
+    """Export directory from config (export.output_dir, relative to the repo root)"""
+    root = Path((config.get('export') or {}).get('output_dir') or 'exports/bi_snapshot')
+    return root if root.is_absolute() else REPO_ROOT / root
+
+def resolve_export_file(root: Path, relative: str) -> Path:
+    """Path of a file under root; FileNotFoundError for anything outside it"""
+    root = root.resolve()
+    path = (root / relative).resolve()
+    if root not in path.parents or not path.is_file():
+        raise FileNotFoundError(relative)
+    return path
+
+def file_etag(path: Path) -> str:
+    stat = path.stat()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single 'bytes=' range, or None to send the
+    whole file (no header, other units, multiple ranges or a malformed value)
+    """
+    if not header or size == 0:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of path from a read-only memory map"""
+    if end < start:
+        return
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos <= end:
+                stop = min(pos + CHUNK_SIZE, end + 1)
+                yield mm[pos:stop]
+                pos = stop
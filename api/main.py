@@ -2,17 +2,142 @@
 FastAPI service for pricing data warehouse
 """
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import Optional, List
-from datetime import datetime
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import datetime, date, timezone
 import json
 from pathlib import Path
 
-from db import fetch_one, fetch_all
+from db import fetch_one, fetch_all, fetch_rows, fetch_batch, load_config, router
+from coalesce import SingleFlight, query_key
+from change_feed import (CHANGES_QUERY, LATEST_RUN_QUERY, STREAM_DEFAULTS, OVERFLOW, ChangeWatcher,
+                         TooManySubscribers, encode_cursor, decode_cursor, parse_filter)
+from admission import AdmissionController, CostExceeded, Overloaded, get_admission_settings
+from fast_json import DEFAULT_SETTINGS as RESPONSE_DEFAULTS, encode_body, shape_rows, shape_records
+from price_index import PriceAsOfIndexManager
+from rule_engine import RuleEngineManager
+from exports import (export_root, resolve_export_file, file_etag, parse_range, iter_file_range,
+                     RangeNotSatisfiable, MEDIA_TYPES)
 
 app = FastAPI(title="Pricing Command Center API", version="1.0.0")
 
+AS_OF_SETTINGS = {'enabled': True, 'check_interval_s': 30, 'max_batch': 100000, 'fallback_max_batch': 5000}
+AS_OF_SETTINGS.update(((load_config().get('api') or {}).get('as_of_index')) or {})
+
+as_of_index = PriceAsOfIndexManager(float(AS_OF_SETTINGS['check_interval_s']))
+
+PRICE_STORE_SETTINGS = {'enabled': False, 'check_interval_s': 30}
+PRICE_STORE_SETTINGS.update(((load_config().get('api') or {}).get('price_store')) or {})
+
+RULE_ENGINE_SETTINGS = {'check_interval_s': 30, 'max_batch': 100000}
+RULE_ENGINE_SETTINGS.update(((load_config().get('api') or {}).get('rule_engine')) or {})
+
+rule_engine = RuleEngineManager(float(RULE_ENGINE_SETTINGS['check_interval_s']))
+
+RESPONSE_SETTINGS = dict(RESPONSE_DEFAULTS)
+RESPONSE_SETTINGS.update(((load_config().get('api') or {}).get('responses')) or {})
+
+COALESCING_SETTINGS = {'enabled': True}
+COALESCING_SETTINGS.update(((load_config().get('api') or {}).get('coalescing')) or {})
+
+single_flight = SingleFlight(bool(COALESCING_SETTINGS['enabled']))
+
+async def coalesced_rows(request: Request, label: str, query: str, params: tuple):
+    """fetch_rows on the request's pool threads, shared with identical requests already in flight"""
+    pool = getattr(request.state, 'admission_pool', None)
+    return await single_flight.run(label, query_key(query, params), fetch_rows, query, params,
+                                   executor=pool.executor if pool is not None else None)
+
+admission = AdmissionController(get_admission_settings(load_config()))
+
+CHANGE_STREAM_SETTINGS = dict(STREAM_DEFAULTS)
+CHANGE_STREAM_SETTINGS.update(((load_config().get('api') or {}).get('change_stream')) or {})
+
+change_watcher = ChangeWatcher(CHANGE_STREAM_SETTINGS, fetch_rows, fetch_all)
+
+async def run_blocking(request: Request, fn, *args):
+    """
+    fn(*args) in a worker thread: pyodbc calls and index builds must not block the event loop
+    Gated routes run on their admission pool's threads, others on Starlette's threadpool
+    """
+    pool = getattr(request.state, 'admission_pool', None)
+    if pool is not None:
+        return await pool.run(fn, *args)
+    return await run_in_threadpool(fn, *args)
+
+def batch_limit(items: list, served_in_memory: bool):
+    """413 when a batch is over max_batch, or over fallback_max_batch when SQL Server answers it"""
+    limit = AS_OF_SETTINGS['max_batch'] if served_in_memory else AS_OF_SETTINGS['fallback_max_batch']
+    if len(items) > limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {limit})"
+        )
+
+def fast_response(payload, request: Request, extra_headers: Optional[dict] = None):
+    """JSON body via fast_json, compressed per Accept-Encoding above the size threshold"""
+    body, headers = encode_body(payload, request.headers.get('accept-encoding'), RESPONSE_SETTINGS)
+    headers.update(extra_headers or {})
+    return Response(content=body, media_type='application/json', headers=headers)
+
+def admit_range(from_day: date, to_day: date, region_code: Optional[str], channel_code: Optional[str]):
+    """Range cost guard: (from_day to use, extra response headers); 400 when over budget"""
+    try:
+        guarded_from, downgraded = admission.guard_range(from_day, to_day, (region_code, channel_code))
+    except CostExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if downgraded:
+        return guarded_from, {'X-Admission-Downgraded': f'from_date={guarded_from.isoformat()}'}
+    return guarded_from, {}
+
+store_manager = None
+if PRICE_STORE_SETTINGS['enabled']:
+    # numpy is only needed when the store is switched on
+    from price_store import PriceStoreManager
+    store_manager = PriceStoreManager(float(PRICE_STORE_SETTINGS['check_interval_s']))
+
+def parse_utc_datetime(value: str) -> datetime:
+    """ISO 8601 date or datetime as naive UTC (offsets are converted); ValueError if malformed"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Hold a heavy or light pool slot for the request; 503 + Retry-After when none is free in time"""
+    pool = admission.pool_for(request.url.path)
+    if pool is None:
+        return await call_next(request)
+    try:
+        await pool.acquire()
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Server busy: {e}"},
+            headers={"Retry-After": str(e.retry_after_s)}
+        )
+    request.state.admission_pool = pool
+    try:
+        return await call_next(request)
+    finally:
+        pool.release()
+
+@app.on_event("startup")
+def load_price_store():
+    """Load the in-memory price store before serving requests; the as-of index builds in the background"""
+    if store_manager is not None:
+        store_manager.get()
+    elif AS_OF_SETTINGS['enabled']:
+        as_of_index.start()
+
+@app.on_event("shutdown")
+def stop_admission_pools():
+    admission.shutdown()
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
@@ -20,17 +145,23 @@ async def health():
 
 @app.get("/pricing/current")
 async def get_current_price(
+    request: Request,
     sku: str = Query(..., description="Product SKU"),
     region_code: str = Query(..., description="Region code"),
     channel_code: str = Query(..., description="Channel code")
 ):
     """
     Get current price for a product in a region/channel
-    Calls stored procedure: pricing.sp_get_current_price
+    Calls stored procedure: pricing.sp_get_current_price (or the in-memory price store)
     """
-    try:
+    def resolve():
+        if store_manager is not None:
+            return store_manager.get().current(sku, region_code, channel_code)
         query = "EXEC pricing.sp_get_current_price ?, ?, ?"
-        result = fetch_one(query, (sku, region_code, channel_code))
+        return fetch_one(query, (sku, region_code, channel_code))
+    
+    try:
+        result = await run_blocking(request, resolve)
         
         if not result:
             raise HTTPException(
@@ -45,38 +176,370 @@ async def get_current_price(
 
 @app.get("/pricing/history")
 async def get_price_history(
+    request: Request,
     sku: str = Query(..., description="Product SKU"),
     from_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
     to_date: str = Query(..., description="End date (YYYY-MM-DD)"),
     region_code: Optional[str] = Query(None, description="Region code (optional)"),
-    channel_code: Optional[str] = Query(None, description="Channel code (optional)")
+    channel_code: Optional[str] = Query(None, description="Channel code (optional)"),
+    shape: Literal['rows', 'columns'] = Query('rows', description="rows (list of objects) or columns (one array per column)")
 ):
     """
     Get price history for a product over a date range
-    Calls stored procedure: pricing.sp_get_price_history
+    Calls stored procedure: pricing.sp_get_price_history (or the in-memory price store)
     """
     # Validate date formats
     try:
-        datetime.strptime(from_date, '%Y-%m-%d')
-        datetime.strptime(to_date, '%Y-%m-%d')
+        from_day = datetime.strptime(from_date, '%Y-%m-%d').date()
+        to_day = datetime.strptime(to_date, '%Y-%m-%d').date()
     except ValueError:
         raise HTTPException(
             status_code=400,
             detail="Invalid date format. Use YYYY-MM-DD format for from_date and to_date"
         )
+    from_day, admission_headers = admit_range(from_day, to_day, region_code, channel_code)
     
     try:
+        if store_manager is not None:
+            records = await run_blocking(request, lambda: store_manager.get().history(sku, from_day, to_day, region_code, channel_code))
+            return fast_response(shape_records(records, shape), request, admission_headers)
+        
         # Call stored procedure with NULLs for optional params
         query = "EXEC pricing.sp_get_price_history ?, ?, ?, ?, ?"
-        params = (sku, from_date, to_date, region_code, channel_code)
-        results = fetch_all(query, params)
+        params = (sku, from_day, to_day, region_code, channel_code)
+        columns, rows = await coalesced_rows(request, 'history', query, params)
         
-        return results
+        return fast_response(shape_rows(columns, rows, shape), request, admission_headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@app.get("/pricing/as-of")
+async def get_price_as_of(
+    request: Request,
+    sku: str = Query(..., description="Product SKU"),
+    region_code: str = Query(..., description="Region code"),
+    channel_code: str = Query(..., description="Channel code"),
+    as_of_date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    system_time: Optional[str] = Query(None, description="Answer as the table stood at this UTC time (ISO 8601); temporal audit mode only")
+):
+    """
+    Get the price in effect for a product in a region/channel on a date
+    Served from the price store or interval index, or pricing.sp_get_price_as_of when both are disabled
+    With system_time, calls pricing.sp_get_price_as_of_system_time (FOR SYSTEM_TIME AS OF)
+    """
+    try:
+        as_of = datetime.strptime(as_of_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use YYYY-MM-DD format for as_of_date"
+        )
+    if system_time is not None:
+        try:
+            recorded_at = parse_utc_datetime(system_time)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid datetime format. Use ISO 8601 (YYYY-MM-DDTHH:MM:SS) for system_time"
+            )
+    
+    def resolve():
+        if system_time is not None:
+            query = "EXEC pricing.sp_get_price_as_of_system_time ?, ?, ?, ?, ?"
+            return fetch_one(query, (sku, region_code, channel_code, as_of, recorded_at))
+        if store_manager is not None:
+            return store_manager.get().as_of(sku, region_code, channel_code, as_of)
+        index = as_of_index.get() if AS_OF_SETTINGS['enabled'] else None
+        if index is not None:
+            return index.lookup(sku, region_code, channel_code, as_of)
+        # Index disabled, or its first build has not finished
+        query = "EXEC pricing.sp_get_price_as_of ?, ?, ?, ?"
+        return fetch_one(query, (sku, region_code, channel_code, as_of))
+    
+    try:
+        result = await run_blocking(request, resolve)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No price in effect for SKU={sku}, region={region_code}, channel={channel_code} on {as_of_date}"
+        )
+    return result
+
+class AsOfItem(BaseModel):
+    sku: str
+    region_code: str
+    channel_code: str
+    as_of_date: date
+
+class AsOfBatchRequest(BaseModel):
+    items: List[AsOfItem]
+
+@app.post("/pricing/as-of/batch")
+async def get_prices_as_of_batch(request: AsOfBatchRequest, http_request: Request):
+    """
+    Resolve many (sku, region, channel, date) pairs in one call
+    Results are in request order; pairs with no price in effect return null
+    """
+    # The index is built in the background; until it is ready SQL Server answers
+    index = as_of_index.get() if AS_OF_SETTINGS['enabled'] else None
+    batch_limit(request.items, store_manager is not None or index is not None)
+    items = [(i.sku, i.region_code, i.channel_code, i.as_of_date) for i in request.items]
+    
+    def resolve():
+        if store_manager is not None:
+            store = store_manager.get()
+            return {"index_run_id": store.run_id, "results": store.as_of_many(items)}
+        if index is not None:
+            return {"index_run_id": index.run_id, "results": index.lookup_many(items)}
+        # One set-based call for the whole batch
+        return {"index_run_id": None, "results": fetch_batch("EXEC pricing.sp_get_price_as_of_batch ?", items)}
+    
+    try:
+        return fast_response(await run_blocking(http_request, resolve), http_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/pricing/net-price")
+async def get_net_price(
+    request: Request,
+    sku: str = Query(..., description="Product SKU"),
+    region_code: str = Query(..., description="Region code"),
+    channel_code: str = Query(..., description="Channel code"),
+    as_of_date: str = Query(..., description="Date (YYYY-MM-DD)")
+):
+    """
+    Get the list price in effect on a date plus the winning discount and net price
+    Served from the price store, or pricing.sp_get_net_price when the store is disabled
+    """
+    try:
+        as_of = datetime.strptime(as_of_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use YYYY-MM-DD format for as_of_date"
+        )
+    
+    def resolve():
+        if store_manager is not None:
+            return store_manager.get().net_price(sku, region_code, channel_code, as_of)
+        query = "EXEC pricing.sp_get_net_price ?, ?, ?, ?"
+        return fetch_one(query, (sku, region_code, channel_code, as_of))
+    
+    try:
+        result = await run_blocking(request, resolve)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No price in effect for SKU={sku}, region={region_code}, channel={channel_code} on {as_of_date}"
+        )
+    return result
+
+@app.post("/pricing/net-price/batch")
+async def get_net_prices_batch(request: AsOfBatchRequest, http_request: Request):
+    """
+    Resolve net prices for many (sku, region, channel, date) pairs in one call
+    Results are in request order; pairs with no price in effect return null
+    """
+    batch_limit(request.items, store_manager is not None)
+    items = [(i.sku, i.region_code, i.channel_code, i.as_of_date) for i in request.items]
+    
+    def resolve():
+        if store_manager is not None:
+            store = store_manager.get()
+            return {"index_run_id": store.run_id, "results": store.net_price_many(items)}
+        # One set-based call for the whole batch
+        return {"index_run_id": None, "results": fetch_batch("EXEC pricing.sp_get_net_price_batch ?", items)}
+    
+    try:
+        return fast_response(await run_blocking(http_request, resolve), http_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/pricing/rules/evaluate")
+async def evaluate_pricing_rules(request: AsOfBatchRequest, http_request: Request):
+    """
+    Active dim_pricing_rule rows applying to each (sku, region, channel, date) pair
+    Results are in request order; each lists its rules highest priority first
+    """
+    if len(request.items) > RULE_ENGINE_SETTINGS['max_batch']:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (max {RULE_ENGINE_SETTINGS['max_batch']})"
+        )
+    
+    items = [(i.sku, i.region_code, i.channel_code, i.as_of_date) for i in request.items]
+    
+    def resolve():
+        compiled = rule_engine.get()
+        return {"rules": compiled.stats(), "results": compiled.evaluate_many(items)}
+    
+    try:
+        return fast_response(await run_blocking(http_request, resolve), http_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/pricing/overrides")
+async def get_price_overrides(
+    request: Request,
+    sku: str = Query(..., description="Product SKU"),
+    from_time: str = Query(..., description="Window start, UTC (YYYY-MM-DD or ISO 8601 datetime)"),
+    to_time: Optional[str] = Query(None, description="Window end (exclusive), UTC; defaults to now"),
+    region_code: Optional[str] = Query(None, description="Region code (optional)"),
+    channel_code: Optional[str] = Query(None, description="Channel code (optional)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of rows to return"),
+    shape: Literal['rows', 'columns'] = Query('rows', description="rows (list of objects) or columns (one array per column)")
+):
+    """
+    Manual price changes for a SKU in a time window, newest first
+    Calls stored procedure: pricing.sp_get_price_overrides (trigger audit table or temporal versions)
+    """
+    try:
+        window_start = parse_utc_datetime(from_time)
+        window_end = parse_utc_datetime(to_time) if to_time else datetime.now(timezone.utc).replace(tzinfo=None)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid datetime format. Use YYYY-MM-DD or ISO 8601 (YYYY-MM-DDTHH:MM:SS) for from_time and to_time"
+        )
+    guarded_from, admission_headers = admit_range(window_start.date(), window_end.date(), region_code, channel_code)
+    if admission_headers:
+        window_start = datetime.combine(guarded_from, datetime.min.time())
+    
+    try:
+        query = "EXEC pricing.sp_get_price_overrides ?, ?, ?, ?, ?, ?"
+        columns, rows = await run_blocking(request, fetch_rows, query, (sku, window_start, window_end, region_code, channel_code, limit))
+        return fast_response(shape_rows(columns, rows, shape), request, admission_headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/pricing/changes")
+async def get_price_changes(
+    request: Request,
+    since_run_id: Optional[int] = Query(None, ge=0, description="Return changes from ETL runs after this run_id"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page (replaces since_run_id)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changes to return")
+):
+    """
+    Price and discount rows inserted or end-dated by ETL runs after since_run_id, oldest first
+    Calls stored procedure: pricing.sp_get_price_changes (reads pricing.etl_change_log)
+    """
+    if cursor is not None:
+        try:
+            since_run_id, after_change_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor. Pass next_cursor from a previous response unchanged")
+    elif since_run_id is not None:
+        after_change_id = None
+    else:
+        raise HTTPException(status_code=400, detail="Either since_run_id or cursor is required")
+    
+    def read_page():
+        # One extra row tells us whether another page follows
+        columns, rows = fetch_rows(CHANGES_QUERY, (since_run_id, after_change_id, limit + 1))
+        return columns, rows, fetch_one(LATEST_RUN_QUERY)
+    
+    try:
+        columns, rows, latest = await run_blocking(request, read_page)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            after_change_id = rows[-1][columns.index('change_id')]
+        
+        return fast_response({
+            "since_run_id": since_run_id,
+            "latest_run_id": latest['latest_run_id'] if latest else None,
+            "count": len(rows),
+            "has_more": has_more,
+            # Store this and pass it back as cursor=, now or after later runs
+            "next_cursor": encode_cursor(since_run_id, after_change_id),
+            "changes": shape_rows(columns, rows, 'rows'),
+        }, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/pricing/changes/stream")
+async def stream_price_changes(
+    request: Request,
+    sku: Optional[str] = Query(None, description="Only keys for these SKUs (comma-separated)"),
+    region_code: Optional[str] = Query(None, description="Only keys in these regions (comma-separated)"),
+    channel_code: Optional[str] = Query(None, description="Only keys in these channels (comma-separated)")
+):
+    """
+    Server-sent events: one price_changes event per new SUCCESS ETL run with the keys it changed
+    All subscribers share one etl_run_history poll; reconnecting with Last-Event-ID replays recent runs
+    """
+    last_event_id = request.headers.get('last-event-id')
+    try:
+        subscription = change_watcher.subscribe(
+            parse_filter(sku), parse_filter(region_code), parse_filter(channel_code),
+            int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        )
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {e}", headers={"Retry-After": "30"})
+    
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                chunk = await subscription.next_chunk(change_watcher.heartbeat_s)
+                if chunk is None:
+                    yield OVERFLOW
+                    break
+                yield chunk
+        finally:
+            change_watcher.unsubscribe(subscription)
+    
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.get("/pricing/changes/stream/stats")
+async def get_change_stream_stats():
+    """
+    Change stream watcher: subscribers, polls, runs published, events queued and overflows
+    """
+    return change_watcher.stats()
+
+@app.get("/pricing/store/stats")
+async def get_price_store_stats(request: Request):
+    """
+    Row counts, column memory and last refresh of the in-memory price store
+    """
+    if store_manager is None:
+        raise HTTPException(status_code=404, detail="Price store is disabled (api.price_store.enabled)")
+    try:
+        return await run_blocking(request, lambda: store_manager.get().stats())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/db/routing")
+async def get_db_routing():
+    """
+    Read-replica routing state: freshness by latest SUCCESS run_id on each side,
+    staleness and how many reads went to the replica or the primary (and why)
+    """
+    return router.stats()
+
+@app.get("/db/coalescing")
+async def get_db_coalescing():
+    """
+    Single-flight counters: queries executed vs requests that shared an in-flight execution
+    """
+    return single_flight.stats()
+
+@app.get("/admission/stats")
+async def get_admission_stats():
+    """
+    Admission pools (in flight, waiting, admitted, rejected, queue wait) and range cost guard counters
+    """
+    return admission.stats()
+
 @app.get("/etl/runs")
-async def get_etl_runs():
+def get_etl_runs():
     """
     Get last 50 ETL runs for pricing_refresh pipeline
     """
@@ -102,18 +565,20 @@ async def get_etl_runs():
 
 @app.get("/pricing/bi-snapshot")
 async def get_bi_snapshot(
+    request: Request,
     as_of_date: str = Query(..., description="Date (YYYY-MM-DD)"),
     region_code: str = Query(..., description="Region code"),
     channel_code: str = Query(..., description="Channel code"),
-    limit: int = Query(100, ge=1, le=500, description="Maximum number of rows to return")
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of rows to return"),
+    shape: Literal['rows', 'columns'] = Query('rows', description="rows (list of objects) or columns (one array per column)")
 ):
     """
-    Get BI snapshot from pricing.vw_pricing_bi_dataset for a specific date/region/channel
-    Returns top products by daily_net_sales
+    Get BI snapshot from pricing.fn_pricing_bi_dataset for a specific date/region/channel
+    Returns top products by daily_net_sales; any date in dim_calendar, not just the last 60 days
     """
     # Validate date format
     try:
-        datetime.strptime(as_of_date, '%Y-%m-%d')
+        as_of = datetime.strptime(as_of_date, '%Y-%m-%d').date()
     except ValueError:
         raise HTTPException(
             status_code=400,
@@ -137,43 +602,240 @@ async def get_bi_snapshot(
                 currency,
                 active_discount_type,
                 active_discount_value,
+                net_price,
                 daily_sales_qty,
                 daily_net_sales,
                 dq_missing_price_flag
-            FROM pricing.vw_pricing_bi_dataset
+            FROM pricing.fn_pricing_bi_dataset(?, ?, ?, ?)
+            ORDER BY daily_net_sales DESC
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        params = (as_of, as_of, region_code, channel_code, limit)
+        columns, rows = await coalesced_rows(request, 'bi-snapshot', query, params)
+        return fast_response(shape_rows(columns, rows, shape), request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/pricing/margin-snapshot")
+async def get_margin_snapshot(
+    request: Request,
+    as_of_date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    region_code: str = Query(..., description="Region code"),
+    channel_code: str = Query(..., description="Channel code"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of rows to return"),
+    shape: Literal['rows', 'columns'] = Query('rows', description="rows (list of objects) or columns (one array per column)")
+):
+    """
+    Get daily margins from pricing.fact_margin_impact for a specific date/region/channel
+    Returns lowest-margin products first
+    """
+    # Validate date format
+    try:
+        as_of = datetime.strptime(as_of_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use YYYY-MM-DD format for as_of_date"
+        )
+    
+    try:
+        # Seeks UX_fact_margin_impact_key (as_of_date, region_code, channel_code, sku)
+        query = """
+            SELECT
+                as_of_date,
+                sku,
+                region_code,
+                channel_code,
+                price,
+                discount_type,
+                discount_value,
+                net_price,
+                unit_cost,
+                margin_amount,
+                margin_pct,
+                etl_run_id
+            FROM pricing.fact_margin_impact
             WHERE as_of_date = ?
                 AND region_code = ?
                 AND channel_code = ?
-            ORDER BY daily_net_sales DESC
+            ORDER BY margin_pct ASC, sku
             OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
         """
-        results = fetch_all(query, (as_of_date, region_code, channel_code, limit))
-        return results
+        columns, rows = await coalesced_rows(request, 'margin-snapshot', query, (as_of, region_code, channel_code, limit))
+        return fast_response(shape_rows(columns, rows, shape), request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+EXPORT_ROOT = export_root(load_config())
+
+@app.get("/exports/bi-snapshot/manifest")
+async def get_bi_snapshot_manifest():
+    """
+    Manifest of the latest BI snapshot export: run_id, format and one entry
+    (as_of_date, region_code, channel_code, path, rows, bytes) per partition file
+    """
+    try:
+        body = (EXPORT_ROOT / 'manifest.json').read_bytes()
+        return Response(content=body, media_type="application/json")
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail="No BI snapshot export found. Run etl/run_etl.py or etl/export_snapshots.py."
+        )
+
+@app.api_route("/exports/bi-snapshot/files/{file_path:path}", methods=["GET", "HEAD"])
+async def get_bi_snapshot_file(file_path: str, request: Request):
+    """
+    Serve one export file (path as listed in the manifest) from a memory map
+    Supports single byte ranges (206), If-Range and If-None-Match (304)
+    """
+    try:
+        path = resolve_export_file(EXPORT_ROOT, file_path)
+        size = path.stat().st_size
+    except (FileNotFoundError, OSError):
+        raise HTTPException(status_code=404, detail=f"Export file not found: {file_path}")
+    
+    etag = file_etag(path)
+    headers = {"Accept-Ranges": "bytes", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != etag:
+        # File changed since the client's partial download: send it whole
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    media_type = MEDIA_TYPES.get(path.suffix, "application/octet-stream")
+    
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(iter_file_range(path, start, end), status_code=status_code,
+                             headers=headers, media_type=media_type)
+
+DQ_REPORT_FILE = Path(__file__).parent.parent / 'dq' / 'dq_report.json'
+
+# Parsed DQ report cached in memory, keyed by file signature (mtime_ns, size)
+_dq_report_cache = {"signature": None, "report": None, "body": None}
+
+def load_dq_report():
+    """
+    Return (report, body) for the DQ report, re-reading the file only when
+    its mtime/size changes. body is the pre-serialized JSON bytes.
+    """
+    stat = DQ_REPORT_FILE.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if _dq_report_cache["signature"] != signature:
+        with open(DQ_REPORT_FILE, 'rb') as f:
+            report = json.loads(f.read())
+        _dq_report_cache.update(
+            signature=signature,
+            report=report,
+            body=json.dumps(report, separators=(',', ':')).encode('utf-8')
+        )
+    return _dq_report_cache["report"], _dq_report_cache["body"]
+
 @app.get("/dq/latest")
 async def get_dq_latest():
     """
     Get latest data quality report from JSON file
+    Served from an in-memory copy that is refreshed when the file changes
     """
-    report_file = Path(__file__).parent.parent / 'dq' / 'dq_report.json'
-    
-    if not report_file.exists():
+    try:
+        _, body = load_dq_report()
+        return Response(content=body, media_type="application/json")
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
             detail="Data quality report not found. Run dq/checks.py to generate report."
         )
-    
-    try:
-        with open(report_file, 'r') as f:
-            report = json.load(f)
-        return report
     except json.JSONDecodeError as e:
+        # Keep serving the last good report rather than failing the caller
+        if _dq_report_cache["body"] is not None:
+            return Response(content=_dq_report_cache["body"], media_type="application/json")
         raise HTTPException(status_code=500, detail=f"Invalid JSON in report file: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading report: {str(e)}")
 
+@app.get("/dq/history")
+def get_dq_history(
+    limit: int = Query(30, ge=1, le=500, description="Number of most recent DQ runs to return"),
+    check_name: Optional[str] = Query(None, description="Restrict per-check results to one check (optional)")
+):
+    """
+    Get DQ run trend from pricing.dq_run_history / dq_check_history
+    Includes current EWMA baselines from pricing.dq_metric_stats
+    """
+    try:
+        runs = fetch_all("""
+            SELECT TOP (?)
+                dq_run_id,
+                generated_at,
+                overall_status,
+                etl_run_id,
+                checks_failed,
+                checks_warned,
+                tier
+            FROM pricing.dq_run_history
+            ORDER BY generated_at DESC, dq_run_id DESC
+        """, (limit,))
+
+        checks_by_run = {run['dq_run_id']: [] for run in runs}
+        if runs:
+            query = """
+                SELECT
+                    dq_run_id,
+                    check_name,
+                    status,
+                    issue_count,
+                    is_critical,
+                    z_score,
+                    runtime_ms
+                FROM pricing.dq_check_history
+                WHERE dq_run_id >= ?
+            """
+            params = [min(checks_by_run)]
+            if check_name:
+                query += " AND check_name = ?"
+                params.append(check_name)
+            query += " ORDER BY dq_run_id DESC, check_name"
+            check_rows = fetch_all(query, tuple(params))
+            for row in check_rows:
+                if row['dq_run_id'] in checks_by_run:
+                    checks_by_run[row['dq_run_id']].append(row)
+
+        for run in runs:
+            run['checks'] = checks_by_run[run['dq_run_id']]
+
+        baselines = fetch_all("""
+            SELECT
+                metric_name,
+                sample_count,
+                ewma_mean,
+                SQRT(ewma_var) AS ewma_std,
+                last_value,
+                last_z_score,
+                updated_at
+            FROM pricing.dq_metric_stats
+            ORDER BY metric_name
+        """)
+
+        return {"runs": runs, "baselines": baselines}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
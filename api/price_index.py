@@ -0,0 +1,187 @@
+"""
+In-memory point-in-time price index
+
+fact_price_history is loaded once per successful ETL run into one sorted
+interval list per (sku, region_code, channel_code) series. An as-of lookup is
+a dict probe plus a bisect over that series' effective_start ordinals, so
+large batches of (key, date) pairs never touch the database.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from db import fetch_one, stream_rows
+
+# Open-ended intervals (effective_end IS NULL) compare as "never ends"
+OPEN_END = date.max.toordinal()
+
+SeriesKey = Tuple[str, str, str]
+
+class PriceSeries:
+    """Intervals of one series, sorted by effective_start"""
+
+    __slots__ = ('starts', 'ends', 'max_ends', 'prices', 'currencies')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        # max_ends[i]: latest end among intervals 0..i
+        self.max_ends = []
+        self.prices = []
+        self.currencies = []
+
+    def append(self, start: int, end: int, price, currency: str):
+        """Add the next interval (callers append in effective_start order)"""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.max_ends.append(max(end, self.max_ends[-1]) if self.max_ends else end)
+        self.prices.append(price)
+        self.currencies.append(currency)
+
+    def find(self, day: int) -> Optional[int]:
+        """
+        Index of the interval effective on ordinal day, or None.
+        Same rule as pricing.sp_get_price_as_of: the latest start on or before
+        the day whose interval has not ended.
+        """
+        i = bisect_right(self.starts, day) - 1
+        # Walk back past intervals that closed before the day, but only while an
+        # earlier one still runs past it: a day in a gap or after the series
+        # ended stops at once, and only overlapping history walks at all
+        while i >= 0 and self.max_ends[i] >= day:
+            if self.ends[i] >= day:
+                return i
+            i -= 1
+        return None
+
+class PriceAsOfIndex:
+    """Immutable snapshot of fact_price_history, built for one ETL run"""
+
+    def __init__(self, run_id: Optional[int], series: dict, row_count: int, build_ms: float):
+        self.run_id = run_id
+        self.series = series
+        self.row_count = row_count
+        self.build_ms = build_ms
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, run_id: Optional[int]) -> 'PriceAsOfIndex':
+        started = time.perf_counter()
+        series = {}
+        row_count = 0
+        # Streamed: the full history is never held as rows, only as the series built from it
+        with stream_rows("""
+            SELECT sku, region_code, channel_code, effective_start, effective_end, price, currency
+            FROM pricing.fact_price_history
+            ORDER BY sku, region_code, channel_code, effective_start, price_hist_id
+        """) as (_, rows):
+            for sku, region_code, channel_code, effective_start, effective_end, price, currency in rows:
+                row_count += 1
+                key = (sku, region_code, channel_code)
+                s = series.get(key)
+                if s is None:
+                    s = series[key] = PriceSeries()
+                s.append(effective_start.toordinal(),
+                         effective_end.toordinal() if effective_end else OPEN_END,
+                         price, currency)
+        return cls(run_id, series, row_count, (time.perf_counter() - started) * 1000)
+
+    def lookup(self, sku: str, region_code: str, channel_code: str, as_of: date) -> Optional[dict]:
+        """Effective price row for one (key, date), or None"""
+        s = self.series.get((sku, region_code, channel_code))
+        if s is None:
+            return None
+        i = s.find(as_of.toordinal())
+        if i is None:
+            return None
+        return {
+            'sku': sku,
+            'region_code': region_code,
+            'channel_code': channel_code,
+            'as_of_date': as_of,
+            'price': s.prices[i],
+            'currency': s.currencies[i],
+            'effective_start': date.fromordinal(s.starts[i]),
+            'effective_end': None if s.ends[i] == OPEN_END else date.fromordinal(s.ends[i]),
+        }
+
+    def lookup_many(self, items: Iterable[Tuple[str, str, str, date]]) -> List[Optional[dict]]:
+        """Resolve many (sku, region_code, channel_code, as_of) tuples in input order"""
+        lookup = self.lookup
+        return [lookup(sku, region, channel, as_of) for sku, region, channel, as_of in items]
+
+    def stats(self) -> dict:
+        return {
+            'run_id': self.run_id,
+            'series': len(self.series),
+            'rows': self.row_count,
+            'build_ms': round(self.build_ms, 1),
+            'built_at': self.built_at,
+        }
+
+def latest_success_run_id() -> Optional[int]:
+    row = fetch_one("""
+        SELECT MAX(run_id) AS run_id
+        FROM pricing.etl_run_history
+        WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+    """)
+    return row['run_id'] if row else None
+
+class PriceAsOfIndexManager:
+    """
+    Holds the current index and rebuilds it in a background thread when a
+    newer SUCCESS run appears in etl_run_history. The run id is checked at
+    most every check_interval_s; requests never build: they keep using the
+    previous snapshot, or get None before the first build has finished.
+    """
+
+    def __init__(self, check_interval_s: float = 30.0):
+        self.check_interval_s = check_interval_s
+        self._index: Optional[PriceAsOfIndex] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    def start(self):
+        """Begin the first build without waiting for it (e.g. at startup)"""
+        self._start_refresh()
+
+    def get(self) -> Optional[PriceAsOfIndex]:
+        """Current index (None until the first build completes); starts a check when one is due"""
+        if time.monotonic() - self._checked_at >= self.check_interval_s:
+            self._start_refresh()
+        return self._index
+
+    def _start_refresh(self):
+        if not self._lock.acquire(blocking=False):
+            # A check or rebuild is already running
+            return
+        # Failed checks are retried after check_interval_s, not on every request
+        self._checked_at = time.monotonic()
+        try:
+            threading.Thread(target=self._refresh_and_release, name='price-as-of-index', daemon=True).start()
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def _refresh_and_release(self):
+        try:
+            run_id = latest_success_run_id()
+            if self._index is None or run_id != self._index.run_id:
+                self._index = PriceAsOfIndex.build(run_id)
+            self._checked_at = time.monotonic()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> PriceAsOfIndex:
+        """Force a rebuild in the calling thread (e.g. right after an ETL run)"""
+        with self._lock:
+            self._index = PriceAsOfIndex.build(latest_success_run_id())
+            self._checked_at = time.monotonic()
+            return self._index
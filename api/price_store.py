@@ -0,0 +1,544 @@
+"""
+Columnar in-memory price store (optional, api.price_store.enabled)
+
+fact_price_history and fact_discount_events are held in RAM as NumPy columns
+so current, history and as-of price reads never leave the process:
+
+- sku/region/channel codes are interned to small ints and packed into one
+  int64 series key (sku_id << 32 | region_id << 16 | channel_id)
+- dates are datetime64[D]; an open effective_end is stored as 9999-12-31
+- DECIMAL(18,4) values are int64 scaled by 10^4
+
+Rows are kept sorted by (series key, start, id), so a lookup is a couple of
+searchsorted calls. When a newer SUCCESS run shows up in etl_run_history only
+rows whose row_version moved since the last read are fetched and merged.
+
+Net prices: discount events overlap, so after each refresh they are flattened
+into non-overlapping segments that each carry the winning event. A batch of
+net-price lookups is then two find_many calls plus net_scaled.
+
+Memory: 50 bytes per row per table (~48 MiB per million rows) plus one small
+entry per distinct code. A delta merge briefly holds two copies of a table.
+"""
+
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from db import fetch_one, load_config
+from pricing_db import connection, timed_execute
+
+SCALE_DIGITS = 4
+OPEN_END = np.datetime64('9999-12-31', 'D')
+
+# Days are offset so 0001-01-01 maps to 0; 9999-12-31 still fits in 22 bits
+_DAY_OFFSET = -np.datetime64('0001-01-01', 'D').astype(np.int64)
+_DAY_BITS = 22
+_DAY_MASK = (1 << _DAY_BITS) - 1
+
+FETCH_BATCH = 50000
+
+PERCENT_TAG = 'PERCENT'
+_PERCENT_SCALE = 100 * 10 ** SCALE_DIGITS
+
+class CodeTable:
+    """Interns codes (sku, region, ...) to dense ints"""
+
+    def __init__(self):
+        self.ids = {}
+        self.codes = []
+
+    def intern(self, code) -> int:
+        i = self.ids.get(code)
+        if i is None:
+            i = self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        return i
+
+    def get(self, code) -> Optional[int]:
+        return self.ids.get(code)
+
+def series_key(sku_id: int, region_id: int, channel_id: int) -> int:
+    return (sku_id << 32) | (region_id << 16) | channel_id
+
+def to_scaled(value) -> int:
+    return int(Decimal(value).scaleb(SCALE_DIGITS))
+
+def from_scaled(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-SCALE_DIGITS)
+
+def to_day(value) -> Optional[date]:
+    """datetime64[D] to date (None for the open-end sentinel)"""
+    return None if value == OPEN_END else value.item()
+
+class IntervalColumns:
+    """
+    One table's rows as sorted, immutable columns. Updates build a new
+    instance, so readers holding a reference always see a consistent table.
+    """
+
+    def __init__(self, ids, keys, starts, ends, values, tags):
+        order = np.lexsort((ids, starts, keys))
+        self.ids = ids[order]
+        self.keys = keys[order]
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.values = values[order]
+        self.tags = tags[order]
+        # Per-series block number packed with the start day: one searchsorted
+        # over this resolves a whole batch of (series, date) lookups
+        self.series, block_starts = np.unique(self.keys, return_index=True)
+        blocks = np.zeros(len(self.keys), dtype=np.int64)
+        if len(block_starts) > 1:
+            blocks[block_starts[1:]] = 1
+        block_ids = np.cumsum(blocks) << _DAY_BITS
+        self.seq = block_ids | (self.starts.astype(np.int64) + _DAY_OFFSET)
+        # Latest end among rows up to each position within its series (block
+        # numbers only increase, so one accumulate over the packed values never
+        # crosses a series): a day past it is in a gap and has no effective row
+        packed_ends = block_ids | (self.ends.astype(np.int64) + _DAY_OFFSET)
+        self.max_ends = ((np.maximum.accumulate(packed_ends) & _DAY_MASK) - _DAY_OFFSET).astype('datetime64[D]')
+
+    @classmethod
+    def empty(cls) -> 'IntervalColumns':
+        return cls(
+            np.empty(0, np.int64), np.empty(0, np.int64),
+            np.empty(0, 'datetime64[D]'), np.empty(0, 'datetime64[D]'),
+            np.empty(0, np.int64), np.empty(0, np.int16)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.ids, self.keys, self.starts, self.ends,
+                                      self.values, self.tags, self.seq, self.series,
+                                      self.max_ends))
+
+    def merge(self, delta: 'IntervalColumns') -> 'IntervalColumns':
+        """Replace rows whose id appears in delta and add the new ones"""
+        keep = ~np.isin(self.ids, delta.ids)
+        return IntervalColumns(*(
+            np.concatenate((getattr(self, name)[keep], getattr(delta, name)))
+            for name in ('ids', 'keys', 'starts', 'ends', 'values', 'tags')
+        ))
+
+    def key_range(self, lo_key: int, hi_key: int) -> Tuple[int, int]:
+        """Row slice for series keys in [lo_key, hi_key)"""
+        return (int(np.searchsorted(self.keys, lo_key, 'left')),
+                int(np.searchsorted(self.keys, hi_key, 'left')))
+
+    def find_many(self, keys: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Row position effective for each (key, day), or -1. Same rule as
+        pricing.sp_get_price_as_of: latest start on or before the day whose
+        interval has not ended.
+        """
+        result = np.full(len(keys), -1, dtype=np.int64)
+        if not len(self.ids) or not len(keys):
+            return result
+        block = np.searchsorted(self.series, keys)
+        known = block < len(self.series)
+        known[known] = self.series[block[known]] == keys[known]
+        probe = (block << _DAY_BITS) | (days.astype(np.int64) + _DAY_OFFSET)
+        pos = np.searchsorted(self.seq, probe, 'right') - 1
+        hit = known & (pos >= 0)
+        hit[hit] = self.keys[pos[hit]] == keys[hit]
+        covered = hit.copy()
+        covered[hit] = self.ends[pos[hit]] >= days[hit]
+        result[covered] = pos[covered]
+        # Days in a gap or after the series' last end have nothing to find. Only
+        # when an earlier row still runs past the day (overlapping history, which
+        # the ETL repairs) is there a walk back, and it stops once no earlier row can
+        overlap = hit & ~covered
+        overlap[overlap] = (pos[overlap] > 0) & (self.max_ends[np.maximum(pos[overlap] - 1, 0)] >= days[overlap])
+        for i in np.flatnonzero(overlap):
+            p = pos[i] - 1
+            while p >= 0 and self.keys[p] == keys[i] and self.max_ends[p] >= days[i]:
+                if self.ends[p] >= days[i]:
+                    result[i] = p
+                    break
+                p -= 1
+        return result
+
+def net_scaled(prices: np.ndarray, discounts: np.ndarray, is_percent: np.ndarray) -> np.ndarray:
+    """
+    pricing.fn_net_price on scaled int64 columns (discount 0 = none): PERCENT
+    takes the value percent off, rounded half up to 4 dp like CAST(... AS
+    DECIMAL(18,4)); any other type is an amount off. Never below zero.
+    """
+    percent_off = (prices * (_PERCENT_SCALE - discounts) + _PERCENT_SCALE // 2) // _PERCENT_SCALE
+    return np.maximum(np.where(is_percent, percent_off, prices - discounts), 0)
+
+def winning_discounts(discounts: IntervalColumns) -> IntervalColumns:
+    """
+    Flatten overlapping discount events into non-overlapping segments per
+    series, each holding the winning event's id, value and type. Winner:
+    highest value, then earliest start, then lowest id (pricing.sp_get_net_price).
+    Days with no active event have no segment.
+    """
+    if not len(discounts):
+        return IntervalColumns.empty()
+    all_starts = discounts.starts.astype(np.int64)
+    all_ends = discounts.ends.astype(np.int64)
+    bounds = np.flatnonzero(np.diff(discounts.keys)) + 1
+    rows, seg_starts, seg_ends = [], [], []
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(discounts)]):
+        starts, ends = all_starts[lo:hi], all_ends[lo:hi]
+        cuts = np.unique(np.concatenate((starts, ends + 1)))
+        first_day, last_day = cuts[:-1], cuts[1:] - 1
+        # Series rows in priority order; the first one covering a segment wins
+        rank = np.lexsort((discounts.ids[lo:hi], starts, -discounts.values[lo:hi]))
+        covering = (starts[rank, None] <= first_day) & (ends[rank, None] >= first_day)
+        active = covering.any(axis=0)
+        winner = lo + rank[covering.argmax(axis=0)[active]]
+        first_day, last_day = first_day[active], last_day[active]
+        # Merge adjacent segments won by the same event
+        run = np.ones(len(winner), dtype=bool)
+        run[1:] = (winner[1:] != winner[:-1]) | (first_day[1:] != last_day[:-1] + 1)
+        run_starts = np.flatnonzero(run)
+        rows.append(winner[run_starts])
+        seg_starts.append(first_day[run_starts])
+        seg_ends.append(np.maximum.reduceat(last_day, run_starts))
+    rows = np.concatenate(rows)
+    return IntervalColumns(
+        discounts.ids[rows],
+        discounts.keys[rows],
+        np.concatenate(seg_starts).astype('datetime64[D]'),
+        np.concatenate(seg_ends).astype('datetime64[D]'),
+        discounts.values[rows],
+        discounts.tags[rows],
+    )
+
+TABLES = {
+    'prices': {
+        'table': 'pricing.fact_price_history',
+        'id': 'price_hist_id', 'start': 'effective_start', 'end': 'effective_end',
+        'value': 'price', 'tag': 'currency',
+    },
+    'discounts': {
+        'table': 'pricing.fact_discount_events',
+        'id': 'discount_event_id', 'start': 'start_date', 'end': 'end_date',
+        'value': 'discount_value', 'tag': 'discount_type',
+    },
+}
+
+class PriceStore:
+    """
+    fact_price_history + fact_discount_events in columnar form, as one
+    immutable snapshot. A refresh builds a new PriceStore (load) that shares
+    the append-only code tables, so a reader holding a reference always sees
+    prices, discounts and their winners from the same refresh.
+    """
+
+    def __init__(self, codes: Tuple[CodeTable, CodeTable, CodeTable, CodeTable],
+                 prices: IntervalColumns, discounts: IntervalColumns, discount_winners: IntervalColumns,
+                 run_id: Optional[int], watermark: int, loaded_at: Optional[float], last_refresh: dict):
+        self.skus, self.regions, self.channels, self.tags = codes
+        self.prices = prices
+        self.discounts = discounts
+        self.discount_winners = discount_winners
+        self.run_id = run_id
+        self.watermark = watermark
+        self.loaded_at = loaded_at
+        self.last_refresh = last_refresh
+
+    @classmethod
+    def empty(cls) -> 'PriceStore':
+        return cls(
+            (CodeTable(), CodeTable(), CodeTable(), CodeTable()),
+            IntervalColumns.empty(), IntervalColumns.empty(), IntervalColumns.empty(),
+            None, 0, None, {}
+        )
+
+    # Loading
+
+    def _read(self, cursor, spec, watermark: Optional[int]) -> IntervalColumns:
+        query = f"""
+            SELECT {spec['id']}, sku, region_code, channel_code,
+                   {spec['start']}, {spec['end']}, {spec['value']}, {spec['tag']}
+            FROM {spec['table']}
+        """
+        params = None
+        if watermark is not None:
+            query += " WHERE row_version >= CAST(? AS BINARY(8))"
+            params = (watermark,)
+        timed_execute(cursor, query, params)
+
+        ids, keys, starts, ends, values, tags = [], [], [], [], [], []
+        sku_id, region_id, channel_id, tag_id = (
+            self.skus.intern, self.regions.intern, self.channels.intern, self.tags.intern
+        )
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH)
+            if not rows:
+                break
+            for row_id, sku, region, channel, start, end, value, tag in rows:
+                ids.append(row_id)
+                keys.append(series_key(sku_id(sku), region_id(region), channel_id(channel)))
+                starts.append(start)
+                ends.append(end or OPEN_END)
+                values.append(to_scaled(value))
+                tags.append(tag_id(tag))
+        return IntervalColumns(
+            np.array(ids, dtype=np.int64),
+            np.array(keys, dtype=np.int64),
+            np.array(starts, dtype='datetime64[D]'),
+            np.array(ends, dtype='datetime64[D]'),
+            np.array(values, dtype=np.int64),
+            np.array(tags, dtype=np.int16),
+        )
+
+    @classmethod
+    def load(cls, previous: 'PriceStore', run_id: Optional[int], full: bool = False) -> 'PriceStore':
+        """
+        New snapshot with the changes since previous was read (everything when
+        previous was never loaded or full=True). Falls back to a full reload of
+        a table if row counts disagree, which means rows were deleted outside
+        the ETL. previous is not modified.
+        """
+        started = time.perf_counter()
+        full = full or previous.loaded_at is None
+        tables = {}
+        changed = {}
+        with connection(load_config()) as conn:
+            cursor = conn.cursor()
+            try:
+                # Everything below this value is committed; rows at or above it
+                # are re-read next time, and re-applying a row is harmless
+                timed_execute(cursor, "SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT)")
+                watermark = cursor.fetchone()[0]
+                for name, spec in TABLES.items():
+                    delta = previous._read(cursor, spec, None if full else previous.watermark)
+                    merged = delta if full else getattr(previous, name).merge(delta)
+                    if not full:
+                        timed_execute(cursor, f"SELECT COUNT_BIG(*) FROM {spec['table']}")
+                        if cursor.fetchone()[0] != len(merged):
+                            merged = previous._read(cursor, spec, None)
+                    tables[name] = merged
+                    changed[name] = len(delta)
+            finally:
+                cursor.close()
+        if full or changed['discounts']:
+            winners = winning_discounts(tables['discounts'])
+        else:
+            winners = previous.discount_winners
+        return cls(
+            (previous.skus, previous.regions, previous.channels, previous.tags),
+            tables['prices'], tables['discounts'], winners,
+            run_id, watermark, time.time(),
+            {
+                'full': full,
+                'rows_read': changed,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            }
+        )
+
+    # Reads
+
+    def _key(self, sku: str, region_code: str, channel_code: str) -> Optional[int]:
+        ids = (self.skus.get(sku), self.regions.get(region_code), self.channels.get(channel_code))
+        return None if None in ids else series_key(*ids)
+
+    def _price_row(self, prices: IntervalColumns, i: int) -> dict:
+        key = int(prices.keys[i])
+        return {
+            'sku': self.skus.codes[key >> 32],
+            'region_code': self.regions.codes[(key >> 16) & 0xFFFF],
+            'channel_code': self.channels.codes[key & 0xFFFF],
+            'price': from_scaled(prices.values[i]),
+            'currency': self.tags.codes[prices.tags[i]],
+            'effective_start': to_day(prices.starts[i]),
+            'effective_end': to_day(prices.ends[i]),
+        }
+
+    def current(self, sku: str, region_code: str, channel_code: str) -> Optional[dict]:
+        """Same result as pricing.sp_get_current_price"""
+        key = self._key(sku, region_code, channel_code)
+        if key is None:
+            return None
+        prices = self.prices
+        lo, hi = prices.key_range(key, key + 1)
+        open_rows = np.flatnonzero(prices.ends[lo:hi] == OPEN_END)
+        if not len(open_rows):
+            return None
+        row = self._price_row(prices, lo + int(open_rows[-1]))
+        row['current_price'] = row.pop('price')
+        return row
+
+    def history(self, sku: str, from_date: date, to_date: date,
+                region_code: Optional[str] = None, channel_code: Optional[str] = None) -> List[dict]:
+        """Same result as pricing.sp_get_price_history"""
+        sku_id = self.skus.get(sku)
+        if sku_id is None:
+            return []
+        prices = self.prices
+        lo, hi = prices.key_range(sku_id << 32, (sku_id + 1) << 32)
+        keys = prices.keys[lo:hi]
+        mask = (prices.starts[lo:hi] <= np.datetime64(to_date, 'D')) & \
+               (prices.ends[lo:hi] >= np.datetime64(from_date, 'D'))
+        if region_code is not None:
+            mask &= ((keys >> 16) & 0xFFFF) == _code_or_missing(self.regions, region_code)
+        if channel_code is not None:
+            mask &= (keys & 0xFFFF) == _code_or_missing(self.channels, channel_code)
+        rows = lo + np.flatnonzero(mask)
+        # ORDER BY effective_start DESC, effective_end DESC
+        rows = rows[np.lexsort((-prices.ends[rows].astype(np.int64), -prices.starts[rows].astype(np.int64)))]
+        return [self._price_row(prices, int(i)) for i in rows]
+
+    def _keys_and_days(self, items: List[Tuple[str, str, str, date]]) -> Tuple[np.ndarray, np.ndarray]:
+        keys = np.array([
+            k if (k := self._key(sku, region, channel)) is not None else -1
+            for sku, region, channel, _ in items
+        ], dtype=np.int64)
+        days = np.array([i[3] for i in items], dtype='datetime64[D]')
+        return keys, days
+
+    def as_of_many(self, items: Iterable[Tuple[str, str, str, date]]) -> List[Optional[dict]]:
+        """Resolve (sku, region_code, channel_code, as_of) tuples in input order"""
+        items = list(items)
+        prices = self.prices
+        positions = prices.find_many(*self._keys_and_days(items))
+        results = []
+        for (_, _, _, as_of), pos in zip(items, positions):
+            if pos < 0:
+                results.append(None)
+                continue
+            row = self._price_row(prices, int(pos))
+            row['as_of_date'] = as_of
+            results.append(row)
+        return results
+
+    def as_of(self, sku: str, region_code: str, channel_code: str, as_of: date) -> Optional[dict]:
+        return self.as_of_many([(sku, region_code, channel_code, as_of)])[0]
+
+    def net_price_many(self, items: Iterable[Tuple[str, str, str, date]]) -> List[Optional[dict]]:
+        """
+        List price plus winning discount for (sku, region_code, channel_code, as_of)
+        tuples, in input order. Same result as pricing.sp_get_net_price; None
+        where no list price is in effect.
+        """
+        items = list(items)
+        prices, winners = self.prices, self.discount_winners
+        if not len(prices):
+            return [None] * len(items)
+        keys, days = self._keys_and_days(items)
+        price_pos = prices.find_many(keys, days)
+        discount_pos = winners.find_many(keys, days)
+        priced = price_pos >= 0
+        discounted = priced & (discount_pos >= 0)
+
+        list_scaled = np.where(priced, prices.values[price_pos], 0)
+        discount_scaled = np.zeros(len(items), dtype=np.int64)
+        is_percent = np.zeros(len(items), dtype=bool)
+        if len(winners):
+            discount_scaled = np.where(discounted, winners.values[discount_pos], 0)
+            percent_tag = self.tags.get(PERCENT_TAG)
+            if percent_tag is not None:
+                is_percent = discounted & (winners.tags[discount_pos] == percent_tag)
+        net = net_scaled(list_scaled, discount_scaled, is_percent)
+
+        results = []
+        for n, (sku, region, channel, as_of) in enumerate(items):
+            if not priced[n]:
+                results.append(None)
+                continue
+            p = int(price_pos[n])
+            row = {
+                'sku': sku,
+                'region_code': region,
+                'channel_code': channel,
+                'as_of_date': as_of,
+                'list_price': from_scaled(prices.values[p]),
+                'currency': self.tags.codes[prices.tags[p]],
+                'discount_event_id': None,
+                'discount_type': None,
+                'discount_value': None,
+                'net_price': from_scaled(net[n]),
+            }
+            if discounted[n]:
+                d = int(discount_pos[n])
+                row['discount_event_id'] = int(winners.ids[d])
+                row['discount_type'] = self.tags.codes[winners.tags[d]]
+                row['discount_value'] = from_scaled(winners.values[d])
+            results.append(row)
+        return results
+
+    def net_price(self, sku: str, region_code: str, channel_code: str, as_of: date) -> Optional[dict]:
+        return self.net_price_many([(sku, region_code, channel_code, as_of)])[0]
+
+    def discounts_on(self, sku: str, region_code: str, channel_code: str, day: date) -> List[dict]:
+        """Discount events active on a day for one series (start_date <= day <= end_date)"""
+        key = self._key(sku, region_code, channel_code)
+        if key is None:
+            return []
+        discounts = self.discounts
+        lo, hi = discounts.key_range(key, key + 1)
+        d = np.datetime64(day, 'D')
+        rows = lo + np.flatnonzero((discounts.starts[lo:hi] <= d) & (discounts.ends[lo:hi] >= d))
+        return [{
+            'discount_event_id': int(discounts.ids[i]),
+            'discount_type': self.tags.codes[discounts.tags[i]],
+            'discount_value': from_scaled(discounts.values[i]),
+            'start_date': to_day(discounts.starts[i]),
+            'end_date': to_day(discounts.ends[i]),
+        } for i in rows]
+
+    def stats(self) -> dict:
+        return {
+            'run_id': self.run_id,
+            'loaded_at': self.loaded_at,
+            'price_rows': len(self.prices),
+            'discount_rows': len(self.discounts),
+            'discount_segments': len(self.discount_winners),
+            'series': len(self.prices.series),
+            'distinct_skus': len(self.skus.codes),
+            'column_bytes': self.prices.nbytes + self.discounts.nbytes + self.discount_winners.nbytes,
+            'last_refresh': self.last_refresh,
+        }
+
+def _code_or_missing(table: CodeTable, code: str) -> int:
+    """Interned id, or -1 (matches nothing) for an unknown code"""
+    i = table.get(code)
+    return -1 if i is None else i
+
+class PriceStoreManager:
+    """
+    Holds the current store and loads a new snapshot with the deltas when a
+    newer SUCCESS run appears in etl_run_history (polled at most every
+    check_interval_s). The snapshot is published with one reference
+    assignment, so reads during a refresh see the previous one.
+    """
+
+    def __init__(self, check_interval_s: float = 30.0):
+        self.check_interval_s = check_interval_s
+        self.store = PriceStore.empty()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> PriceStore:
+        store = self.store
+        if store.loaded_at is not None and time.monotonic() - self._checked_at < self.check_interval_s:
+            return store
+        if not self._lock.acquire(blocking=store.loaded_at is None):
+            return store
+        try:
+            store = self.store
+            if store.loaded_at is None or time.monotonic() - self._checked_at >= self.check_interval_s:
+                row = fetch_one("""
+                    SELECT MAX(run_id) AS run_id
+                    FROM pricing.etl_run_history
+                    WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+                """)
+                run_id = row['run_id'] if row else None
+                if store.loaded_at is None or run_id != store.run_id:
+                    store = self.store = PriceStore.load(store, run_id)
+                self._checked_at = time.monotonic()
+            return store
+        finally:
+            self._lock.release()
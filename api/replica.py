@@ -0,0 +1,185 @@
+"""
+Read-replica routing for API reads
+
+With api.read_replica.enabled, reads go to a read-only copy of PricingDWH so
+dashboards are not competing with sp_refresh_pricing_mart on the primary.
+The replica is only used while it is fresh: every check_interval_s the
+latest SUCCESS etl_run_history.run_id is read on both sides, and the replica
+must be no more than max_lag_runs successful runs behind. A stale replica,
+one that cannot be reached, or a read that fails on it all send the read to
+the primary instead. Each decision is counted for /db/routing.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pyodbc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import connection, timed_execute
+
+DEFAULTS = {
+    'enabled': False,
+    # Connection keys left null are taken from database:
+    'server': None,
+    'port': None,
+    'database': None,
+    'username': None,
+    'password': None,
+    'driver': None,
+    # Fail fast: a down replica must not hold up reads that can go to the primary
+    'login_timeout': 2,
+    'connect_retries': 0,
+    'check_interval_s': 5,
+    # Successful ETL runs the replica may lag behind the primary
+    'max_lag_runs': 0,
+}
+
+CONNECTION_KEYS = ('server', 'port', 'database', 'username', 'password', 'driver',
+                   'login_timeout', 'connect_retries')
+
+# Replica: latest run it has. Primary: latest run, and how many successful runs are newer than the replica's
+REPLICA_RUN_QUERY = """
+    SELECT MAX(run_id)
+    FROM pricing.etl_run_history
+    WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+"""
+PRIMARY_RUN_QUERY = """
+    SELECT MAX(run_id), COUNT_BIG(CASE WHEN run_id > ? THEN 1 END)
+    FROM pricing.etl_run_history
+    WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+"""
+
+def get_read_replica_settings(config: dict) -> dict:
+    """api.read_replica merged over DEFAULTS"""
+    settings = dict(DEFAULTS)
+    settings.update(((config.get('api') or {}).get('read_replica')) or {})
+    return settings
+
+def replica_config(config: dict, settings: dict) -> dict:
+    """Copy of config whose database: section points at the replica"""
+    database = dict(config['database'])
+    database.update({key: settings[key] for key in CONNECTION_KEYS if settings.get(key) is not None})
+    return dict(config, database=database)
+
+def is_connection_error(error: pyodbc.Error) -> bool:
+    """SQLSTATE 08xxx (connection) or HYT00/HYT01 (timeouts)"""
+    state = str(error.args[0]) if error.args else ''
+    return state.startswith('08') or state in ('HYT00', 'HYT01')
+
+def _query_one(config: dict, sql: str, params: Optional[Tuple] = None) -> tuple:
+    with connection(config) as conn:
+        cursor = conn.cursor()
+        try:
+            timed_execute(cursor, sql, params)
+            return tuple(cursor.fetchone())
+        finally:
+            cursor.close()
+
+class ReplicaRouter:
+    """Chooses the connection config for each read and keeps routing metrics"""
+
+    def __init__(self, config: dict, settings: dict):
+        self.primary_config = config
+        self.settings = settings
+        self.enabled = bool(settings['enabled'])
+        self.replica_config = replica_config(config, settings) if self.enabled else None
+        self.check_interval_s = float(settings['check_interval_s'])
+        self.max_lag_runs = int(settings['max_lag_runs'])
+        self.state = 'unknown' if self.enabled else 'disabled'
+        self.primary_run_id = None
+        self.replica_run_id = None
+        self.lag_runs = None
+        self.stale_since = None
+        self.checked_at = None
+        self.last_error = None
+        self.decisions = Counter()
+        self._checked_mono = 0.0
+        self._check_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def choose(self) -> Tuple[dict, str]:
+        """(config, route) for the next read; route is 'replica' or 'primary_<reason>'"""
+        if not self.enabled:
+            return self.primary_config, 'primary_disabled'
+        if time.monotonic() - self._checked_mono >= self.check_interval_s and self._check_lock.acquire(blocking=False):
+            # One reader re-checks; the others route on the previous result meanwhile
+            try:
+                self.check()
+            finally:
+                self._check_lock.release()
+        if self.state == 'fresh':
+            return self.replica_config, 'replica'
+        return self.primary_config, f'primary_{self.state}'
+
+    def check(self):
+        """Compare the latest SUCCESS run on both sides and update the state"""
+        self._checked_mono = time.monotonic()
+        self.checked_at = time.time()
+        try:
+            replica_run_id = _query_one(self.replica_config, REPLICA_RUN_QUERY)[0]
+        except pyodbc.Error as e:
+            self._set_state('down', str(e))
+            return
+        try:
+            primary_run_id, lag_runs = _query_one(
+                self.primary_config, PRIMARY_RUN_QUERY,
+                (replica_run_id if replica_run_id is not None else -1,)
+            )
+        except pyodbc.Error as e:
+            # Freshness can't be judged; the read itself will report the primary's problem
+            self._set_state('unknown', str(e))
+            return
+        self.primary_run_id = primary_run_id
+        self.replica_run_id = replica_run_id
+        self.lag_runs = int(lag_runs or 0)
+        self._set_state('fresh' if self.lag_runs <= self.max_lag_runs else 'stale', None)
+
+    def _set_state(self, state: str, error: Optional[str]):
+        # stale_since: when the replica stopped being usable (stale, down or unknown)
+        if state == 'fresh':
+            self.stale_since = None
+        elif self.stale_since is None:
+            self.stale_since = time.time()
+        self.state = state
+        self.last_error = error
+
+    def replica_failed(self, error: pyodbc.Error):
+        """A read failed on the replica; connection failures take it out until the next check"""
+        if is_connection_error(error):
+            self._set_state('down', str(error))
+            self._checked_mono = time.monotonic()
+        else:
+            self.last_error = str(error)
+
+    def record(self, route: str):
+        with self._stats_lock:
+            self.decisions[route] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            decisions = dict(self.decisions)
+        replica = None
+        if self.replica_config is not None:
+            db = self.replica_config['database']
+            replica = f"{db['server']},{db['port']}/{db['database']}"
+        return {
+            'enabled': self.enabled,
+            'state': self.state,
+            'replica': replica,
+            'primary_run_id': self.primary_run_id,
+            'replica_run_id': self.replica_run_id,
+            'lag_runs': self.lag_runs,
+            'max_lag_runs': self.max_lag_runs,
+            'stale_since': self.stale_since,
+            'stale_for_s': round(time.time() - self.stale_since, 1) if self.stale_since else 0.0,
+            'checked_at': self.checked_at,
+            'check_interval_s': self.check_interval_s,
+            'last_error': self.last_error,
+            'decisions': decisions,
+        }
@@ -0,0 +1,162 @@
+"""
+Compiled pricing rule evaluation over dim_pricing_rule
+
+Active rules are compiled into one timeline per scope. A scope is a (sku,
+region_code, channel_code) triple where NULL means "any". A timeline is the
+sorted list of days on which the set of applicable rules changes, plus that
+set (ordered by priority) for each segment. Evaluating a (key, date) is at
+most eight dict probes (each part specific or "any") with a bisect apiece,
+whatever the number of rules.
+
+The compiled form is cached and only rebuilt when the table's signature
+(row count, max row_version) changes.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from itertools import product
+from typing import Iterable, List, Optional, Tuple
+
+from db import fetch_all, fetch_one
+
+OPEN_START = date.min.toordinal()
+OPEN_END = date.max.toordinal()
+
+def rule_order(rule: dict) -> tuple:
+    """Lower priority value first (NULL last), then rule_id"""
+    return (rule['priority'] is None, rule['priority'] or 0, rule['rule_id'])
+
+class RuleTimeline:
+    """Rules of one scope as non-overlapping date segments"""
+
+    __slots__ = ('bounds', 'sets')
+
+    def __init__(self, rules: List[dict]):
+        # Every start and every day after an end is a point where the set can change
+        points = sorted({r['start'] for r in rules} | {r['end'] + 1 for r in rules if r['end'] < OPEN_END})
+        self.bounds = points
+        self.sets = [tuple(r['position'] for r in rules if r['start'] <= day <= r['end']) for day in points]
+
+    def find(self, day: int) -> tuple:
+        """Positions of the rules in effect on ordinal day, in priority order"""
+        i = bisect_right(self.bounds, day) - 1
+        return self.sets[i] if i >= 0 else ()
+
+class CompiledRules:
+    """Immutable compiled snapshot of the active rules"""
+
+    def __init__(self, signature: tuple, rules: List[dict], build_ms: float):
+        self.signature = signature
+        self.rules = rules
+        self.build_ms = build_ms
+        self.built_at = time.time()
+        scoped = {}
+        for rule in rules:
+            scoped.setdefault(rule['scope'], []).append(rule)
+        self.timelines = {scope: RuleTimeline(group) for scope, group in scoped.items()}
+
+    @classmethod
+    def build(cls, signature: tuple) -> 'CompiledRules':
+        started = time.perf_counter()
+        rows = fetch_all("""
+            SELECT rule_id, rule_name, rule_type, priority, start_date, end_date,
+                   sku, region_code, channel_code
+            FROM pricing.dim_pricing_rule
+            WHERE is_active = 1
+                AND (start_date IS NULL OR end_date IS NULL OR end_date >= start_date)
+        """)
+        rows.sort(key=rule_order)
+        rules = [{
+            'position': position,
+            'rule_id': row['rule_id'],
+            'rule_name': row['rule_name'],
+            'rule_type': row['rule_type'],
+            'priority': row['priority'],
+            'scope': (row['sku'], row['region_code'], row['channel_code']),
+            'start': row['start_date'].toordinal() if row['start_date'] else OPEN_START,
+            'end': row['end_date'].toordinal() if row['end_date'] else OPEN_END,
+        } for position, row in enumerate(rows)]
+        return cls(signature, rules, (time.perf_counter() - started) * 1000)
+
+    def evaluate(self, sku: str, region_code: str, channel_code: str, as_of: date) -> dict:
+        """Rules applying to one (key, date), highest priority first"""
+        day = as_of.toordinal()
+        positions = []
+        for scope in product((sku, None), (region_code, None), (channel_code, None)):
+            timeline = self.timelines.get(scope)
+            if timeline is not None:
+                positions.extend(timeline.find(day))
+        # Positions follow rule_order, so sorting them restores priority order
+        positions.sort()
+        return {
+            'sku': sku,
+            'region_code': region_code,
+            'channel_code': channel_code,
+            'as_of_date': as_of,
+            'rules': [self._public(self.rules[p]) for p in positions],
+        }
+
+    def evaluate_many(self, items: Iterable[Tuple[str, str, str, date]]) -> List[dict]:
+        """Evaluate many (sku, region_code, channel_code, as_of) tuples in input order"""
+        evaluate = self.evaluate
+        return [evaluate(sku, region, channel, as_of) for sku, region, channel, as_of in items]
+
+    @staticmethod
+    def _public(rule: dict) -> dict:
+        return {
+            'rule_id': rule['rule_id'],
+            'rule_name': rule['rule_name'],
+            'rule_type': rule['rule_type'],
+            'priority': rule['priority'],
+        }
+
+    def stats(self) -> dict:
+        return {
+            'rule_count': self.signature[0],
+            'max_row_version': self.signature[1],
+            'active_rules': len(self.rules),
+            'scopes': len(self.timelines),
+            'segments': sum(len(t.bounds) for t in self.timelines.values()),
+            'build_ms': round(self.build_ms, 1),
+            'built_at': self.built_at,
+        }
+
+def rule_table_signature() -> tuple:
+    """Changes whenever a rule is inserted, updated or deleted"""
+    row = fetch_one("""
+        SELECT COUNT_BIG(*) AS rule_count, CAST(MAX(row_version) AS BIGINT) AS max_row_version
+        FROM pricing.dim_pricing_rule
+    """)
+    return (row['rule_count'], row['max_row_version']) if row else (0, None)
+
+class RuleEngineManager:
+    """
+    Holds the compiled rules and recompiles them when the rule table's
+    signature changes. The signature is polled at most every
+    check_interval_s; readers keep using the previous compilation meanwhile.
+    """
+
+    def __init__(self, check_interval_s: float = 30.0):
+        self.check_interval_s = check_interval_s
+        self._compiled: Optional[CompiledRules] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CompiledRules:
+        compiled = self._compiled
+        if compiled is not None and time.monotonic() - self._checked_at < self.check_interval_s:
+            return compiled
+        if not self._lock.acquire(blocking=compiled is None):
+            return compiled
+        try:
+            compiled = self._compiled
+            if compiled is None or time.monotonic() - self._checked_at >= self.check_interval_s:
+                signature = rule_table_signature()
+                if compiled is None or signature != compiled.signature:
+                    compiled = self._compiled = CompiledRules.build(signature)
+                self._checked_at = time.monotonic()
+            return compiled
+        finally:
+            self._lock.release()
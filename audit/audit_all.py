@@ -7,16 +7,27 @@ Verifies all components and generates a comprehensive report
 import sys
 import os
 import json
+import math
+import time
+import random
+import argparse
+import itertools
+import threading
 import subprocess
-import pyodbc
-import yaml
 import requests
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect, connect_with_driver, shape_result
 
 class AuditResult:
     def __init__(self):
         self.sections = []
+        self.timings = {}
         self.overall_pass = True
     
     def add(self, status, message, details=None):
@@ -29,6 +40,28 @@ class AuditResult:
         if status == 'FAIL':
             self.overall_pass = False
     
+    def record_timing(self, section, elapsed_ms):
+        """Record wall time for an audit section"""
+        self.timings[section] = round(elapsed_ms, 1)
+    
+    def merge(self, other, section):
+        """Append another section's results, tagging each entry with the section name"""
+        for entry in other.sections:
+            entry['section'] = section
+            entry['duration_ms'] = other.timings.get(section)
+            self.sections.append(entry)
+        self.timings.update(other.timings)
+        if not other.overall_pass:
+            self.overall_pass = False
+    
+    def to_dict(self):
+        """Machine-readable form of the report"""
+        return {
+            'overall': 'PASS' if self.overall_pass else 'FAIL',
+            'sections': self.sections,
+            'timings_ms': self.timings
+        }
+    
     def print_report(self):
         """Print formatted report"""
         for section in self.sections:
@@ -46,88 +79,44 @@ class AuditResult:
                 elif isinstance(details, dict):
                     for k, v in details.items():
                         print(f"  {k}: {v}")
+        
+        if self.timings:
+            print()
+            print("Section timings:")
+            for section, elapsed_ms in self.timings.items():
+                print(f"  {section}: {elapsed_ms:.0f} ms")
 
-def load_config():
-    """Load database configuration"""
-    config_file = Path(__file__).parent.parent / 'etl' / 'config.yaml'
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
-
-def get_connection_string(config, driver_override=None):
-    """Build SQL Server connection string with driver fallback"""
-    db = config['database']
-    driver = driver_override or db['driver']
-    
-    # Build base connection string
-    conn_str = (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={db['server']},{db['port']};"
-        f"DATABASE={db['database']};"
-        f"UID={db['username']};"
-        f"PWD={db['password']};"
-    )
-    
-    # TrustServerCertificate only for newer ODBC drivers
-    if 'ODBC Driver' in driver:
-        conn_str += "TrustServerCertificate=yes;"
-    
-    return conn_str
-
-def connect_to_db(config):
-    """Connect to database, trying common drivers as fallback"""
-    db = config['database']
-    driver = db['driver']
-    available_drivers = pyodbc.drivers()
-    
-    # Try the specified driver first
-    drivers_to_try = [driver]
-    
-    # Add common fallback drivers if available
-    common_drivers = [
-        'ODBC Driver 17 for SQL Server',
-        'ODBC Driver 18 for SQL Server',
-        'ODBC Driver 13 for SQL Server',
-        'SQL Server',
-        'SQL Server Native Client 11.0'
-    ]
-    for fallback in common_drivers:
-        if fallback in available_drivers and fallback not in drivers_to_try:
-            drivers_to_try.append(fallback)
-    
-    last_error = None
-    for attempt_driver in drivers_to_try:
-        try:
-            conn_str = get_connection_string(config, attempt_driver)
-            conn = pyodbc.connect(conn_str, timeout=10)
-            return conn, attempt_driver
-        except pyodbc.Error as e:
-            last_error = e
-            continue
-    
-    # If all attempts failed, raise the last error
-    raise last_error or pyodbc.Error("Could not find a working ODBC driver")
-
-def execute_query(cursor, query, params=None):
-    """Execute query and return results"""
+def execute_query(cursor, query, params=None, shape='dicts'):
+    """Execute query and return results (shape: dicts, tuples or columns; see pricing_db.results)"""
     if params:
         cursor.execute(query, params)
     else:
         cursor.execute(query)
     
     columns = [col[0] for col in cursor.description] if cursor.description else []
-    rows = cursor.fetchall()
-    return [dict(zip(columns, row)) for row in rows] if columns else []
+    rows = cursor.fetchall() if columns else []
+    return shape_result(columns, rows, shape)
 
 def check_objects_exist(cursor, result):
     """Check required objects exist"""
     required_tables = [
-        'dim_product', 'dim_region', 'dim_channel', 'dim_pricing_rule',
+        'dim_product', 'dim_region', 'dim_channel', 'dim_pricing_rule', 'dim_calendar',
         'fact_sales', 'fact_price_history', 'fact_discount_events', 'fact_margin_impact',
-        'etl_run_history', 'price_override_audit',
-        'stg_sales', 'stg_price_history', 'stg_discount_events'
+        'etl_run_history', 'etl_change_log', 'price_override_audit',
+        'dq_run_history', 'dq_check_history', 'dq_metric_stats',
+        'query_plan_capture', 'query_plan_snapshot', 'query_plan_baseline',
+        'fact_sales_archive', 'fact_price_history_archive',
+        'fact_product_cost', 'margin_refresh_state',
+        'stg_sales', 'stg_price_history', 'stg_discount_events', 'stg_product_cost'
     ]
-    required_sprocs = ['sp_refresh_pricing_mart', 'sp_get_current_price', 'sp_get_price_history']
-    required_views = ['vw_sales_daily', 'vw_discount_active', 'vw_etl_latest_run', 'vw_pricing_bi_dataset']
+    required_sprocs = ['sp_refresh_pricing_mart', 'sp_get_current_price', 'sp_get_price_history',
+                       'sp_snapshot_query_plans', 'sp_get_price_as_of',
+                       'sp_align_partitioned_table', 'sp_maintain_partitions', 'sp_refresh_margin_impact',
+                       'sp_get_net_price', 'sp_set_price_audit_mode', 'sp_get_price_overrides',
+                       'sp_get_price_as_of_system_time', 'sp_get_price_changes', 'sp_get_net_price_batch',
+                       'sp_get_price_as_of_batch']
+    required_views = ['vw_sales_daily', 'vw_discount_active', 'vw_etl_latest_run', 'vw_pricing_bi_dataset',
+                      'vw_plan_regressions']
     required_triggers = ['trg_log_price_override']
     
     # Get existing tables
@@ -396,6 +385,183 @@ def test_api(api_url, cursor, result):
     else:
         result.add('FAIL', 'API tests', details)
 
+def get_load_test_settings(config, overrides=None):
+    """Load test settings from config (audit.load_test) with CLI overrides"""
+    settings = {
+        'concurrency': 8,
+        'rate': 50.0,
+        'duration': 30.0,
+        'timeout': 5.0,
+        'slo_p95_ms': 500.0,
+        'slo_p99_ms': 1500.0,
+        'slo_error_rate': 0.01,
+        'key_sample_size': 200,
+    }
+    settings.update(((config.get('audit') or {}).get('load_test')) or {})
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def load_test_keys(cursor, sample_size):
+    """Sample real (sku, region, channel, date range) keys from fact_price_history"""
+    cursor.execute("""
+        SELECT TOP (?) sku, region_code, channel_code, MIN(effective_start), MAX(ISNULL(effective_end, CAST(GETDATE() AS DATE)))
+        FROM pricing.fact_price_history
+        GROUP BY sku, region_code, channel_code
+        ORDER BY NEWID()
+    """, (sample_size,))
+    return cursor.fetchall()
+
+def build_load_test_requests(keys):
+    """Endpoint name -> factory returning a request path with randomized real parameters"""
+    from datetime import date, timedelta
+
+    def pick():
+        return random.choice(keys)
+
+    def current():
+        sku, region, channel, _, _ = pick()
+        return f"/pricing/current?sku={quote(sku)}&region_code={region}&channel_code={channel}"
+
+    def history():
+        sku, region, channel, start, end = pick()
+        return f"/pricing/history?sku={quote(sku)}&from_date={start}&to_date={end}&region_code={region}&channel_code={channel}"
+
+    def snapshot():
+        _, region, channel, _, _ = pick()
+        as_of = date.today() - timedelta(days=random.randint(0, 59))
+        return f"/pricing/bi-snapshot?as_of_date={as_of}&region_code={region}&channel_code={channel}&limit=100"
+
+    factories = {
+        '/health': lambda: '/health',
+        '/etl/runs': lambda: '/etl/runs',
+        '/dq/latest': lambda: '/dq/latest',
+        '/dq/history': lambda: '/dq/history?limit=30',
+    }
+    if keys:
+        factories.update({
+            '/pricing/current': current,
+            '/pricing/history': history,
+            '/pricing/bi-snapshot': snapshot,
+        })
+    return factories
+
+def latency_percentile(sorted_values, pct):
+    """Nearest-rank percentile over an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def run_load_test(api_url, cursor, result, settings):
+    """
+    Drive every API endpoint at a fixed request rate and concurrency for a duration.
+    Requests are paced on a shared open-loop schedule and latency is measured from
+    each request's scheduled start, so a slow server can't hide queueing delay.
+    """
+    if not api_url:
+        result.add('WARN', 'API load test', ['Skipped (API_URL not set)'])
+        return
+
+    try:
+        keys = load_test_keys(cursor, int(settings['key_sample_size']))
+    except Exception as e:
+        keys = []
+        result.add('WARN', 'API load test keys', [f"Could not sample keys: {e}"])
+
+    factories = build_load_test_requests(keys)
+    endpoint_names = list(factories)
+    base_url = api_url.rstrip('/')
+    concurrency = max(1, int(settings['concurrency']))
+    rate = float(settings['rate'])
+    duration = float(settings['duration'])
+    timeout = float(settings['timeout'])
+
+    samples = {name: [] for name in endpoint_names}
+    errors = {name: 0 for name in endpoint_names}
+    lock = threading.Lock()
+    sequence = itertools.count()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def worker():
+        session = requests.Session()
+        try:
+            while True:
+                with lock:
+                    n = next(sequence)
+                scheduled = started + n / rate if rate > 0 else time.perf_counter()
+                if scheduled >= deadline:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                name = endpoint_names[n % len(endpoint_names)]
+                ok = False
+                try:
+                    resp = session.get(f"{base_url}{factories[name]()}", timeout=timeout)
+                    # 404 on /pricing/current is a valid "no current price" answer
+                    ok = resp.status_code == 200 or (resp.status_code == 404 and name == '/pricing/current')
+                except requests.RequestException:
+                    pass
+                latency_ms = (time.perf_counter() - scheduled) * 1000
+                with lock:
+                    samples[name].append(latency_ms)
+                    if not ok:
+                        errors[name] += 1
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(duration + timeout + 5)
+    elapsed = time.perf_counter() - started
+
+    details = [
+        f"Concurrency: {concurrency}, target rate: {rate:g} req/s, duration: {duration:g}s, keys sampled: {len(keys)}",
+        f"SLOs: p95 <= {settings['slo_p95_ms']:g} ms, p99 <= {settings['slo_p99_ms']:g} ms, error rate <= {settings['slo_error_rate']:.2%}"
+    ]
+    slo_ok = True
+    metrics = {}
+    with lock:
+        for name in endpoint_names:
+            latencies = sorted(samples[name])
+            count = len(latencies)
+            error_rate = errors[name] / count if count else 1.0
+            p50, p95, p99 = (latency_percentile(latencies, p) for p in (50, 95, 99))
+            metrics[name] = {
+                'requests': count,
+                'throughput_rps': round(count / elapsed, 2) if elapsed else 0,
+                'error_rate': round(error_rate, 4),
+                'p50_ms': round(p50, 1) if p50 is not None else None,
+                'p95_ms': round(p95, 1) if p95 is not None else None,
+                'p99_ms': round(p99, 1) if p99 is not None else None,
+            }
+            breaches = []
+            if not count:
+                breaches.append('no requests completed')
+            else:
+                if p95 > settings['slo_p95_ms']:
+                    breaches.append(f"p95 {p95:.0f} ms")
+                if p99 > settings['slo_p99_ms']:
+                    breaches.append(f"p99 {p99:.0f} ms")
+                if error_rate > settings['slo_error_rate']:
+                    breaches.append(f"errors {error_rate:.2%}")
+            if breaches:
+                slo_ok = False
+            m = metrics[name]
+            details.append(
+                f"{name}: {m['requests']} req, {m['throughput_rps']} req/s, "
+                f"p50 {m['p50_ms']} / p95 {m['p95_ms']} / p99 {m['p99_ms']} ms, errors {m['error_rate']:.2%}"
+                + (f" -- SLO BREACH: {', '.join(breaches)}" if breaches else "")
+            )
+
+    result.add('PASS' if slo_ok else 'FAIL', 'API load test', details)
+    return metrics
+
 def check_performance_artifacts(result):
     """Check performance proof files exist"""
     perf_dir = Path(__file__).parent.parent / 'performance_proofs'
@@ -423,88 +589,258 @@ def check_performance_artifacts(result):
         result.add('FAIL', 'Performance artifacts', missing)
     else:
         result.add('PASS', 'Performance artifacts', details)
+    
+    check_benchmark_report(perf_dir / 'benchmark_report.json', result)
+
+def check_benchmark_report(benchmark_report, result):
+    """
+    Report regressions recorded by run_benchmark.py. Timing comparisons are
+    noisy, so they warn rather than fail the audit.
+    """
+    if not benchmark_report.exists():
+        result.add('WARN', 'Benchmark report', ["benchmark_report.json: missing (run performance_proofs/run_benchmark.py)"])
+        return
+    try:
+        with open(benchmark_report, 'r') as f:
+            bench = json.load(f)
+    except (OSError, ValueError) as e:
+        result.add('WARN', 'Benchmark report', [f"benchmark_report.json: unreadable ({e})"])
+        return
+    
+    details = [f"benchmark_report.json: {bench.get('generated_at')} (improvement: {bench.get('improvement_pct')})"]
+    regressions = bench.get('regressions') or []
+    if regressions:
+        result.add('WARN', 'Benchmark report', details + [f"Benchmark regression: {r}" for r in regressions])
+    else:
+        result.add('PASS', 'Benchmark report', details)
+
+def get_plan_regression_settings(config):
+    """Plan regression thresholds from config (audit.plan_regression)"""
+    settings = {
+        'duration_ratio': 1.5,
+        'reads_ratio': 1.5,
+        'min_executions': 5,
+    }
+    settings.update(((config.get('audit') or {}).get('plan_regression')) or {})
+    return settings
+
+def check_plan_regressions(cursor, result, settings):
+    """
+    Snapshot Query Store (so the API traffic just generated is included) and
+    compare each watched query's dominant plan with its accepted baseline.
+    A plan change is only a regression if duration or logical reads grew
+    past the configured ratio.
+    """
+    try:
+        cursor.execute("EXEC pricing.sp_snapshot_query_plans")
+        cursor.fetchall()
+    except Exception as e:
+        result.add('WARN', 'Query plan regressions', [f"Snapshot skipped: {e}"])
+        return
+    
+    rows = execute_query(cursor, """
+        SELECT object_name, query_id, plan_id, executions, plan_changed,
+               baseline_duration_ms, current_duration_ms, duration_ratio,
+               baseline_logical_reads, current_logical_reads, reads_ratio
+        FROM pricing.vw_plan_regressions
+        ORDER BY object_name, query_id
+    """)
+    if not rows:
+        result.add('WARN', 'Query plan regressions', ['No watched queries captured in this window'])
+        return
+    
+    regressions = []
+    changed = []
+    for r in rows:
+        if r['executions'] < settings['min_executions']:
+            continue
+        duration_ratio = float(r['duration_ratio'] or 0)
+        reads_ratio = float(r['reads_ratio'] or 0)
+        label = (f"{r['object_name']} (query {r['query_id']}, plan {r['plan_id']}): "
+                 f"duration {float(r['baseline_duration_ms']):.2f} -> {float(r['current_duration_ms']):.2f} ms "
+                 f"(x{duration_ratio:.2f}), reads {float(r['baseline_logical_reads']):.0f} -> "
+                 f"{float(r['current_logical_reads']):.0f} (x{reads_ratio:.2f})")
+        if duration_ratio > settings['duration_ratio'] or reads_ratio > settings['reads_ratio']:
+            regressions.append(('plan changed: ' if r['plan_changed'] else '') + label)
+        elif r['plan_changed']:
+            changed.append(label)
+    
+    if regressions:
+        result.add('FAIL', 'Query plan regressions', regressions +
+                   ['Fix the query/index, or accept with EXEC pricing.sp_snapshot_query_plans @accept_current = 1'])
+    elif changed:
+        result.add('WARN', 'Query plan regressions', ['Plan changed without slowdown: ' + c for c in changed])
+    else:
+        result.add('PASS', 'Query plan regressions', [f"{len(rows)} watched queries match baseline"])
+
+def run_section(section, config):
+    """Run one audit section on its own connection and time it"""
+    section_result = AuditResult()
+    conn = None
+    cursor = None
+    started = time.perf_counter()
+    try:
+        if section['db']:
+            conn = connect(config, autocommit=True)
+            cursor = conn.cursor()
+            section['func'](cursor, section_result)
+        else:
+            section['func'](section_result)
+    except Exception as e:
+        section_result.add('FAIL', section['name'], [f"Error: {str(e)}"])
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+    section_result.record_timing(section['name'], (time.perf_counter() - started) * 1000)
+    return section_result
+
+def run_sections(sections, config, max_workers):
+    """
+    Run audit sections concurrently, starting each as soon as the sections it
+    depends on ('after') have finished. Results are returned in declared order.
+    """
+    results = {}
+    pending = list(sections)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for section in [s for s in pending if all(dep in results for dep in s['after'])]:
+                pending.remove(section)
+                running[pool.submit(run_section, section, config)] = section['name']
+            if not running:
+                # Unsatisfiable dependencies; report rather than hang
+                for section in pending:
+                    skipped = AuditResult()
+                    skipped.add('FAIL', section['name'], [f"Dependencies not met: {', '.join(section['after'])}"])
+                    results[section['name']] = skipped
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return [(s['name'], results[s['name']]) for s in sections]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='End-to-end audit for pricing-command-center')
+    parser.add_argument('--load-test', action='store_true',
+                       help='Also run the concurrent API load test (requires API_URL)')
+    parser.add_argument('--concurrency', type=int, default=None, help='Load test worker threads')
+    parser.add_argument('--rate', type=float, default=None, help='Load test target requests/second (0 = unthrottled)')
+    parser.add_argument('--duration', type=float, default=None, help='Load test duration in seconds')
+    parser.add_argument('--slo-p95-ms', type=float, default=None, help='Per-endpoint p95 latency SLO (ms)')
+    parser.add_argument('--slo-p99-ms', type=float, default=None, help='Per-endpoint p99 latency SLO (ms)')
+    parser.add_argument('--slo-error-rate', type=float, default=None, help='Per-endpoint max error rate (0-1)')
+    parser.add_argument('--json', action='store_true',
+                       help='Print the report as JSON (with per-section timings) instead of text')
+    parser.add_argument('--workers', type=int, default=4, help='Max audit sections run concurrently (default: 4)')
+    return parser.parse_args()
+
+def finish(result, args, started_at, started):
+    """Print the report (text or JSON) and exit with the audit status"""
+    result.record_timing('total', (time.perf_counter() - started) * 1000)
+    if args.json:
+        report = result.to_dict()
+        report['started_at'] = started_at
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print()
+        result.print_report()
+        print()
+        print("=" * 60)
+        print(f"OVERALL: {'PASS' if result.overall_pass else 'FAIL'}")
+    sys.exit(0 if result.overall_pass else 2)
 
 def main():
+    args = parse_args()
     result = AuditResult()
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    # In JSON mode the banner goes to stderr so stdout stays parseable
+    out = sys.stderr if args.json else sys.stdout
     
     # Environment summary
-    print("=" * 60)
-    print("PRICING COMMAND CENTER - END-TO-END AUDIT")
-    print("=" * 60)
-    print(f"Python Version: {sys.version}")
-    print(f"OS: {os.name}")
+    print("=" * 60, file=out)
+    print("PRICING COMMAND CENTER - END-TO-END AUDIT", file=out)
+    print("=" * 60, file=out)
+    print(f"Python Version: {sys.version}", file=out)
+    print(f"OS: {os.name}", file=out)
     
     try:
         config = load_config()
         db_config = config['database']
-        print(f"SQL Server: {db_config['server']}:{db_config['port']}")
-        print(f"Database: {db_config['database']}")
+        print(f"SQL Server: {db_config['server']}:{db_config['port']}", file=out)
+        print(f"Database: {db_config['database']}", file=out)
     except Exception as e:
-        print(f"Config Error: {e}")
+        print(f"Config Error: {e}", file=out)
         result.add('FAIL', 'Config loading', [str(e)])
-        result.print_report()
-        print("\nOVERALL: FAIL")
-        sys.exit(2)
+        finish(result, args, started_at, started)
     
     api_url = os.environ.get('API_URL')
     if api_url:
-        print(f"API URL: {api_url}")
+        print(f"API URL: {api_url}", file=out)
     else:
-        print("API URL: Not set (API tests will be skipped)")
-    print("=" * 60)
-    print()
+        print("API URL: Not set (API tests will be skipped)", file=out)
+    print("=" * 60, file=out)
+    print(file=out)
     
-    # DB connectivity
+    # DB connectivity (also resolves and caches the working driver for section connections)
+    connectivity = AuditResult()
+    connect_started = time.perf_counter()
     try:
-        conn, used_driver = connect_to_db(config)
-        conn.autocommit = True
-        cursor = conn.cursor()
-        cursor.execute("SELECT @@SERVERNAME, DB_NAME()")
-        server, db = cursor.fetchone()
-        result.add('PASS', 'DB connectivity', [f"Connected to {server}/{db} (driver: {used_driver})"])
+        conn, used_driver = connect_with_driver(config)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT @@SERVERNAME, DB_NAME()")
+            server, db = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        connectivity.add('PASS', 'DB connectivity', [f"Connected to {server}/{db} (driver: {used_driver})"])
     except Exception as e:
-        result.add('FAIL', 'DB connectivity', [str(e)])
-        result.print_report()
-        print("\nOVERALL: FAIL")
-        sys.exit(2)
+        connectivity.add('FAIL', 'DB connectivity', [str(e)])
+    connectivity.record_timing('connectivity', (time.perf_counter() - connect_started) * 1000)
+    result.merge(connectivity, 'connectivity')
+    if not connectivity.overall_pass:
+        finish(result, args, started_at, started)
+    
+    # Independent sections run concurrently on separate connections;
+    # 'after' orders sections that read what another section writes
+    sections = [
+        {'name': 'objects', 'db': True, 'after': (), 'func': check_objects_exist},
+        {'name': 'staging', 'db': True, 'after': (), 'func': check_staging_data},
+        {'name': 'etl', 'db': True, 'after': (), 'func': run_etl_check},
+        {'name': 'artifacts', 'db': False, 'after': (), 'func': check_performance_artifacts},
+        {'name': 'facts', 'db': True, 'after': ('etl',), 'func': check_facts},
+        {'name': 'dq', 'db': False, 'after': ('etl',), 'func': run_dq_check},
+        {'name': 'api', 'db': True, 'after': ('dq',),
+         'func': lambda cursor, res: test_api(api_url, cursor, res)},
+    ]
+    plan_settings = get_plan_regression_settings(config)
+    sections.append({
+        'name': 'plans', 'db': True, 'after': ('api',),
+        'func': lambda cursor, res: check_plan_regressions(cursor, res, plan_settings)
+    })
+    if args.load_test:
+        settings = get_load_test_settings(config, {
+            'concurrency': args.concurrency,
+            'rate': args.rate,
+            'duration': args.duration,
+            'slo_p95_ms': args.slo_p95_ms,
+            'slo_p99_ms': args.slo_p99_ms,
+            'slo_error_rate': args.slo_error_rate,
+        })
+        # Load test runs alone so it doesn't skew (or get skewed by) other sections
+        sections.append({
+            'name': 'load_test', 'db': True,
+            'after': tuple(s['name'] for s in sections),
+            'func': lambda cursor, res: run_load_test(api_url, cursor, res, settings)
+        })
     
-    try:
-        # Object existence
-        check_objects_exist(cursor, result)
-        
-        # Staging checks
-        check_staging_data(cursor, result)
-        
-        # Run ETL
-        run_etl_check(cursor, result)
-        
-        # Fact checks
-        check_facts(cursor, result)
-        
-        # DQ check
-        run_dq_check(result)
-        
-        # API tests
-        test_api(api_url, cursor, result)
-        
-        # Performance artifacts
-        check_performance_artifacts(result)
-        
-    finally:
-        cursor.close()
-        conn.close()
-    
-    # Print report
-    print()
-    result.print_report()
-    print()
-    print("=" * 60)
-    if result.overall_pass:
-        print("OVERALL: PASS")
-        sys.exit(0)
-    else:
-        print("OVERALL: FAIL")
-        sys.exit(2)
+    for name, section_result in run_sections(sections, config, max(1, args.workers)):
+        result.merge(section_result, name)
+    
+    finish(result, args, started_at, started)
 
 if __name__ == '__main__':
     main()
@@ -5,75 +5,19 @@ Validates fact table data quality and reports issues
 """
 
 import pyodbc
-import yaml
 import sys
 import json
+import time
+import argparse
+import math
+import os
+import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 
-def load_config(config_path='../etl/config.yaml'):
-    """Load database configuration from ETL config file"""
-    config_file = Path(__file__).parent.parent / 'etl' / 'config.yaml'
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def get_connection_string(config, driver_override=None):
-    """Build SQL Server connection string with driver fallback"""
-    db = config['database']
-    driver = driver_override or db['driver']
-    
-    # Adjust connection string for older 'SQL Server' driver if needed
-    if driver == 'SQL Server':
-        return (
-            f"DRIVER={{{driver}}};"
-            f"SERVER={db['server']},{db['port']};"
-            f"DATABASE={db['database']};"
-            f"UID={db['username']};"
-            f"PWD={db['password']};"
-        )
-    else:
-        return (
-            f"DRIVER={{{driver}}};"
-            f"SERVER={db['server']},{db['port']};"
-            f"DATABASE={db['database']};"
-            f"UID={db['username']};"
-            f"PWD={db['password']};"
-            f"TrustServerCertificate=yes;"
-        )
-
-def connect_to_db(config):
-    """Connect to database, trying common drivers as fallback"""
-    db = config['database']
-    specified_driver = db['driver']
-    available_drivers = pyodbc.drivers()
-    
-    # Try the specified driver first
-    drivers_to_try = [specified_driver]
-    
-    # Add common fallback drivers if available and not already in list
-    common_fallbacks = [
-        'ODBC Driver 17 for SQL Server',
-        'ODBC Driver 18 for SQL Server',
-        'ODBC Driver 13 for SQL Server',
-        'SQL Server',
-        'SQL Server Native Client 11.0'
-    ]
-    for fallback in common_fallbacks:
-        if fallback in available_drivers and fallback not in drivers_to_try:
-            drivers_to_try.append(fallback)
-    
-    last_error = None
-    for attempt_driver in drivers_to_try:
-        try:
-            conn_str = get_connection_string(config, attempt_driver)
-            conn = pyodbc.connect(conn_str, timeout=10)
-            return conn
-        except pyodbc.Error as e:
-            last_error = e
-            continue
-    
-    # If all attempts failed, raise the last error
-    raise last_error
+from pricing_db import load_config, connect
 
 def check_negative_prices(cursor):
     """Check 1: Negative prices in fact_price_history"""
@@ -270,29 +214,398 @@ def check_missing_price_coverage(cursor):
         "critical": True
     }
 
-def run_checks():
-    """Execute all data quality checks"""
+def get_anomaly_settings(config):
+    """Read anomaly detection settings from config, with defaults"""
+    settings = (config.get('dq') or {}).get('anomaly') or {}
+    return {
+        'alpha': float(settings.get('alpha', 0.3)),
+        'min_samples': int(settings.get('min_samples', 5)),
+        'warn_z': float(settings.get('warn_z', 3.0)),
+        'fail_z': float(settings.get('fail_z', 5.0)),
+        'min_std': float(settings.get('min_std', 1.0)),
+    }
+
+def load_metric_stats(cursor):
+    """Load streaming statistics for all tracked metrics"""
+    cursor.execute("""
+        SELECT metric_name, sample_count, ewma_mean, ewma_var, last_value, last_z_score, last_source_id
+        FROM pricing.dq_metric_stats
+    """)
+    columns = [column[0] for column in cursor.description]
+    return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+def classify_z_score(z_score, settings):
+    """Map a z-score to PASS / WARNING / FAIL"""
+    if z_score is None:
+        return "PASS"
+    if abs(z_score) >= settings['fail_z']:
+        return "FAIL"
+    if abs(z_score) >= settings['warn_z']:
+        return "WARNING"
+    return "PASS"
+
+def score_metric(stats, value, settings):
+    """Score a value against the current EWMA baseline (before absorbing it)"""
+    if not stats or stats['sample_count'] < settings['min_samples']:
+        return None, "PASS"
+
+    std = max(math.sqrt(max(stats['ewma_var'], 0.0)), settings['min_std'])
+    z_score = (value - stats['ewma_mean']) / std
+    return z_score, classify_z_score(z_score, settings)
+
+def update_metric(stats, metric_name, value, z_score, source_id, settings):
+    """Fold one sample into the EWMA mean/variance without touching history"""
+    if not stats or stats['sample_count'] == 0:
+        mean, var, count = float(value), 0.0, 1
+    else:
+        alpha = settings['alpha']
+        diff = value - stats['ewma_mean']
+        incr = alpha * diff
+        mean = stats['ewma_mean'] + incr
+        var = (1 - alpha) * (stats['ewma_var'] + diff * incr)
+        count = stats['sample_count'] + 1
+
+    return {
+        'metric_name': metric_name,
+        'sample_count': count,
+        'ewma_mean': mean,
+        'ewma_var': var,
+        'last_value': float(value),
+        'last_z_score': z_score,
+        'last_source_id': source_id,
+    }
+
+def save_metric_stats(cursor, stats):
+    """Upsert one metric's streaming statistics"""
+    cursor.execute("""
+        MERGE pricing.dq_metric_stats AS target
+        USING (SELECT ? AS metric_name) AS source
+        ON target.metric_name = source.metric_name
+        WHEN MATCHED THEN
+            UPDATE SET sample_count = ?, ewma_mean = ?, ewma_var = ?, last_value = ?,
+                       last_z_score = ?, last_source_id = ?, updated_at = SYSUTCDATETIME()
+        WHEN NOT MATCHED THEN
+            INSERT (metric_name, sample_count, ewma_mean, ewma_var, last_value, last_z_score, last_source_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+    """, (
+        stats['metric_name'],
+        stats['sample_count'], stats['ewma_mean'], stats['ewma_var'], stats['last_value'],
+        stats['last_z_score'], stats['last_source_id'],
+        stats['metric_name'],
+        stats['sample_count'], stats['ewma_mean'], stats['ewma_var'], stats['last_value'],
+        stats['last_z_score'], stats['last_source_id'],
+    ))
+
+def check_volume_anomalies(cursor, config, checks):
+    """
+    Check 6: Volume anomalies (WARNING, not critical)
+    Scores new ETL runs (rows_loaded/rows_rejected) and the per-check counts
+    against EWMA baselines, then folds each sample into the baseline. Check
+    counts are sampled once per ETL run; later DQ runs against the same load
+    re-report the stored score.
+    """
+    settings = get_anomaly_settings(config)
+    all_stats = load_metric_stats(cursor)
+    metrics = []
+
+    # ETL volumes: absorb every SUCCESS run since the last one seen, report the latest
+    last_seen = (all_stats.get('etl.rows_loaded') or {}).get('last_source_id') or 0
+    cursor.execute("""
+        SELECT run_id, rows_loaded, rows_rejected
+        FROM pricing.etl_run_history
+        WHERE pipeline_name = 'pricing_refresh'
+            AND status = 'SUCCESS'
+            AND run_id > ?
+        ORDER BY run_id
+    """, (last_seen,))
+    new_runs = cursor.fetchall()
+
+    for metric_name, column in (('etl.rows_loaded', 1), ('etl.rows_rejected', 2)):
+        stats = all_stats.get(metric_name)
+        z_score, status = None, "PASS"
+        for run in new_runs:
+            value = float(run[column])
+            z_score, status = score_metric(stats, value, settings)
+            stats = update_metric(stats, metric_name, value, z_score, run[0], settings)
+        if new_runs:
+            save_metric_stats(cursor, stats)
+        elif stats:
+            # No new runs since the last DQ run; re-report the stored score
+            z_score = stats['last_z_score']
+            status = classify_z_score(z_score, settings)
+        if stats:
+            metrics.append({
+                "metric": metric_name,
+                "value": stats['last_value'],
+                "baseline_mean": round(stats['ewma_mean'], 4),
+                "baseline_std": round(math.sqrt(max(stats['ewma_var'], 0.0)), 4),
+                "z_score": round(z_score, 4) if z_score is not None else None,
+                "status": status
+            })
+
+    # Per-check issue counts: one sample per ETL run. Reruns against the same load
+    # (other tiers, manual or audit runs) must not re-absorb the same counts, or the
+    # variance collapses and the next real change scores as a spurious anomaly
+    latest_run_id = new_runs[-1][0] if new_runs else last_seen
+    for check in checks:
+        metric_name = f"check.{check['name']}"
+        stats = all_stats.get(metric_name)
+        value = float(check['count'])
+        if stats and stats['last_source_id'] == latest_run_id:
+            if value == stats['last_value']:
+                # Already sampled for this run; re-report the stored score
+                z_score = stats['last_z_score']
+                status = classify_z_score(z_score, settings)
+            else:
+                # Data changed without a new run: score it, keep the baseline as is
+                z_score, status = score_metric(stats, value, settings)
+        else:
+            z_score, status = score_metric(stats, value, settings)
+            stats = update_metric(stats, metric_name, value, z_score, latest_run_id, settings)
+            save_metric_stats(cursor, stats)
+        check['z_score'] = round(z_score, 4) if z_score is not None else None
+        metrics.append({
+            "metric": metric_name,
+            "value": value,
+            "baseline_mean": round(stats['ewma_mean'], 4),
+            "baseline_std": round(math.sqrt(max(stats['ewma_var'], 0.0)), 4),
+            "z_score": check['z_score'],
+            "status": status
+        })
+
+    anomalies = [m for m in metrics if m['status'] != "PASS"]
+    if any(m['status'] == "FAIL" for m in anomalies):
+        status = "FAIL"
+    elif anomalies:
+        status = "WARNING"
+    else:
+        status = "PASS"
+
+    sample_query = """
+        SELECT metric_name, sample_count, ewma_mean, SQRT(ewma_var) AS ewma_std,
+               last_value, last_z_score, updated_at
+        FROM pricing.dq_metric_stats
+        ORDER BY ABS(ISNULL(last_z_score, 0)) DESC
+    """
+
+    return {
+        "name": "Volume Anomalies",
+        "status": status,
+        "count": len(anomalies),
+        "sample_query": sample_query,
+        "critical": False,
+        "metrics": metrics
+    }
+
+def persist_dq_run(cursor, report, checks):
+    """Persist the DQ run and its per-check counts to the history tables"""
+    cursor.execute("""
+        SELECT MAX(run_id) FROM pricing.etl_run_history
+        WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+    """)
+    etl_run_id = cursor.fetchone()[0]
+
+    checks_failed = sum(1 for c in checks if c['status'] == 'FAIL')
+    checks_warned = sum(1 for c in checks if c['status'] == 'WARNING')
+
+    cursor.execute("""
+        INSERT INTO pricing.dq_run_history
+            (generated_at, overall_status, etl_run_id, checks_failed, checks_warned, tier)
+        OUTPUT INSERTED.dq_run_id
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        datetime.fromisoformat(report['generated_at']).replace(tzinfo=None),
+        report['overall_status'],
+        etl_run_id,
+        checks_failed,
+        checks_warned,
+        report.get('tier'),
+    ))
+    dq_run_id = cursor.fetchone()[0]
+
+    cursor.executemany("""
+        INSERT INTO pricing.dq_check_history
+            (dq_run_id, check_name, status, issue_count, is_critical, z_score, runtime_ms)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (dq_run_id, c['name'], c['status'], c['count'], 1 if c['critical'] else 0,
+         c.get('z_score'), c.get('runtime_ms'))
+        for c in checks
+    ])
+
+    return dq_run_id
+
+# Declarative check registry
+#   severity: critical checks fail the gate (exit code 2); warning checks only report
+#   table:    primary table the check scans
+#   est_cost_ms: prior runtime estimate, replaced by the measured EWMA once available
+#   tier:     'fast' runs in the post-ETL gate, 'deep' runs in the scheduled sweep;
+#             critical checks run in every tier
+CHECK_REGISTRY = [
+    {
+        "name": "Negative Prices",
+        "func": check_negative_prices,
+        "severity": "critical",
+        "table": "pricing.fact_price_history",
+        "est_cost_ms": 50,
+        "tier": "fast"
+    },
+    {
+        "name": "Orphan Facts",
+        "func": check_orphan_facts,
+        "severity": "critical",
+        "table": "pricing.fact_sales",
+        "est_cost_ms": 250,
+        "tier": "fast"
+    },
+    {
+        "name": "Missing Current Price Coverage",
+        "func": check_missing_price_coverage,
+        "severity": "critical",
+        "table": "pricing.fact_sales",
+        "est_cost_ms": 200,
+        "tier": "fast"
+    },
+    {
+        "name": "Overlapping Effective Ranges",
+        "func": check_overlapping_ranges,
+        "severity": "critical",
+        "table": "pricing.fact_price_history",
+        "est_cost_ms": 2000,
+        "tier": "deep"
+    },
+    {
+        "name": "Overlapping Active Discounts",
+        "func": check_overlapping_discounts,
+        "severity": "warning",
+        "table": "pricing.fact_discount_events",
+        "est_cost_ms": 1000,
+        "tier": "deep"
+    },
+]
+
+TIERS = ('fast', 'deep', 'all')
+
+# Each time a check is skipped its cost estimate is cut by this factor (never
+# below the registry estimate), so one slow run cannot exclude it for good
+SKIPPED_COST_DECAY = 0.5
+
+def get_tier_budget_ms(config, tier):
+    """Read the time budget for a tier from config (None = unbounded)"""
+    tiers = (config.get('dq') or {}).get('tiers') or {}
+    budget = (tiers.get(tier) or {}).get('budget_ms')
+    return float(budget) if budget is not None else None
+
+def load_cost_estimates(cursor):
+    """Measured runtime EWMA (ms) per check, keyed by check name"""
+    stats = load_metric_stats(cursor)
+    return {
+        name[len('cost.'):]: row['ewma_mean']
+        for name, row in stats.items()
+        if name.startswith('cost.') and row['sample_count'] > 0
+    }
+
+def select_checks(tier, budget_ms, cost_estimates):
+    """
+    Pick registry entries for a tier and fit them into the time budget.
+    Critical checks always run, whatever their tier or estimate; the remaining
+    budget goes to the tier's other checks, cheapest first.
+    Returns (selected, skipped) lists of registry entries.
+    """
+    candidates = [
+        c for c in CHECK_REGISTRY
+        if tier == 'all' or c['tier'] == tier or c['severity'] == 'critical'
+    ]
+    candidates.sort(key=lambda c: (
+        c['severity'] != 'critical',
+        cost_estimates.get(c['name'], c['est_cost_ms'])
+    ))
+
+    selected, skipped = [], []
+    planned_ms = 0.0
+    for entry in candidates:
+        estimate = cost_estimates.get(entry['name'], entry['est_cost_ms'])
+        over_budget = budget_ms is not None and planned_ms + estimate > budget_ms
+        if over_budget and entry['severity'] != 'critical':
+            skipped.append(entry)
+            continue
+        planned_ms += estimate
+        selected.append(entry)
+    return selected, skipped
+
+def run_registered_check(cursor, entry):
+    """Run one registry entry, timing it and applying registry metadata"""
+    started = time.perf_counter()
+    check = entry['func'](cursor)
+    check['runtime_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    check['critical'] = entry['severity'] == 'critical'
+    check['tier'] = entry['tier']
+    check['table'] = entry['table']
+    return check
+
+def record_check_costs(cursor, config, checks, skipped):
+    """
+    Fold measured runtimes into the per-check cost EWMA (cost.<name>), and
+    decay the estimates of skipped checks, which have no new runtime, so they
+    come back within budget and get retried
+    """
+    settings = get_anomaly_settings(config)
+    all_stats = load_metric_stats(cursor)
+    for check in checks:
+        metric_name = f"cost.{check['name']}"
+        stats = update_metric(all_stats.get(metric_name), metric_name, check['runtime_ms'], None, None, settings)
+        save_metric_stats(cursor, stats)
+    for entry in skipped:
+        stats = all_stats.get(f"cost.{entry['name']}")
+        if not stats or stats['ewma_mean'] <= entry['est_cost_ms']:
+            continue
+        stats['ewma_mean'] = max(stats['ewma_mean'] * SKIPPED_COST_DECAY, float(entry['est_cost_ms']))
+        save_metric_stats(cursor, stats)
+
+def write_report_atomic(report, report_file):
+    """Write the JSON report via temp file + rename so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=report_file.parent, prefix='.dq_report.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the report readable by the API process
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, report_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def run_checks(tier='all', budget_ms=None):
+    """Execute data quality checks for a tier within an optional time budget"""
     try:
         # Load configuration
         config = load_config()
+        if budget_ms is None:
+            budget_ms = get_tier_budget_ms(config, tier)
         
         # Connect to database
         print("Connecting to database...")
-        conn = connect_to_db(config)
-        conn.autocommit = True
+        conn = connect(config, autocommit=True)
         cursor = conn.cursor()
         
         try:
-            print("Running data quality checks...\n")
+            budget_label = f"{budget_ms:.0f} ms" if budget_ms is not None else "unbounded"
+            print(f"Running data quality checks (tier: {tier}, budget: {budget_label})...\n")
+            
+            # Select and run registered checks
+            selected, skipped = select_checks(tier, budget_ms, load_cost_estimates(cursor))
+            checks = [run_registered_check(cursor, entry) for entry in selected]
             
-            # Run all checks
-            checks = [
-                check_negative_prices(cursor),
-                check_overlapping_ranges(cursor),
-                check_orphan_facts(cursor),
-                check_overlapping_discounts(cursor),
-                check_missing_price_coverage(cursor)
-            ]
+            # Cost feedback, volume anomaly scoring and history persistence commit together
+            conn.autocommit = False
+            record_check_costs(cursor, config, checks, skipped)
+            volume_check = check_volume_anomalies(cursor, config, checks)
+            checks.append(volume_check)
             
             # Determine overall status
             critical_failed = any(c['status'] == 'FAIL' and c['critical'] for c in checks)
@@ -302,21 +615,34 @@ def run_checks():
             report = {
                 "generated_at": datetime.now(timezone.utc).isoformat(),
                 "overall_status": overall_status,
+                "tier": tier,
+                "budget_ms": budget_ms,
                 "checks": [
                     {
                         "name": c["name"],
                         "status": c["status"],
                         "count": c["count"],
-                        "sample_query": c["sample_query"]
+                        "sample_query": c["sample_query"],
+                        "runtime_ms": c.get("runtime_ms")
                     }
                     for c in checks
-                ]
+                ],
+                "skipped_checks": [entry["name"] for entry in skipped],
+                "volume_metrics": volume_check["metrics"]
             }
             
+            # Persist run history
+            try:
+                dq_run_id = persist_dq_run(cursor, report, checks)
+                conn.commit()
+            except pyodbc.Error:
+                conn.rollback()
+                raise
+            report["dq_run_id"] = dq_run_id
+            
             # Write JSON report
             report_file = Path(__file__).parent / 'dq_report.json'
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            write_report_atomic(report, report_file)
             
             # Print console summary
             print("=" * 60)
@@ -330,7 +656,10 @@ def run_checks():
             for check in checks:
                 status_symbol = "[PASS]" if check['status'] == "PASS" else ("[WARN]" if check['status'] == "WARNING" else "[FAIL]")
                 critical_marker = " [CRITICAL]" if check['critical'] else ""
-                print(f"{status_symbol} {check['name']}: {check['status']} (Count: {check['count']}){critical_marker}")
+                runtime = f", {check['runtime_ms']} ms" if 'runtime_ms' in check else ""
+                print(f"{status_symbol} {check['name']}: {check['status']} (Count: {check['count']}{runtime}){critical_marker}")
+            for entry in skipped:
+                print(f"[SKIP] {entry['name']}: over time budget ({entry['tier']} tier)")
             
             print("-" * 60)
             print(f"\nFull report saved to: {report_file}")
@@ -357,5 +686,14 @@ def run_checks():
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
+def main():
+    parser = argparse.ArgumentParser(description='Run data quality checks')
+    parser.add_argument('--tier', choices=TIERS, default='all',
+                       help="Check tier: fast (post-ETL gate), deep (scheduled sweep) or all (default)")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                       help='Time budget in ms (default: dq.tiers.<tier>.budget_ms from config)')
+    args = parser.parse_args()
+    return run_checks(args.tier, args.budget_ms)
+
 if __name__ == '__main__':
-    sys.exit(run_checks())
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+BI snapshot export for vw_pricing_bi_dataset
+Streams the view from SQL Server in fetchmany batches and writes one compressed
+Parquet (or Arrow IPC) file per as_of_date/region_code/channel_code partition,
+with settings from config.yaml (export). Requires pyarrow.
+
+Layout (hive-style, one directory per ETL run):
+    <output_dir>/run_<run_id>/as_of_date=2024-03-01/region_code=NE/channel_code=ONLINE/part-0.parquet
+    <output_dir>/manifest.json   -> the current run, written last
+"""
+
+import pyodbc
+import sys
+import json
+import os
+import shutil
+import time
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULTS = {
+    'enabled': True,
+    'output_dir': 'exports/bi_snapshot',
+    # parquet | arrow (Arrow IPC file)
+    'format': 'parquet',
+    'compression': 'zstd',
+    # Trailing days of vw_pricing_bi_dataset to export (the view holds 60)
+    'days': 60,
+    'fetch_batch': 50000,
+    # Older run directories kept so in-flight downloads finish
+    'keep_runs': 2,
+}
+
+COLUMNS = [
+    'as_of_date', 'sku', 'product_name', 'category', 'brand',
+    'region_code', 'region_name', 'channel_code', 'channel_name',
+    'current_price', 'currency', 'active_discount_type', 'active_discount_value', 'net_price',
+    'daily_sales_qty', 'daily_net_sales', 'dq_missing_price_flag',
+]
+
+# Sorted like the partition key so each partition arrives contiguously
+EXPORT_QUERY = f"""
+    SELECT {', '.join(COLUMNS)}
+    FROM pricing.vw_pricing_bi_dataset
+    WHERE as_of_date > DATEADD(DAY, -?, CAST(GETDATE() AS DATE))
+    ORDER BY as_of_date, region_code, channel_code, sku
+"""
+
+def get_export_settings(config, overrides=None):
+    """export settings from config with CLI overrides"""
+    settings = dict(DEFAULTS)
+    settings.update(config.get('export') or {})
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def export_root(settings):
+    """Absolute export directory (relative paths are relative to the repo root)"""
+    root = Path(settings['output_dir'])
+    return root if root.is_absolute() else REPO_ROOT / root
+
+def arrow_schema(pa):
+    return pa.schema([
+        ('as_of_date', pa.date32()),
+        ('sku', pa.string()),
+        ('product_name', pa.string()),
+        ('category', pa.string()),
+        ('brand', pa.string()),
+        ('region_code', pa.string()),
+        ('region_name', pa.string()),
+        ('channel_code', pa.string()),
+        ('channel_name', pa.string()),
+        ('current_price', pa.decimal128(18, 4)),
+        ('currency', pa.string()),
+        ('active_discount_type', pa.string()),
+        ('active_discount_value', pa.decimal128(18, 4)),
+        ('net_price', pa.decimal128(18, 4)),
+        ('daily_sales_qty', pa.int64()),
+        ('daily_net_sales', pa.decimal128(38, 2)),
+        ('dq_missing_price_flag', pa.int32()),
+    ])
+
+class PartitionWriter:
+    """Writes one partition's buffered rows as a Parquet or Arrow IPC file"""
+
+    def __init__(self, run_dir, settings):
+        import pyarrow as pa
+        self.pa = pa
+        self.schema = arrow_schema(pa)
+        self.run_dir = run_dir
+        self.format = settings['format']
+        self.compression = settings['compression']
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            self.pq = pq
+        elif self.format != 'arrow':
+            raise ValueError(f"Unknown export format: {self.format} (use parquet or arrow)")
+
+    def write(self, key, rows):
+        as_of_date, region_code, channel_code = key
+        relative = (Path(f"as_of_date={as_of_date.isoformat()}") / f"region_code={region_code}"
+                    / f"channel_code={channel_code}" / f"part-0.{self.format}")
+        path = self.run_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = self.pa.Table.from_pydict(
+            {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)},
+            schema=self.schema
+        )
+        if self.format == 'parquet':
+            self.pq.write_table(table, path, compression=self.compression)
+        else:
+            options = self.pa.ipc.IpcWriteOptions(compression=self.compression)
+            with self.pa.OSFile(str(path), 'wb') as sink:
+                with self.pa.ipc.new_file(sink, self.schema, options=options) as writer:
+                    writer.write_table(table)
+        return {
+            'as_of_date': as_of_date.isoformat(),
+            'region_code': region_code,
+            'channel_code': channel_code,
+            'path': relative.as_posix(),
+            'rows': len(rows),
+            'bytes': path.stat().st_size,
+        }
+
+def export_bi_snapshots(cursor, settings, run_id):
+    """
+    Stream vw_pricing_bi_dataset into partition files for run_id, then publish
+    them by rewriting manifest.json. Only one partition is held in memory.
+    """
+    started = time.perf_counter()
+    root = export_root(settings)
+    run_dir = root / f"run_{run_id}"
+    staging_dir = root / f"run_{run_id}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+
+    writer = PartitionWriter(staging_dir, settings)
+    partitions = []
+    current_key, buffered = None, []
+    cursor.execute(EXPORT_QUERY, (int(settings['days']),))
+    while True:
+        rows = cursor.fetchmany(int(settings['fetch_batch']))
+        if not rows:
+            break
+        for row in rows:
+            key = (row[0], row[5], row[7])
+            if key != current_key and buffered:
+                partitions.append(writer.write(current_key, buffered))
+                buffered = []
+            current_key = key
+            buffered.append(row)
+    if buffered:
+        partitions.append(writer.write(current_key, buffered))
+
+    # Paths in the manifest are relative to output_dir
+    for p in partitions:
+        p['path'] = f"{run_dir.name}/{p['path']}"
+    shutil.rmtree(run_dir, ignore_errors=True)
+    staging_dir.rename(run_dir)
+
+    manifest = {
+        'run_id': run_id,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'format': settings['format'],
+        'compression': settings['compression'],
+        'columns': COLUMNS,
+        'rows': sum(p['rows'] for p in partitions),
+        'bytes': sum(p['bytes'] for p in partitions),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        'partitions': partitions,
+    }
+    manifest_tmp = root / 'manifest.json.tmp'
+    manifest_tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(manifest_tmp, root / 'manifest.json')
+
+    # Drop superseded runs beyond keep_runs
+    runs = sorted(
+        (d for d in root.glob('run_*') if d.is_dir() and d.suffix != '.tmp' and d != run_dir),
+        key=lambda d: d.stat().st_mtime, reverse=True
+    )
+    for old in runs[max(int(settings['keep_runs']) - 1, 0):]:
+        shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+def print_export_result(manifest):
+    """Print the export summary"""
+    print(f"BI snapshot export: {manifest['rows']:,} rows in {len(manifest['partitions']):,} "
+          f"{manifest['format']} partitions ({manifest['bytes']:,} bytes, {manifest['elapsed_ms']} ms)")
+
+def latest_success_run_id(cursor):
+    cursor.execute("""
+        SELECT MAX(run_id)
+        FROM pricing.etl_run_history
+        WHERE pipeline_name = 'pricing_refresh' AND status = 'SUCCESS'
+    """)
+    return cursor.fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description='Export vw_pricing_bi_dataset snapshots to Parquet/Arrow')
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default=None, help='File format')
+    parser.add_argument('--compression', default=None, help='Codec (zstd, lz4, snappy, gzip, ...)')
+    parser.add_argument('--days', type=int, default=None, help='Trailing days to export')
+    parser.add_argument('--output-dir', default=None, help='Export directory')
+    args = parser.parse_args()
+
+    try:
+        config = load_config()
+        settings = get_export_settings(config, {
+            'format': args.format,
+            'compression': args.compression,
+            'days': args.days,
+            'output_dir': args.output_dir,
+        })
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            run_id = latest_success_run_id(cursor)
+            if run_id is None:
+                print("No successful ETL run to export", file=sys.stderr)
+                return 1
+            print(f"Exporting vw_pricing_bi_dataset for run {run_id} to {export_root(settings)}...")
+            print_export_result(export_bi_snapshots(cursor, settings, run_id))
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except ImportError as e:
+        print(f"pyarrow is required for snapshot export: {e}", file=sys.stderr)
+        return 1
+    except FileNotFoundError as e:
+        print(f"Configuration file not found: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
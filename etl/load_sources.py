@@ -4,38 +4,15 @@ Load source data into staging tables
 Supports seed mode and late-arriving data injection
 """
 
-import pyodbc
-import yaml
 import sys
 import argparse
 import subprocess
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
-def load_config(config_path='config.yaml'):
-    """Load configuration from YAML file"""
-    config_file = Path(__file__).parent / config_path
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def get_connection_string(config):
-    """Build SQL Server connection string"""
-    db = config['database']
-    driver = db['driver']
-    server = db['server']
-    port = db['port']
-    database = db['database']
-    username = db['username']
-    password = db['password']
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server},{port};"
-        f"DATABASE={database};"
-        f"UID={username};"
-        f"PWD={password};"
-        f"TrustServerCertificate=yes;"
-    )
+from pricing_db import load_config, connect
 
 def run_seed_sqlcmd(config):
     """Run seed script using sqlcmd (requires SQLCMD mode)"""
@@ -78,7 +55,6 @@ def run_seed_sqlcmd(config):
 
 def run_seed_pyodbc(config):
     """Run seed script using pyodbc (reads and executes SQL file)"""
-    conn_str = get_connection_string(config)
     script_path = Path(__file__).parent.parent / 'sql' / 'seeds' / 'seed_all_no_r.sql'
     
     if not script_path.exists():
@@ -91,7 +67,7 @@ def run_seed_pyodbc(config):
             sql_script = f.read()
         
         print("Connecting to database...")
-        conn = pyodbc.connect(conn_str, autocommit=False)
+        conn = connect(config, autocommit=False)
         cursor = conn.cursor()
         
         try:
@@ -119,11 +95,10 @@ def run_seed_pyodbc(config):
 
 def inject_late_arriving_data(config):
     """Inject late-arriving data into staging tables"""
-    conn_str = get_connection_string(config)
     
     try:
         print("Connecting to database...")
-        conn = pyodbc.connect(conn_str, autocommit=False)
+        conn = connect(config, autocommit=False)
         cursor = conn.cursor()
         
         try:
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Partition maintenance for fact_sales / fact_price_history
+Executes pricing.sp_maintain_partitions with settings from config.yaml (partitioning)
+"""
+
+import pyodbc
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+
+DEFAULTS = {
+    'future_months': 3,
+    'retention_months': None,
+    'hot_months': 2,
+    'rebuild_frag_pct': 30.0,
+}
+
+def get_partition_settings(config, overrides=None):
+    """partitioning settings from config with CLI overrides"""
+    settings = dict(DEFAULTS)
+    settings.update(config.get('partitioning') or {})
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def maintain_partitions(settings):
+    """Run the sliding-window routine and print the actions it took"""
+    try:
+        config = load_config()
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            print(f"Executing pricing.sp_maintain_partitions "
+                  f"(future_months={settings['future_months']}, retention_months={settings['retention_months']}, "
+                  f"hot_months={settings['hot_months']}, rebuild_frag_pct={settings['rebuild_frag_pct']})...")
+            cursor.execute(
+                "EXEC pricing.sp_maintain_partitions @future_months = ?, @retention_months = ?, "
+                "@hot_months = ?, @rebuild_frag_pct = ?",
+                (settings['future_months'], settings['retention_months'],
+                 settings['hot_months'], float(settings['rebuild_frag_pct']))
+            )
+
+            # Skip row counts / nested results until the action list
+            while cursor.description is None:
+                if not cursor.nextset():
+                    break
+            actions = cursor.fetchall() if cursor.description else []
+
+            print("\n=== Partition Maintenance ===")
+            if not actions:
+                print("Nothing to do.")
+            for action, table_name, partition_number, boundary, detail in actions:
+                target = table_name or 'pf_pricing_month'
+                where = f" partition {partition_number}" if partition_number else ''
+                when = f" [{boundary}]" if boundary else ''
+                print(f"{action}: {target}{where}{when} - {detail}")
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except FileNotFoundError as e:
+        print(f"Configuration file not found: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Sliding-window partition maintenance')
+    parser.add_argument('--future-months', type=int, default=None, help='Boundaries to keep ahead of this month')
+    parser.add_argument('--retention-months', type=int, default=None, help='Switch out partitions older than this many months')
+    parser.add_argument('--hot-months', type=int, default=None, help='Recent months eligible for index rebuilds')
+    parser.add_argument('--rebuild-frag-pct', type=float, default=None, help='Fragmentation threshold for rebuilds')
+    args = parser.parse_args()
+
+    settings = get_partition_settings(load_config(), {
+        'future_months': args.future_months,
+        'retention_months': args.retention_months,
+        'hot_months': args.hot_months,
+        'rebuild_frag_pct': args.rebuild_frag_pct,
+    })
+    return maintain_partitions(settings)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Margin stage for fact_margin_impact
+Executes pricing.sp_refresh_margin_impact with settings from config.yaml (margin)
+"""
+
+import pyodbc
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+
+DEFAULTS = {
+    'history_days': 90,
+}
+
+def get_margin_settings(config, overrides=None):
+    """margin settings from config with CLI overrides"""
+    settings = dict(DEFAULTS)
+    settings.update(config.get('margin') or {})
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def refresh_margin_impact(cursor, conn, settings, run_id=None, full=False):
+    """Recompute fact_margin_impact for key-days touched since the last refresh"""
+    cursor.execute(
+        "EXEC pricing.sp_refresh_margin_impact @etl_run_id = ?, @history_days = ?, @full = ?",
+        (run_id, int(settings['history_days']), 1 if full else 0)
+    )
+    row = cursor.fetchone()
+    conn.commit()
+    return row
+
+def print_margin_result(row):
+    """Print the sp_refresh_margin_impact summary row"""
+    if row:
+        print(f"Margin refresh ({row.mode}, {row.window_start} to {row.window_end}): "
+              f"{row.key_days_affected} key-days recomputed, "
+              f"{row.rows_deleted} rows deleted, {row.rows_inserted} rows inserted")
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh fact_margin_impact')
+    parser.add_argument('--history-days', type=int, default=None, help='Days of margin history to keep')
+    parser.add_argument('--full', action='store_true', help='Recompute the whole window instead of changed key-days')
+    args = parser.parse_args()
+
+    try:
+        config = load_config()
+        settings = get_margin_settings(config, {'history_days': args.history_days})
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=False)
+        cursor = conn.cursor()
+
+        try:
+            print(f"Executing pricing.sp_refresh_margin_impact "
+                  f"(history_days={settings['history_days']}, full={args.full})...")
+            print_margin_result(refresh_margin_impact(cursor, conn, settings, full=args.full))
+            return 0
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except FileNotFoundError as e:
+        print(f"Configuration file not found: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
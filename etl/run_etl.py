@@ -5,35 +5,50 @@ Executes pricing.sp_refresh_pricing_mart stored procedure
 """
 
 import pyodbc
-import yaml
 import sys
 import os
 from pathlib import Path
 
-def load_config(config_path='config.yaml'):
-    """Load configuration from YAML file"""
-    config_file = Path(__file__).parent / config_path
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def get_connection_string(config):
-    """Build SQL Server connection string"""
-    db = config['database']
-    driver = db['driver']
-    server = db['server']
-    port = db['port']
-    database = db['database']
-    username = db['username']
-    password = db['password']
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server},{port};"
-        f"DATABASE={database};"
-        f"UID={username};"
-        f"PWD={password};"
-        f"TrustServerCertificate=yes;"
-    )
+from pricing_db import load_config, connect
+from refresh_margins import get_margin_settings, refresh_margin_impact, print_margin_result
+from export_snapshots import get_export_settings, export_bi_snapshots, print_export_result
+
+def snapshot_query_plans(cursor, conn, run_id):
+    """Snapshot Query Store plans/runtime stats for plan regression detection"""
+    try:
+        print("Snapshotting query plans...")
+        cursor.execute("EXEC pricing.sp_snapshot_query_plans @etl_run_id = ?", (run_id,))
+        row = cursor.fetchone()
+        conn.commit()
+        if row:
+            print(f"Plans captured: {row.plans_captured} (capture {row.capture_id})")
+    except pyodbc.Error as e:
+        conn.rollback()
+        print(f"Warning: query plan snapshot skipped: {e}", file=sys.stderr)
+
+def refresh_margins(cursor, conn, config, run_id):
+    """Recompute fact_margin_impact for key-days touched by this run"""
+    try:
+        print("Refreshing margin impact...")
+        print_margin_result(refresh_margin_impact(cursor, conn, get_margin_settings(config), run_id))
+    except pyodbc.Error as e:
+        conn.rollback()
+        print(f"Warning: margin refresh skipped (next run catches up): {e}", file=sys.stderr)
+
+def export_snapshots(cursor, conn, config, run_id):
+    """Write this run's vw_pricing_bi_dataset partitions as Parquet/Arrow files"""
+    settings = get_export_settings(config)
+    if not settings['enabled']:
+        return
+    try:
+        print("Exporting BI snapshots...")
+        print_export_result(export_bi_snapshots(cursor, settings, run_id))
+        conn.commit()
+    except (pyodbc.Error, ImportError, OSError) as e:
+        conn.rollback()
+        print(f"Warning: BI snapshot export skipped: {e}", file=sys.stderr)
 
 def run_etl():
     """Execute ETL pipeline"""
@@ -41,12 +56,9 @@ def run_etl():
         # Load configuration
         config = load_config()
         
-        # Get connection string
-        conn_str = get_connection_string(config)
-        
         # Connect to database
         print("Connecting to database...")
-        conn = pyodbc.connect(conn_str, autocommit=False)
+        conn = connect(config, autocommit=False)
         cursor = conn.cursor()
         
         try:
@@ -74,6 +86,12 @@ def run_etl():
                 print(f"Rows Loaded: {result_dict.get('rows_loaded')}")
                 print(f"Rows Rejected: {result_dict.get('rows_rejected')}")
             
+            # Post-load stages are best effort: the load is already committed
+            run_id = dict(zip(columns, results[-1])).get('run_id') if results else None
+            refresh_margins(cursor, conn, config, run_id)
+            export_snapshots(cursor, conn, config, run_id)
+            snapshot_query_plans(cursor, conn, run_id)
+            
             print("\nETL run completed successfully.")
             return 0
             
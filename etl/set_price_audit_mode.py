@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Price override audit mode for fact_price_history
+Executes pricing.sp_set_price_audit_mode with settings from config.yaml (price_audit)
+"""
+
+import pyodbc
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+
+DEFAULTS = {
+    'mode': 'trigger',
+    'history_retention_months': None,
+}
+
+def get_price_audit_settings(config, overrides=None):
+    """price_audit settings from config with CLI overrides"""
+    settings = dict(DEFAULTS)
+    settings.update(config.get('price_audit') or {})
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def set_price_audit_mode(settings):
+    """Switch the audit mode and print the resulting state"""
+    try:
+        config = load_config()
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            mode = str(settings['mode']).upper()
+            print(f"Executing pricing.sp_set_price_audit_mode "
+                  f"(mode={mode}, history_retention_months={settings['history_retention_months']})...")
+            cursor.execute(
+                "EXEC pricing.sp_set_price_audit_mode @mode = ?, @history_retention_months = ?",
+                (mode, settings['history_retention_months'])
+            )
+
+            while cursor.description is None:
+                if not cursor.nextset():
+                    break
+            row = cursor.fetchone() if cursor.description else None
+            if row is None:
+                print("pricing.fact_price_history not found", file=sys.stderr)
+                return 1
+
+            mode, history_table, history_retention, trigger_enabled = row
+            print("\n=== Price Audit Mode ===")
+            print(f"Mode: {mode}")
+            print(f"Versions table: {history_table or 'n/a'}")
+            print(f"History retention: {history_retention or 'unlimited'}")
+            print(f"trg_log_price_override: {'enabled' if trigger_enabled else 'disabled'}")
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except FileNotFoundError as e:
+        print(f"Configuration file not found: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Switch fact_price_history auditing between trigger and temporal modes')
+    parser.add_argument('--mode', choices=['trigger', 'temporal'], default=None, help='Audit mode')
+    parser.add_argument('--history-retention-months', type=int, default=None,
+                        help='temporal only: months of row versions SQL Server keeps')
+    args = parser.parse_args()
+
+    settings = get_price_audit_settings(load_config(), {
+        'mode': args.mode,
+        'history_retention_months': args.history_retention_months,
+    })
+    return set_price_audit_mode(settings)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Before/after query benchmark runner for performance_proofs
+Executes baseline_query.sql and optimized_query.sql N times after warm-up,
+captures elapsed/CPU time and logical reads, and regenerates the timings report
+"""
+
+import pyodbc
+import sys
+import re
+import json
+import math
+import time
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+
+PROOFS_DIR = Path(__file__).parent
+BASELINE_SQL = PROOFS_DIR / 'baseline_query.sql'
+OPTIMIZED_SQL = PROOFS_DIR / 'optimized_query.sql'
+REPORT_JSON = PROOFS_DIR / 'benchmark_report.json'
+REPORT_MD = PROOFS_DIR / 'before_after_timings.md'
+
+# Session-level counters; deltas around a batch give the cost of that batch
+SESSION_COUNTERS_QUERY = """
+    SELECT cpu_time, logical_reads, reads, total_elapsed_time
+    FROM sys.dm_exec_sessions
+    WHERE session_id = @@SPID
+"""
+
+def load_batches(script_path):
+    """Split a SQL script on GO separators, dropping USE batches"""
+    sql_script = script_path.read_text(encoding='utf-8')
+    batches = [b.strip() for b in re.split(r'^\s*GO\s*$', sql_script, flags=re.MULTILINE | re.IGNORECASE)]
+    return [b for b in batches if b and not re.match(r'^USE\s+\w+\s*;?$', b, re.IGNORECASE)]
+
+def extract_parameters(script_path):
+    """Return DECLAREd parameters and their initializers from a query script"""
+    sql_script = script_path.read_text(encoding='utf-8')
+    return {
+        name: value.strip()
+        for name, value in re.findall(r'DECLARE\s+@(\w+)\s+[\w()]+\s*=\s*(.+?);', sql_script, re.IGNORECASE)
+    }
+
+def read_session_counters(cursor):
+    """Snapshot cumulative CPU/reads counters for the current session"""
+    cursor.execute(SESSION_COUNTERS_QUERY)
+    cpu_time, logical_reads, physical_reads, _ = cursor.fetchone()
+    return cpu_time, logical_reads, physical_reads
+
+def execute_batches(cursor, batches):
+    """Execute batches and drain all result sets; returns rows in the last result set"""
+    row_count = 0
+    for batch in batches:
+        cursor.execute(batch)
+        while True:
+            if cursor.description is not None:
+                row_count = len(cursor.fetchall())
+            if not cursor.nextset():
+                break
+    return row_count
+
+def run_once(cursor, batches):
+    """Execute a query script once and measure elapsed, CPU and reads"""
+    cpu_before, reads_before, phys_before = read_session_counters(cursor)
+    started = time.perf_counter()
+    row_count = execute_batches(cursor, batches)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    cpu_after, reads_after, phys_after = read_session_counters(cursor)
+    return {
+        'elapsed_ms': round(elapsed_ms, 2),
+        'cpu_ms': cpu_after - cpu_before,
+        'logical_reads': reads_after - reads_before,
+        'physical_reads': phys_after - phys_before,
+        'row_count': row_count,
+    }
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+def median(values):
+    """Median of a list of numbers"""
+    ordered = sorted(values)
+    n = len(ordered)
+    if n == 0:
+        return None
+    mid = n // 2
+    return ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+def summarize(samples):
+    """Median/p95/min/max per metric over measured runs"""
+    summary = {}
+    for metric in ('elapsed_ms', 'cpu_ms', 'logical_reads', 'physical_reads'):
+        values = [s[metric] for s in samples]
+        summary[metric] = {
+            'median': median(values),
+            'p95': percentile(values, 95),
+            'min': min(values),
+            'max': max(values),
+        }
+    summary['row_count'] = samples[-1]['row_count'] if samples else 0
+    return summary
+
+def benchmark_query(cursor, script_path, runs, warmup):
+    """Warm up, then run a query script N times and summarize"""
+    batches = load_batches(script_path)
+    for _ in range(warmup):
+        execute_batches(cursor, batches)
+    samples = [run_once(cursor, batches) for _ in range(runs)]
+    return {
+        'query': script_path.name,
+        'parameters': extract_parameters(script_path),
+        'samples': samples,
+        'summary': summarize(samples),
+    }
+
+def pct_change(before, after):
+    """Percentage improvement from before to after (positive = faster/cheaper)"""
+    if not before:
+        return None
+    return round((before - after) / before * 100, 1)
+
+def find_regressions(report, previous, max_regression_pct):
+    """Compare optimized medians against the baseline and the previous report"""
+    regressions = []
+    baseline = report['baseline']['summary']
+    optimized = report['optimized']['summary']
+
+    for metric in ('elapsed_ms', 'cpu_ms', 'logical_reads'):
+        base_value = baseline[metric]['median']
+        opt_value = optimized[metric]['median']
+        if base_value and opt_value > base_value * (1 + max_regression_pct / 100.0):
+            regressions.append(f"optimized {metric} median {opt_value} exceeds baseline {base_value} by more than {max_regression_pct}%")
+
+    if previous:
+        prev = previous.get('optimized', {}).get('summary', {})
+        for metric in ('elapsed_ms', 'logical_reads'):
+            prev_value = (prev.get(metric) or {}).get('median')
+            opt_value = optimized[metric]['median']
+            if prev_value and opt_value > prev_value * (1 + max_regression_pct / 100.0):
+                regressions.append(f"optimized {metric} median {opt_value} regressed from previous run {prev_value} by more than {max_regression_pct}%")
+
+    if baseline['row_count'] != optimized['row_count']:
+        regressions.append(f"row count mismatch: baseline {baseline['row_count']} vs optimized {optimized['row_count']}")
+
+    return regressions
+
+def fmt(value):
+    """Format a number for the markdown report"""
+    if value is None:
+        return 'n/a'
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:,.1f}"
+    return f"{int(value):,}"
+
+def render_markdown(report):
+    """Regenerate before_after_timings.md from a benchmark report"""
+    baseline = report['baseline']
+    optimized = report['optimized']
+    b, o = baseline['summary'], optimized['summary']
+    params = '\n'.join(f"- @{name}: `{value}`" for name, value in baseline['parameters'].items())
+
+    def results_block(summary):
+        return (
+            f"| Metric | Median | p95 | Min | Max |\n"
+            f"|--------|--------|-----|-----|-----|\n"
+            f"| Elapsed Time (ms) | {fmt(summary['elapsed_ms']['median'])} | {fmt(summary['elapsed_ms']['p95'])} | {fmt(summary['elapsed_ms']['min'])} | {fmt(summary['elapsed_ms']['max'])} |\n"
+            f"| CPU Time (ms) | {fmt(summary['cpu_ms']['median'])} | {fmt(summary['cpu_ms']['p95'])} | {fmt(summary['cpu_ms']['min'])} | {fmt(summary['cpu_ms']['max'])} |\n"
+            f"| Logical Reads | {fmt(summary['logical_reads']['median'])} | {fmt(summary['logical_reads']['p95'])} | {fmt(summary['logical_reads']['min'])} | {fmt(summary['logical_reads']['max'])} |\n"
+        )
+
+    def improvement(metric, unit):
+        before, after = b[metric]['median'], o[metric]['median']
+        return f"{fmt(pct_change(before, after))}% ({fmt(before)}{unit} → {fmt(after)}{unit})"
+
+    status = 'PASS' if not report['regressions'] else 'FAIL'
+    regressions = '\n'.join(f"- {r}" for r in report['regressions']) or '- None'
+
+    return f"""# Performance Improvement Documentation
+
+> Generated by `performance_proofs/run_benchmark.py` — do not edit by hand.
+> Machine-readable results: `benchmark_report.json`
+
+## Environment
+
+- **SQL Server Version**: {report['environment']['server_version']}
+- **Database**: {report['environment']['database']}
+- **Test Date**: {report['generated_at']}
+
+## Measurement Methodology
+
+Each query is executed **{report['warmup']}** time(s) to warm the buffer cache, then measured over **{report['runs']}** runs on the same connection.
+
+- **Elapsed Time**: client-side wall time per run
+- **CPU Time / Logical Reads**: deltas of `sys.dm_exec_sessions` counters for the benchmark session
+- Medians are reported as the headline figure; p95 shows run-to-run stability
+
+## Baseline Performance
+
+**Query**: `{baseline['query']}`
+
+**Parameters Used**:
+{params}
+
+{results_block(b)}
+## Indexes Added
+
+Created via `sql/indexes/index_changes.sql`:
+
+1. **IX_fact_sales_perf_date_region_channel**
+   - Columns: (sale_date, region_code, channel_code, sku)
+   - Included: (qty, net_sales)
+
+2. **IX_fact_discount_events_perf_region_channel_sku_dates**
+   - Columns: (region_code, channel_code, sku, start_date, end_date)
+   - Included: (discount_value, discount_type)
+
+3. **IX_fact_price_history_perf_region_channel_sku_effective**
+   - Columns: (region_code, channel_code, sku, effective_start, effective_end)
+   - Included: (price, currency, created_at)
+
+## Optimized Performance
+
+**Query**: `{optimized['query']}`
+
+**Parameters Used**: (Same as baseline)
+
+{results_block(o)}
+## Performance Summary
+
+**Improvement (medians)**:
+- **Elapsed Time**: {improvement('elapsed_ms', ' ms')}
+- **CPU Time**: {improvement('cpu_ms', ' ms')}
+- **Logical Reads**: {improvement('logical_reads', '')}
+
+**Regression Gate** (max regression {report['max_regression_pct']}%): {status}
+{regressions}
+
+### Why It Improved
+
+The optimized query improved performance through several key changes: (1) Replaced non-sargable VARCHAR casts with direct DATE comparisons, enabling index seek operations instead of scans. (2) Pre-aggregated sales data in a CTE to reduce join complexity and leverage the covering index on fact_sales. (3) Used window functions (ROW_NUMBER) with proper ordering instead of multiple LEFT JOINs with complex WHERE conditions, allowing SQL Server to efficiently select the most recent price and highest discount. (4) The new indexes provide covering index support, eliminating key lookups by including frequently accessed columns (qty, net_sales, price, discount_value) in the index leaf pages.
+
+## Verification
+
+**Result Set Comparison**: Run `verify_results.sql` to compare result sets row by row.
+
+**Row Count**: baseline {fmt(b['row_count'])} rows, optimized {fmt(o['row_count'])} rows
+"""
+
+def run_benchmark(runs, warmup, max_regression_pct, write_markdown):
+    """Benchmark baseline vs optimized queries and write reports"""
+    try:
+        config = load_config()
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT CAST(SERVERPROPERTY('ProductVersion') AS NVARCHAR(128)), CAST(SERVERPROPERTY('Edition') AS NVARCHAR(128)), DB_NAME()")
+            version, edition, database = cursor.fetchone()
+
+            print(f"Benchmarking {BASELINE_SQL.name} ({warmup} warm-up, {runs} runs)...")
+            baseline = benchmark_query(cursor, BASELINE_SQL, runs, warmup)
+            print(f"Benchmarking {OPTIMIZED_SQL.name} ({warmup} warm-up, {runs} runs)...")
+            optimized = benchmark_query(cursor, OPTIMIZED_SQL, runs, warmup)
+        finally:
+            cursor.close()
+            conn.close()
+
+        previous = None
+        if REPORT_JSON.exists():
+            with open(REPORT_JSON, 'r') as f:
+                previous = json.load(f)
+
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'environment': {
+                'server_version': f"SQL Server {version} ({edition})",
+                'database': database,
+            },
+            'runs': runs,
+            'warmup': warmup,
+            'max_regression_pct': max_regression_pct,
+            'baseline': baseline,
+            'optimized': optimized,
+            'improvement_pct': {
+                metric: pct_change(baseline['summary'][metric]['median'], optimized['summary'][metric]['median'])
+                for metric in ('elapsed_ms', 'cpu_ms', 'logical_reads')
+            },
+        }
+        report['regressions'] = find_regressions(report, previous, max_regression_pct)
+
+        with open(REPORT_JSON, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if write_markdown:
+            REPORT_MD.write_text(render_markdown(report), encoding='utf-8')
+
+        print("\n=== Benchmark Results (medians) ===")
+        for label, result in (('Baseline', baseline), ('Optimized', optimized)):
+            s = result['summary']
+            print(f"{label}: elapsed {fmt(s['elapsed_ms']['median'])} ms (p95 {fmt(s['elapsed_ms']['p95'])}), "
+                  f"CPU {fmt(s['cpu_ms']['median'])} ms, logical reads {fmt(s['logical_reads']['median'])}, "
+                  f"rows {s['row_count']}")
+        print(f"Improvement: {report['improvement_pct']}")
+        print(f"\nReport saved to: {REPORT_JSON}")
+        if write_markdown:
+            print(f"Markdown saved to: {REPORT_MD}")
+
+        if report['regressions']:
+            print("\nREGRESSION DETECTED - Exiting with code 2")
+            for r in report['regressions']:
+                print(f"  {r}")
+            return 2
+        return 0
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except FileNotFoundError as e:
+        print(f"File not found: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark baseline vs optimized queries')
+    parser.add_argument('--runs', type=int, default=10, help='Measured runs per query (default: 10)')
+    parser.add_argument('--warmup', type=int, default=2, help='Warm-up runs per query (default: 2)')
+    parser.add_argument('--max-regression-pct', type=float, default=10.0,
+                       help='Fail if optimized medians exceed baseline/previous by more than this percent (default: 10)')
+    parser.add_argument('--no-markdown', action='store_true', help='Do not regenerate before_after_timings.md')
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+    return run_benchmark(args.runs, max(args.warmup, 0), args.max_regression_pct, not args.no_markdown)
+
+if __name__ == '__main__':
+    sys.exit(main())
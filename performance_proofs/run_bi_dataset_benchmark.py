@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+BI dataset benchmark: vw_pricing_bi_dataset vs fn_pricing_bi_dataset
+Times the /pricing/bi-snapshot slice (one date, region and channel) and a
+7-day range through the view with WHERE filters and through the inline TVF
+with the same values as arguments, plus a date outside the view's 60 days
+that only the TVF can answer
+"""
+
+import pyodbc
+import sys
+import json
+import time
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+from run_benchmark import read_session_counters, summarize, pct_change, fmt
+
+PROOFS_DIR = Path(__file__).parent
+REPORT_JSON = PROOFS_DIR / 'bi_dataset_benchmark.json'
+REPORT_MD = PROOFS_DIR / 'bi_dataset_timings.md'
+
+# Each source folds the slice into one row so the view and the TVF can be
+# checked for identical results without shipping the rows to the client
+FOLD = """
+    SELECT COUNT_BIG(*) AS row_count, SUM(current_price) AS price, SUM(net_price) AS net_price,
+           SUM(daily_net_sales) AS net_sales, SUM(dq_missing_price_flag) AS missing
+    FROM {source}
+"""
+
+VARIANTS = {
+    'view': 'pricing.vw_pricing_bi_dataset WHERE as_of_date BETWEEN ? AND ? AND region_code = ? AND channel_code = ?',
+    'tvf': 'pricing.fn_pricing_bi_dataset(?, ?, ?, ?)',
+}
+
+def cases(today):
+    """(name, description, from_date, to_date, variants compared)"""
+    historical = today - timedelta(days=180)
+    return [
+        ('snapshot_today', 'One day, one region/channel (what a /pricing/bi-snapshot request reads)',
+         today, today, ['view', 'tvf']),
+        ('range_7d', 'Last 7 days, one region/channel',
+         today - timedelta(days=6), today, ['view', 'tvf']),
+        ('historical_day', f'{historical.isoformat()}: outside the view\'s 60-day series (TVF only)',
+         historical, historical, ['tvf']),
+    ]
+
+def sample_key(cursor):
+    """Region/channel with the most current prices"""
+    cursor.execute("""
+        SELECT TOP (1) region_code, channel_code
+        FROM pricing.fact_price_history
+        WHERE effective_end IS NULL
+        GROUP BY region_code, channel_code
+        ORDER BY COUNT_BIG(*) DESC
+    """)
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("pricing.fact_price_history is empty; run the ETL first")
+    return tuple(row)
+
+def run_once(cursor, sql, params):
+    """Execute one fold and measure elapsed, CPU and reads"""
+    cpu_before, reads_before, phys_before = read_session_counters(cursor)
+    started = time.perf_counter()
+    cursor.execute(sql, params)
+    row_count, price, net_price, net_sales, missing = cursor.fetchone()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    cpu_after, reads_after, phys_after = read_session_counters(cursor)
+    return {
+        'elapsed_ms': round(elapsed_ms, 2),
+        'cpu_ms': cpu_after - cpu_before,
+        'logical_reads': reads_after - reads_before,
+        'physical_reads': phys_after - phys_before,
+        'row_count': row_count,
+        'checksum': f"{row_count}:{price}:{net_price}:{net_sales}:{missing}",
+    }
+
+def benchmark_case(cursor, from_date, to_date, key, variants, runs, warmup):
+    """Time each variant over one slice"""
+    params = (from_date, to_date) + key
+    results = {}
+    for name in variants:
+        sql = FOLD.format(source=VARIANTS[name])
+        for _ in range(warmup):
+            run_once(cursor, sql, params)
+        samples = [run_once(cursor, sql, params) for _ in range(runs)]
+        results[name] = {
+            'samples': samples,
+            'summary': summarize(samples),
+            'checksum': samples[-1]['checksum'],
+        }
+    return results
+
+def render_markdown(report):
+    """Write bi_dataset_timings.md from the benchmark report"""
+    key = report['sample_key']
+    lines = [
+        "# BI Dataset: View vs Inline TVF",
+        "",
+        "> Generated by `performance_proofs/run_bi_dataset_benchmark.py` — do not edit by hand.",
+        "> Machine-readable results: `bi_dataset_benchmark.json`",
+        "",
+        "## Environment",
+        "",
+        f"- **SQL Server Version**: {report['environment']['server_version']}",
+        f"- **Slice**: region `{key['region_code']}`, channel `{key['channel_code']}`",
+        f"- **Test Date**: {report['generated_at']}",
+        f"- **Runs**: {report['warmup']} warm-up + {report['runs']} measured per variant (medians shown)",
+        "",
+        "## Variants",
+        "",
+        "- **view**: `pricing.vw_pricing_bi_dataset` filtered with WHERE (the previous /pricing/bi-snapshot query)",
+        "- **tvf**: `pricing.fn_pricing_bi_dataset(@from_date, @to_date, @region_code, @channel_code)`",
+        "",
+    ]
+    for case_name, case in report['cases'].items():
+        lines += [
+            f"## {case_name}",
+            "",
+            case['description'],
+            "",
+            "| Variant | Elapsed (ms) | CPU (ms) | Logical Reads | Rows |",
+            "|---------|--------------|----------|---------------|------|",
+        ]
+        for variant, result in case['variants'].items():
+            s = result['summary']
+            lines.append(
+                f"| {variant} | {fmt(s['elapsed_ms']['median'])} | {fmt(s['cpu_ms']['median'])} | "
+                f"{fmt(s['logical_reads']['median'])} | {fmt(s['row_count'])} |"
+            )
+        if case['tvf_improvement_pct']:
+            lines += [
+                "",
+                f"TVF vs view: elapsed {fmt(case['tvf_improvement_pct']['elapsed_ms'])}%, "
+                f"CPU {fmt(case['tvf_improvement_pct']['cpu_ms'])}%, "
+                f"logical reads {fmt(case['tvf_improvement_pct']['logical_reads'])}%",
+            ]
+        lines.append("")
+    mismatches = '\n'.join(f"- {m}" for m in report['mismatches']) or '- None (view and TVF return identical slices)'
+    lines += ["## Result Check", "", mismatches, ""]
+    return '\n'.join(lines)
+
+def run_bi_dataset_benchmark(runs, warmup, write_markdown):
+    """Benchmark the BI dataset view against the inline TVF"""
+    try:
+        config = load_config()
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT CAST(SERVERPROPERTY('ProductVersion') AS NVARCHAR(128)), CAST(SERVERPROPERTY('Edition') AS NVARCHAR(128)), CAST(GETDATE() AS DATE)")
+            version, edition, today = cursor.fetchone()
+            if not isinstance(today, date):
+                today = datetime.strptime(str(today), '%Y-%m-%d').date()
+            key = sample_key(cursor)
+
+            results = {}
+            for case_name, description, from_date, to_date, variants in cases(today):
+                print(f"Benchmarking {case_name} ({warmup} warm-up, {runs} runs per variant)...")
+                timed = benchmark_case(cursor, from_date, to_date, key, variants, runs, warmup)
+                results[case_name] = {
+                    'description': description,
+                    'from_date': from_date.isoformat(),
+                    'to_date': to_date.isoformat(),
+                    'variants': timed,
+                    'tvf_improvement_pct': {
+                        metric: pct_change(timed['view']['summary'][metric]['median'],
+                                           timed['tvf']['summary'][metric]['median'])
+                        for metric in ('elapsed_ms', 'cpu_ms', 'logical_reads')
+                    } if 'view' in timed else None,
+                }
+        finally:
+            cursor.close()
+            conn.close()
+
+        mismatches = [
+            f"{case_name}: " + ', '.join(f"{v}={r['checksum']}" for v, r in case['variants'].items())
+            for case_name, case in results.items()
+            if len({r['checksum'] for r in case['variants'].values()}) > 1
+        ]
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'environment': {'server_version': f"SQL Server {version} ({edition})"},
+            'sample_key': {'region_code': key[0], 'channel_code': key[1]},
+            'runs': runs,
+            'warmup': warmup,
+            'cases': results,
+            'mismatches': mismatches,
+        }
+
+        with open(REPORT_JSON, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if write_markdown:
+            REPORT_MD.write_text(render_markdown(report), encoding='utf-8')
+
+        print("\n=== BI Dataset Benchmark (median elapsed ms) ===")
+        for case_name, case in results.items():
+            timings = ', '.join(f"{v} {fmt(r['summary']['elapsed_ms']['median'])}" for v, r in case['variants'].items())
+            print(f"{case_name}: {timings}")
+        print(f"\nReport saved to: {REPORT_JSON}")
+
+        if mismatches:
+            print("\nRESULT MISMATCH BETWEEN VIEW AND TVF - Exiting with code 2")
+            for m in mismatches:
+                print(f"  {m}")
+            return 2
+        return 0
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vw_pricing_bi_dataset against fn_pricing_bi_dataset')
+    parser.add_argument('--runs', type=int, default=5, help='Measured runs per variant (default: 5)')
+    parser.add_argument('--warmup', type=int, default=1, help='Warm-up runs per variant (default: 1)')
+    parser.add_argument('--no-markdown', action='store_true', help='Do not write bi_dataset_timings.md')
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+    return run_bi_dataset_benchmark(args.runs, max(args.warmup, 0), not args.no_markdown)
+
+if __name__ == '__main__':
+    sys.exit(main())
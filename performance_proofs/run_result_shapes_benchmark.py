@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Result shape benchmark for pricing_db.results
+Loads the same price history extract (the sp_get_price_history columns) as
+fetch_all dicts, a shared-header tuple list, columns (NumPy and plain lists)
+and a lazy fetchmany iterator, then sums price over it the way a consumer
+would. Reports retained and peak Python heap bytes per row (tracemalloc) and
+CPU microseconds per row; --synthetic needs no database.
+"""
+
+import pyodbc
+import sys
+import json
+import random
+import time
+import tracemalloc
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connection, shape_result, to_columns, iter_cursor
+from pricing_db.results import np
+from run_benchmark import pct_change, fmt
+
+PROOFS_DIR = Path(__file__).parent
+REPORT_JSON = PROOFS_DIR / 'result_shapes_benchmark.json'
+REPORT_MD = PROOFS_DIR / 'result_shapes_timings.md'
+
+COLUMNS = ['sku', 'region_code', 'channel_code', 'price', 'currency', 'effective_start', 'effective_end']
+
+SOURCE_QUERY = f"""
+    SELECT TOP (?) {', '.join(COLUMNS)}
+    FROM pricing.fact_price_history
+    ORDER BY sku, region_code, channel_code, effective_start
+"""
+
+PRICE = COLUMNS.index('price')
+
+def synthetic_rows(count, seed=42):
+    """Lazily generated rows with the types and value spread of fact_price_history"""
+    rng = random.Random(seed)
+    regions = ['NE', 'SE', 'MW', 'SW', 'W', 'Central']
+    channels = ['ONLINE', 'RETAIL', 'DIST', 'DIRECT']
+    start = date.today() - timedelta(days=730)
+    for i in range(count):
+        effective_start = start + timedelta(days=(i * 7) % 730)
+        yield (
+            f"SKU-{10000 + i // 24}",
+            regions[i % len(regions)],
+            channels[(i // len(regions)) % len(channels)],
+            Decimal(rng.randint(500, 99999)).scaleb(-2).quantize(Decimal('0.0001')),
+            'USD',
+            effective_start,
+            None if i % 5 == 0 else effective_start + timedelta(days=6),
+        )
+
+def database_rows(count):
+    """Lazily fetched rows of the extract (fetchmany batches)"""
+    with connection(load_config()) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SOURCE_QUERY, (count,))
+            yield from iter_cursor(cursor)
+        finally:
+            cursor.close()
+
+def variants():
+    """Shape name -> (build from a row iterator, consume: sum of price)"""
+    shapes = {
+        'dicts': (lambda rows: shape_result(COLUMNS, list(rows), 'dicts'),
+                  lambda result: sum(r['price'] for r in result)),
+        'tuples': (lambda rows: shape_result(COLUMNS, list(rows), 'tuples'),
+                   lambda result: sum(r[PRICE] for r in result.rows)),
+    }
+    if np is not None:
+        shapes['columns (numpy)'] = (lambda rows: shape_result(COLUMNS, list(rows), 'columns'),
+                                     lambda result: float(result['price'].sum()))
+    shapes['columns (lists)'] = (lambda rows: to_columns(COLUMNS, list(rows), use_numpy=False),
+                                 lambda result: sum(result['price']))
+    # stream_rows: nothing is materialized, rows are summed as fetchmany returns them
+    shapes['iterator'] = (lambda rows: rows,
+                          lambda result: sum(r[PRICE] for r in result))
+    return shapes
+
+def measure_memory(build, consume, source):
+    """Traced bytes held by the built result, and the peak while building and consuming it"""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build(source())
+        retained, _ = tracemalloc.get_traced_memory()
+        consume(result)
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return retained - before, peak - before
+
+def cpu_us(build, consume, source, runs):
+    """Median process CPU microseconds to build and consume (fetching/generating rows excluded)"""
+    samples = []
+    for _ in range(runs):
+        rows = list(source())
+        started = time.process_time()
+        consume(build(iter(rows)))
+        samples.append((time.process_time() - started) * 1_000_000)
+        del rows
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def run_result_shapes_benchmark(source, row_count, runs):
+    results = {}
+    for name, (build, consume) in variants().items():
+        print(f"Measuring {name}...")
+        retained, peak = measure_memory(build, consume, source)
+        results[name] = {
+            'cpu_us_per_row': round(cpu_us(build, consume, source, runs) / row_count, 3),
+            'retained_bytes_per_row': round(retained / row_count, 1),
+            'peak_bytes_per_row': round(peak / row_count, 1),
+        }
+    baseline = results['dicts']
+    for r in results.values():
+        r['peak_vs_dicts_pct'] = pct_change(baseline['peak_bytes_per_row'], r['peak_bytes_per_row'])
+        r['cpu_vs_dicts_pct'] = pct_change(baseline['cpu_us_per_row'], r['cpu_us_per_row'])
+    return results
+
+def render_markdown(report):
+    """Write result_shapes_timings.md from the benchmark report"""
+    lines = [
+        "# fetch_all Result Shapes: Memory and CPU per Row",
+        "",
+        "> Generated by `performance_proofs/run_result_shapes_benchmark.py` — do not edit by hand.",
+        "> Machine-readable results: `result_shapes_benchmark.json`",
+        "",
+        "## Environment",
+        "",
+        f"- **Rows**: {fmt(report['rows'])} from {report['source']} ({', '.join(COLUMNS)})",
+        f"- **NumPy**: {report['numpy'] or 'not installed'}",
+        f"- **Test Date**: {report['generated_at']}",
+        f"- **Runs**: median CPU of {report['runs']} runs; memory from tracemalloc (Python heap)",
+        "",
+        "Each variant builds the shape from the fetched rows and sums `price` over it. Retained is what",
+        "the built result holds; peak includes building and consuming it. \"vs dicts\" is the saving",
+        "relative to the default list of dicts (positive = less).",
+        "",
+        "| Shape | CPU (µs / row) | Peak bytes / row | Retained bytes / row | Peak vs dicts | CPU vs dicts |",
+        "|-------|----------------|------------------|----------------------|---------------|--------------|",
+    ]
+    for name, r in report['variants'].items():
+        lines.append(
+            f"| {name} | {r['cpu_us_per_row']} | {fmt(r['peak_bytes_per_row'])} | {fmt(r['retained_bytes_per_row'])} | "
+            f"{fmt(r['peak_vs_dicts_pct'])}% | {fmt(r['cpu_vs_dicts_pct'])}% |"
+        )
+    lines.append("")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch_all result shapes (memory and CPU per row)')
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows to load (default: 100,000)')
+    parser.add_argument('--runs', type=int, default=5, help='Measured runs per variant (default: 5)')
+    parser.add_argument('--synthetic', action='store_true', help='Generate rows instead of reading fact_price_history')
+    parser.add_argument('--no-markdown', action='store_true', help='Do not write result_shapes_timings.md')
+    args = parser.parse_args()
+
+    if args.runs < 1 or args.rows < 1:
+        parser.error('--rows and --runs must be at least 1')
+
+    try:
+        if args.synthetic:
+            source, label = (lambda: synthetic_rows(args.rows)), 'synthetic rows'
+        else:
+            source, label = (lambda: database_rows(args.rows)), 'pricing.fact_price_history'
+        row_count = sum(1 for _ in source())
+        if not row_count:
+            print("No rows to load", file=sys.stderr)
+            return 1
+
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'rows': row_count,
+            'source': label,
+            'numpy': np.__version__ if np is not None else None,
+            'runs': args.runs,
+            'variants': run_result_shapes_benchmark(source, row_count, args.runs),
+        }
+
+        with open(REPORT_JSON, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if not args.no_markdown:
+            REPORT_MD.write_text(render_markdown(report), encoding='utf-8')
+
+        print(f"\n=== Result Shape Benchmark ({fmt(row_count)} rows) ===")
+        for name, r in report['variants'].items():
+            print(f"{name}: {r['cpu_us_per_row']} us/row, peak {fmt(r['peak_bytes_per_row'])} B/row, "
+                  f"retained {fmt(r['retained_bytes_per_row'])} B/row")
+        print(f"\nReport saved to: {REPORT_JSON}")
+        return 0
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+vw_sales_daily aggregation benchmark: rowstore vs columnstore
+Builds a synthetic bench.fact_sales (10M rows by default) with the same
+indexes as pricing.fact_sales, then times the vw_sales_daily GROUP BY shapes
+forced onto IX_fact_sales_perf_date_region_channel and NCCI_fact_sales_daily
+"""
+
+import pyodbc
+import sys
+import re
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing_db import load_config, connect
+from run_benchmark import load_batches, read_session_counters, summarize, pct_change, fmt
+
+PROOFS_DIR = Path(__file__).parent
+SETUP_SQL = PROOFS_DIR / 'sales_daily_setup.sql'
+REPORT_JSON = PROOFS_DIR / 'sales_daily_benchmark.json'
+REPORT_MD = PROOFS_DIR / 'sales_daily_timings.md'
+
+# Each shape aggregates like vw_sales_daily, then folds the groups into one
+# row so variants can be checked for identical results without shipping
+# millions of rows to the client
+SHAPES = {
+    'bi_snapshot_day': {
+        'description': 'One day, one region/channel (what a /pricing/bi-snapshot request reads)',
+        'sql': """
+            SELECT COUNT_BIG(*) AS groups, SUM(daily_sales_qty) AS qty, SUM(daily_net_sales) AS net_sales
+            FROM (
+                SELECT sale_date, sku, region_code, channel_code,
+                       SUM(qty) AS daily_sales_qty, SUM(net_sales) AS daily_net_sales
+                FROM bench.fact_sales {hint}
+                WHERE sale_date = DATEADD(DAY, -1, CAST(GETDATE() AS DATE))
+                    AND region_code = ? AND channel_code = ?
+                GROUP BY sale_date, sku, region_code, channel_code
+            ) d
+            {option}
+        """,
+        'params': 'key',
+    },
+    'range_60d': {
+        'description': '60-day window, all keys (the vw_pricing_bi_dataset date series)',
+        'sql': """
+            SELECT COUNT_BIG(*) AS groups, SUM(daily_sales_qty) AS qty, SUM(daily_net_sales) AS net_sales
+            FROM (
+                SELECT sale_date, sku, region_code, channel_code,
+                       SUM(qty) AS daily_sales_qty, SUM(net_sales) AS daily_net_sales
+                FROM bench.fact_sales {hint}
+                WHERE sale_date >= DATEADD(DAY, -60, CAST(GETDATE() AS DATE))
+                GROUP BY sale_date, sku, region_code, channel_code
+            ) d
+            {option}
+        """,
+        'params': None,
+    },
+    'full_table': {
+        'description': 'Whole table (unfiltered vw_sales_daily)',
+        'sql': """
+            SELECT COUNT_BIG(*) AS groups, SUM(daily_sales_qty) AS qty, SUM(daily_net_sales) AS net_sales
+            FROM (
+                SELECT sale_date, sku, region_code, channel_code,
+                       SUM(qty) AS daily_sales_qty, SUM(net_sales) AS daily_net_sales
+                FROM bench.fact_sales {hint}
+                GROUP BY sale_date, sku, region_code, channel_code
+            ) d
+            {option}
+        """,
+        'params': None,
+    },
+}
+
+VARIANTS = {
+    # Row mode on the covering rowstore index: the pre-columnstore behaviour
+    'rowstore': {
+        'hint': 'WITH (INDEX(IX_fact_sales_perf_date_region_channel))',
+        'option': "OPTION (USE HINT('DISALLOW_BATCH_MODE'))",
+    },
+    'columnstore': {
+        'hint': 'WITH (INDEX(NCCI_fact_sales_daily))',
+        'option': '',
+    },
+    # Whatever the optimizer picks with both indexes available
+    'optimizer': {
+        'hint': '',
+        'option': '',
+    },
+}
+
+def prepare_bench_table(cursor, rows):
+    """Create/populate bench.fact_sales with the requested row count"""
+    batches = load_batches(SETUP_SQL)
+    batches = [re.sub(r'(DECLARE @target_rows BIGINT = )\d+;', rf'\g<1>{int(rows)};', b) for b in batches]
+    bench_rows = None
+    for batch in batches:
+        cursor.execute(batch)
+        while True:
+            if cursor.description is not None:
+                bench_rows = cursor.fetchone()[0]
+            if not cursor.nextset():
+                break
+    return bench_rows
+
+def sample_key(cursor):
+    """Busiest region/channel in the bench table"""
+    cursor.execute("""
+        SELECT TOP (1) region_code, channel_code
+        FROM bench.fact_sales
+        GROUP BY region_code, channel_code
+        ORDER BY COUNT_BIG(*) DESC
+    """)
+    return tuple(cursor.fetchone())
+
+def run_once(cursor, sql, params):
+    """Execute one aggregation and measure elapsed, CPU and reads"""
+    cpu_before, reads_before, phys_before = read_session_counters(cursor)
+    started = time.perf_counter()
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+    groups, qty, net_sales = cursor.fetchone()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    cpu_after, reads_after, phys_after = read_session_counters(cursor)
+    return {
+        'elapsed_ms': round(elapsed_ms, 2),
+        'cpu_ms': cpu_after - cpu_before,
+        'logical_reads': reads_after - reads_before,
+        'physical_reads': phys_after - phys_before,
+        'row_count': groups,
+        'checksum': f"{groups}:{qty}:{net_sales}",
+    }
+
+def benchmark_shape(cursor, shape, key, runs, warmup):
+    """Time every variant of one query shape"""
+    params = key if shape['params'] == 'key' else None
+    results = {}
+    for name, variant in VARIANTS.items():
+        sql = shape['sql'].format(**variant)
+        for _ in range(warmup):
+            run_once(cursor, sql, params)
+        samples = [run_once(cursor, sql, params) for _ in range(runs)]
+        results[name] = {
+            'samples': samples,
+            'summary': summarize(samples),
+            'checksum': samples[-1]['checksum'],
+        }
+    return results
+
+def render_markdown(report):
+    """Write sales_daily_timings.md from the benchmark report"""
+    lines = [
+        "# vw_sales_daily: Rowstore vs Columnstore",
+        "",
+        "> Generated by `performance_proofs/run_sales_daily_benchmark.py` — do not edit by hand.",
+        "> Machine-readable results: `sales_daily_benchmark.json`",
+        "",
+        "## Environment",
+        "",
+        f"- **SQL Server Version**: {report['environment']['server_version']}",
+        f"- **Bench table**: `bench.fact_sales`, {fmt(report['bench_rows'])} rows",
+        f"- **Test Date**: {report['generated_at']}",
+        f"- **Runs**: {report['warmup']} warm-up + {report['runs']} measured per variant (medians shown)",
+        "",
+        "## Variants",
+        "",
+        "- **rowstore**: `IX_fact_sales_perf_date_region_channel`, row mode (`DISALLOW_BATCH_MODE`)",
+        "- **columnstore**: `NCCI_fact_sales_daily`, batch mode",
+        "- **optimizer**: no hints, both indexes available",
+        "",
+    ]
+    for shape_name, shape in report['shapes'].items():
+        lines += [
+            f"## {shape_name}",
+            "",
+            shape['description'],
+            "",
+            "| Variant | Elapsed (ms) | CPU (ms) | Logical Reads | Groups |",
+            "|---------|--------------|----------|---------------|--------|",
+        ]
+        for variant, result in shape['variants'].items():
+            s = result['summary']
+            lines.append(
+                f"| {variant} | {fmt(s['elapsed_ms']['median'])} | {fmt(s['cpu_ms']['median'])} | "
+                f"{fmt(s['logical_reads']['median'])} | {fmt(s['row_count'])} |"
+            )
+        lines += [
+            "",
+            f"Columnstore vs rowstore: elapsed {fmt(shape['columnstore_improvement_pct']['elapsed_ms'])}%, "
+            f"CPU {fmt(shape['columnstore_improvement_pct']['cpu_ms'])}%, "
+            f"logical reads {fmt(shape['columnstore_improvement_pct']['logical_reads'])}%",
+            "",
+        ]
+    mismatches = '\n'.join(f"- {m}" for m in report['mismatches']) or '- None (all variants return identical aggregates)'
+    lines += ["## Result Check", "", mismatches, ""]
+    return '\n'.join(lines)
+
+def run_sales_daily_benchmark(rows, runs, warmup, write_markdown, drop):
+    """Benchmark vw_sales_daily shapes on rowstore vs columnstore"""
+    try:
+        config = load_config()
+
+        print("Connecting to database...")
+        conn = connect(config, autocommit=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT CAST(SERVERPROPERTY('ProductVersion') AS NVARCHAR(128)), CAST(SERVERPROPERTY('Edition') AS NVARCHAR(128))")
+            version, edition = cursor.fetchone()
+
+            print(f"Preparing bench.fact_sales ({rows:,} rows; reused if already that size)...")
+            bench_rows = prepare_bench_table(cursor, rows)
+            key = sample_key(cursor)
+
+            shapes = {}
+            for shape_name, shape in SHAPES.items():
+                print(f"Benchmarking {shape_name} ({warmup} warm-up, {runs} runs per variant)...")
+                variants = benchmark_shape(cursor, shape, key, runs, warmup)
+                shapes[shape_name] = {
+                    'description': shape['description'],
+                    'variants': variants,
+                    'columnstore_improvement_pct': {
+                        metric: pct_change(variants['rowstore']['summary'][metric]['median'],
+                                           variants['columnstore']['summary'][metric]['median'])
+                        for metric in ('elapsed_ms', 'cpu_ms', 'logical_reads')
+                    },
+                }
+
+            if drop:
+                print("Dropping bench.fact_sales...")
+                cursor.execute("DROP TABLE bench.fact_sales")
+        finally:
+            cursor.close()
+            conn.close()
+
+        mismatches = [
+            f"{shape_name}: " + ', '.join(f"{v}={r['checksum']}" for v, r in shape['variants'].items())
+            for shape_name, shape in shapes.items()
+            if len({r['checksum'] for r in shape['variants'].values()}) > 1
+        ]
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'environment': {'server_version': f"SQL Server {version} ({edition})"},
+            'bench_rows': bench_rows,
+            'sample_key': {'region_code': key[0], 'channel_code': key[1]},
+            'runs': runs,
+            'warmup': warmup,
+            'shapes': shapes,
+            'mismatches': mismatches,
+        }
+
+        with open(REPORT_JSON, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if write_markdown:
+            REPORT_MD.write_text(render_markdown(report), encoding='utf-8')
+
+        print("\n=== Sales Daily Benchmark (median elapsed ms) ===")
+        for shape_name, shape in shapes.items():
+            timings = ', '.join(f"{v} {fmt(r['summary']['elapsed_ms']['median'])}" for v, r in shape['variants'].items())
+            print(f"{shape_name}: {timings}")
+        print(f"\nReport saved to: {REPORT_JSON}")
+
+        if mismatches:
+            print("\nRESULT MISMATCH BETWEEN VARIANTS - Exiting with code 2")
+            for m in mismatches:
+                print(f"  {m}")
+            return 2
+        return 0
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vw_sales_daily on rowstore vs columnstore')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='bench.fact_sales row count (default: 10,000,000)')
+    parser.add_argument('--runs', type=int, default=5, help='Measured runs per variant (default: 5)')
+    parser.add_argument('--warmup', type=int, default=1, help='Warm-up runs per variant (default: 1)')
+    parser.add_argument('--no-markdown', action='store_true', help='Do not write sales_daily_timings.md')
+    parser.add_argument('--drop', action='store_true', help='Drop bench.fact_sales afterwards')
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+    return run_sales_daily_benchmark(args.rows, args.runs, max(args.warmup, 0), not args.no_markdown, args.drop)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark for api/fast_json.py
+Encodes the same vw_pricing_bi_dataset rows with FastAPI's default path
+(jsonable_encoder + json.dumps) and with fast_json in the 'rows' and
+'columns' shapes, then compresses each body with every available codec.
+Reports bytes and CPU ms per 10k rows; --synthetic needs no database.
+"""
+
+import pyodbc
+import sys
+import json
+import random
+import time
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api'))
+
+from pricing_db import load_config, connect
+from run_benchmark import fmt
+import fast_json
+
+PROOFS_DIR = Path(__file__).parent
+REPORT_JSON = PROOFS_DIR / 'serialization_benchmark.json'
+REPORT_MD = PROOFS_DIR / 'serialization_timings.md'
+
+PER_ROWS = 10_000
+
+COLUMNS = [
+    'as_of_date', 'sku', 'product_name', 'category', 'brand',
+    'region_code', 'region_name', 'channel_code', 'channel_name',
+    'current_price', 'currency', 'active_discount_type', 'active_discount_value', 'net_price',
+    'daily_sales_qty', 'daily_net_sales', 'dq_missing_price_flag',
+]
+
+SOURCE_QUERY = f"""
+    SELECT TOP (?) {', '.join(COLUMNS)}
+    FROM pricing.vw_pricing_bi_dataset
+    ORDER BY as_of_date DESC, region_code, channel_code, sku
+"""
+
+def synthetic_rows(count, seed=42):
+    """Rows with the types and value spread of vw_pricing_bi_dataset"""
+    rng = random.Random(seed)
+    regions = [('NE', 'Northeast'), ('SE', 'Southeast'), ('MW', 'Midwest'), ('W', 'West')]
+    channels = [('ONLINE', 'Online'), ('RETAIL', 'Retail'), ('DIST', 'Distributor'), ('DIRECT', 'Direct')]
+    start = date.today()
+    rows = []
+    for i in range(count):
+        region_code, region_name = regions[i % len(regions)]
+        channel_code, channel_name = channels[(i // len(regions)) % len(channels)]
+        price = Decimal(rng.randint(500, 99999)).scaleb(-2).quantize(Decimal('0.0001'))
+        discount = rng.random() < 0.3
+        net = (price * Decimal('0.9')).quantize(Decimal('0.0001')) if discount else price
+        qty = rng.randint(0, 40)
+        rows.append((
+            start - timedelta(days=i // 1600),
+            f"SKU-{10000 + i % 100}",
+            f"Product {i % 100}",
+            ['Hardware', 'Software', 'Services'][i % 3],
+            ['Acme', 'Globex', 'Initech', 'Umbrella'][i % 4],
+            region_code, region_name, channel_code, channel_name,
+            price, 'USD',
+            'PERCENT' if discount else None,
+            Decimal('10.0000') if discount else None,
+            net,
+            qty,
+            (net * qty).quantize(Decimal('0.01')),
+            0,
+        ))
+    return rows
+
+def database_rows(count):
+    config = load_config()
+    conn = connect(config, autocommit=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SOURCE_QUERY, (count,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+def fastapi_default(rows):
+    """What returning fetch_all() from an endpoint costs"""
+    from fastapi.encoders import jsonable_encoder
+    records = [dict(zip(COLUMNS, row)) for row in rows]
+    return json.dumps(jsonable_encoder(records), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(',', ':')).encode('utf-8')
+
+def stdlib_dict(rows):
+    """fetch_all() dicts through json.dumps with a default hook (no jsonable_encoder)"""
+    records = [dict(zip(COLUMNS, row)) for row in rows]
+    return json.dumps(records, default=fast_json._default, separators=(',', ':')).encode('utf-8')
+
+def encoders():
+    variants = {}
+    try:
+        import fastapi  # noqa: F401
+        variants['fastapi_default'] = fastapi_default
+    except ImportError:
+        pass
+    variants['stdlib_dict'] = stdlib_dict
+    variants[f'fast_json_rows ({fast_json.encoder_name()})'] = lambda rows: fast_json.dumps(fast_json.shape_rows(COLUMNS, rows, 'rows'))
+    variants[f'fast_json_columns ({fast_json.encoder_name()})'] = lambda rows: fast_json.dumps(fast_json.shape_rows(COLUMNS, rows, 'columns'))
+    return variants
+
+def cpu_ms(fn, runs):
+    """Median process CPU time of fn() over runs, and its last result"""
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.process_time()
+        result = fn()
+        samples.append((time.process_time() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], result
+
+def run_serialization_benchmark(rows, runs, settings):
+    scale = PER_ROWS / len(rows)
+    codecs = ['identity'] + [c for c in ('gzip', 'br', 'zstd') if c in fast_json.available_encodings()]
+    results = {}
+    for name, encode in encoders().items():
+        encode_ms, body = cpu_ms(lambda: encode(rows), runs)
+        variant = {'encode_cpu_ms_per_10k': round(encode_ms * scale, 2), 'codecs': {}}
+        for codec in codecs:
+            if codec == 'identity':
+                compress_ms, compressed = 0.0, body
+            else:
+                compress_ms, compressed = cpu_ms(lambda: fast_json.compress(body, codec, settings), runs)
+            variant['codecs'][codec] = {
+                'bytes_per_10k': round(len(compressed) * scale),
+                'compress_cpu_ms_per_10k': round(compress_ms * scale, 2),
+                'total_cpu_ms_per_10k': round((encode_ms + compress_ms) * scale, 2),
+            }
+        results[name] = variant
+    return results
+
+def render_markdown(report):
+    """Write serialization_timings.md from the benchmark report"""
+    lines = [
+        "# Response Serialization: Bytes and CPU per 10k Rows",
+        "",
+        "> Generated by `performance_proofs/run_serialization_benchmark.py` — do not edit by hand.",
+        "> Machine-readable results: `serialization_benchmark.json`",
+        "",
+        "## Environment",
+        "",
+        f"- **Rows**: {fmt(report['rows'])} from {report['source']}",
+        f"- **Encoder**: {report['encoder']}",
+        f"- **Compression levels**: gzip {report['settings']['gzip_level']}, "
+        f"brotli {report['settings']['brotli_quality']}, zstd {report['settings']['zstd_level']}",
+        f"- **Test Date**: {report['generated_at']}",
+        f"- **Runs**: median CPU of {report['runs']} runs",
+        "",
+        "| Encoder | Codec | Bytes / 10k rows | Encode CPU (ms) | Compress CPU (ms) | Total CPU (ms) |",
+        "|---------|-------|------------------|-----------------|-------------------|----------------|",
+    ]
+    for name, variant in report['variants'].items():
+        for codec, r in variant['codecs'].items():
+            lines.append(
+                f"| {name} | {codec} | {fmt(r['bytes_per_10k'])} | {fmt(variant['encode_cpu_ms_per_10k'])} | "
+                f"{fmt(r['compress_cpu_ms_per_10k'])} | {fmt(r['total_cpu_ms_per_10k'])} |"
+            )
+    lines.append("")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding and compression of API responses')
+    parser.add_argument('--rows', type=int, default=50_000, help='Rows to encode (default: 50,000)')
+    parser.add_argument('--runs', type=int, default=5, help='Measured runs per variant (default: 5)')
+    parser.add_argument('--synthetic', action='store_true', help='Generate rows instead of reading vw_pricing_bi_dataset')
+    parser.add_argument('--no-markdown', action='store_true', help='Do not write serialization_timings.md')
+    args = parser.parse_args()
+
+    if args.runs < 1 or args.rows < 1:
+        parser.error('--rows and --runs must be at least 1')
+
+    try:
+        settings = dict(fast_json.DEFAULT_SETTINGS)
+        if args.synthetic:
+            rows, source = synthetic_rows(args.rows), 'synthetic rows'
+        else:
+            settings.update(((load_config().get('api') or {}).get('responses')) or {})
+            rows, source = database_rows(args.rows), 'pricing.vw_pricing_bi_dataset'
+        if not rows:
+            print("No rows to encode", file=sys.stderr)
+            return 1
+
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'rows': len(rows),
+            'source': source,
+            'encoder': fast_json.encoder_name(),
+            'settings': settings,
+            'runs': args.runs,
+            'variants': run_serialization_benchmark(rows, args.runs, settings),
+        }
+
+        with open(REPORT_JSON, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if not args.no_markdown:
+            REPORT_MD.write_text(render_markdown(report), encoding='utf-8')
+
+        print(f"\n=== Serialization Benchmark ({fmt(len(rows))} rows, per 10k rows) ===")
+        for name, variant in report['variants'].items():
+            sizes = ', '.join(f"{c} {fmt(r['bytes_per_10k'])} B / {fmt(r['total_cpu_ms_per_10k'])} ms"
+                              for c, r in variant['codecs'].items())
+            print(f"{name}: {sizes}")
+        print(f"\nReport saved to: {REPORT_JSON}")
+        return 0
+
+    except pyodbc.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+USE PricingDWH;
+GO
+
+-- Synthetic fact_sales copy for the vw_sales_daily columnstore benchmark
+-- Lives in the bench schema so the mart, DQ checks and audit are unaffected
+-- Keys come from the seeded dimensions; dates span the last 730 days
+DECLARE @target_rows BIGINT = 10000000;
+
+IF NOT EXISTS (SELECT * FROM sys.schemas WHERE name = 'bench')
+    EXEC('CREATE SCHEMA bench');
+
+IF OBJECT_ID('bench.fact_sales', 'U') IS NOT NULL
+    AND (SELECT SUM(row_count) FROM sys.dm_db_partition_stats
+         WHERE object_id = OBJECT_ID('bench.fact_sales') AND index_id IN (0, 1)) <> @target_rows
+    DROP TABLE bench.fact_sales;
+
+IF OBJECT_ID('bench.fact_sales', 'U') IS NULL
+BEGIN
+    CREATE TABLE bench.fact_sales (
+        sale_id BIGINT IDENTITY(1,1) NOT NULL,
+        sale_date DATE NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        qty INT NOT NULL,
+        net_sales DECIMAL(18,2) NOT NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_bench_fact_sales PRIMARY KEY (sale_id)
+    );
+
+    DECLARE @key_count BIGINT = (
+        SELECT COUNT_BIG(*)
+        FROM pricing.dim_product
+        CROSS JOIN pricing.dim_region
+        CROSS JOIN pricing.dim_channel
+    );
+
+    WITH Keys AS (
+        SELECT
+            p.sku,
+            r.region_code,
+            c.channel_code,
+            ROW_NUMBER() OVER (ORDER BY p.sku, r.region_code, c.channel_code) - 1 AS key_no
+        FROM pricing.dim_product p
+        CROSS JOIN pricing.dim_region r
+        CROSS JOIN pricing.dim_channel c
+    ),
+    Numbers AS (
+        SELECT TOP (@target_rows) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
+        FROM sys.all_columns a
+        CROSS JOIN sys.all_columns b
+        CROSS JOIN sys.all_columns c
+    )
+    INSERT INTO bench.fact_sales WITH (TABLOCK)
+        (sale_date, sku, region_code, channel_code, qty, net_sales)
+    SELECT
+        DATEADD(DAY, -CAST(n % 730 AS INT), CAST(GETDATE() AS DATE)),
+        k.sku,
+        k.region_code,
+        k.channel_code,
+        CAST(1 + n % 7 AS INT),
+        CAST((1 + n % 7) * (5 + (n * 7919) % 9500 / 100.0) AS DECIMAL(18,2))
+    FROM Numbers
+    INNER JOIN Keys k ON k.key_no = (n / 730) % @key_count;
+END
+
+-- Same index pair as pricing.fact_sales (sql/indexes/index_changes.sql)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_sales_perf_date_region_channel' AND object_id = OBJECT_ID('bench.fact_sales'))
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_fact_sales_perf_date_region_channel
+    ON bench.fact_sales (sale_date, region_code, channel_code, sku)
+    INCLUDE (qty, net_sales);
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'NCCI_fact_sales_daily' AND object_id = OBJECT_ID('bench.fact_sales'))
+BEGIN
+    CREATE NONCLUSTERED COLUMNSTORE INDEX NCCI_fact_sales_daily
+    ON bench.fact_sales (sale_date, sku, region_code, channel_code, qty, net_sales);
+END
+
+SELECT COUNT_BIG(*) AS bench_rows FROM bench.fact_sales;
+GO
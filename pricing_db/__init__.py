@@ -0,0 +1,41 @@
+"""
+Shared database access for pricing-command-center
+Config loading, cached ODBC driver resolution, pooled connections with
+retry/backoff, timing hooks and result shapes used by the API, ETL, DQ and
+audit scripts
+"""
+
+from pricing_db.config import load_config, get_db_settings
+from pricing_db.drivers import get_connection_string, resolve_driver, clear_driver_cache
+from pricing_db.connection import (
+    connect,
+    connect_with_driver,
+    connection,
+    get_pool,
+    timed_execute,
+    add_timing_hook,
+    remove_timing_hook,
+    log_timing_hook,
+)
+from pricing_db.results import RESULT_SHAPES, Rows, shape_result, to_columns, iter_cursor
+
+__all__ = [
+    'load_config',
+    'get_db_settings',
+    'get_connection_string',
+    'resolve_driver',
+    'clear_driver_cache',
+    'connect',
+    'connect_with_driver',
+    'connection',
+    'get_pool',
+    'timed_execute',
+    'add_timing_hook',
+    'remove_timing_hook',
+    'log_timing_hook',
+    'RESULT_SHAPES',
+    'Rows',
+    'shape_result',
+    'to_columns',
+    'iter_cursor',
+]
@@ -0,0 +1,38 @@
+"""
+Configuration loading shared by all entry points
+"""
+
+import os
+import yaml
+from pathlib import Path
+
+DEFAULT_CONFIG_FILE = Path(__file__).parent.parent / 'etl' / 'config.yaml'
+
+# Connection behaviour defaults (overridable under `database:` in config.yaml)
+DB_DEFAULTS = {
+    'login_timeout': 5,
+    'connect_retries': 3,
+    'retry_backoff_s': 0.5,
+    'pool_size': 8,
+    'pool_max_idle_s': 300,
+}
+
+_config_cache = {}
+
+def load_config(config_path=None):
+    """
+    Load configuration from etl/config.yaml (or PRICING_CONFIG / config_path)
+    Parsed once per path and process
+    """
+    config_file = Path(config_path or os.environ.get('PRICING_CONFIG') or DEFAULT_CONFIG_FILE)
+    key = str(config_file.resolve())
+    if key not in _config_cache:
+        with open(config_file, 'r') as f:
+            _config_cache[key] = yaml.safe_load(f)
+    return _config_cache[key]
+
+def get_db_settings(config):
+    """Database section merged over connection defaults"""
+    settings = dict(DB_DEFAULTS)
+    settings.update(config['database'])
+    return settings
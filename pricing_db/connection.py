@@ -0,0 +1,189 @@
+"""
+Connections with retry/backoff, a small reuse pool and timing hooks
+"""
+
+import sys
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import pyodbc
+
+from pricing_db.config import load_config, get_db_settings
+from pricing_db.drivers import (
+    get_connection_string,
+    get_cached_driver,
+    resolve_driver,
+    clear_driver_cache,
+    is_driver_error,
+)
+
+_timing_hooks = []
+
+def add_timing_hook(hook):
+    """
+    Register hook(event, elapsed_ms, info) called after every connect and
+    timed_execute. event is 'connect' or 'query'; info is a dict of details
+    """
+    _timing_hooks.append(hook)
+
+def remove_timing_hook(hook):
+    """Unregister a timing hook"""
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+def log_timing_hook(event, elapsed_ms, info):
+    """Timing hook that logs to stderr"""
+    label = info.get('driver') if event == 'connect' else ' '.join(str(info.get('sql', '')).split())[:80]
+    print(f"[pricing_db] {event} {elapsed_ms:.1f} ms {label}", file=sys.stderr)
+
+def _emit(event, started, info):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for hook in list(_timing_hooks):
+        try:
+            hook(event, elapsed_ms, info)
+        except Exception:
+            # Instrumentation must never break a query
+            pass
+    return elapsed_ms
+
+def _open(config, settings):
+    """Open one connection via the cached driver, re-probing if it stopped working"""
+    driver = get_cached_driver(config)
+    if driver:
+        try:
+            return driver, pyodbc.connect(get_connection_string(config, driver), timeout=settings['login_timeout'])
+        except pyodbc.Error as e:
+            if not is_driver_error(e):
+                raise
+            clear_driver_cache(config)
+    return resolve_driver(config, settings['login_timeout'])
+
+def connect(config=None, autocommit=True):
+    """Open a new connection, retrying transient failures with exponential backoff"""
+    conn, _ = connect_with_driver(config, autocommit)
+    return conn
+
+def connect_with_driver(config=None, autocommit=True):
+    """Like connect(), but returns (connection, driver_name)"""
+    config = config or load_config()
+    settings = get_db_settings(config)
+    retries = max(0, int(settings['connect_retries']))
+    backoff = float(settings['retry_backoff_s'])
+
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            driver, conn = _open(config, settings)
+        except pyodbc.Error as e:
+            _emit('connect', started, {'error': str(e), 'attempt': attempt})
+            # No installed driver works: retrying can't help
+            if attempt >= retries or is_driver_error(e):
+                raise
+            # Full jitter keeps many restarting workers from retrying in lockstep
+            time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+            attempt += 1
+            continue
+        conn.autocommit = autocommit
+        _emit('connect', started, {'driver': driver, 'attempt': attempt})
+        return conn, driver
+
+def timed_execute(cursor, sql, params=None):
+    """cursor.execute with timing hooks"""
+    started = time.perf_counter()
+    error = None
+    try:
+        if params:
+            return cursor.execute(sql, params)
+        return cursor.execute(sql)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        if _timing_hooks:
+            _emit('query', started, {'sql': sql, 'params': params, 'error': error})
+
+class ConnectionPool:
+    """
+    Reuses open connections across calls in one process.
+    Connections idle longer than max_idle_s are closed instead of reused, and
+    any connection that raised a pyodbc error is discarded.
+    """
+
+    def __init__(self, config, autocommit=True):
+        settings = get_db_settings(config)
+        self.config = config
+        self.autocommit = autocommit
+        self.size = max(1, int(settings['pool_size']))
+        self.max_idle_s = float(settings['pool_max_idle_s'])
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take an idle connection or open a new one"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, returned_at = self._idle.pop()
+            if now - returned_at <= self.max_idle_s:
+                return conn
+            self._close(conn)
+        return connect(self.config, autocommit=self.autocommit)
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or close it)"""
+        if not discard and not self.autocommit:
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                discard = True
+        with self._lock:
+            if not discard and len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._close(conn)
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(config=None, autocommit=True):
+    """Process-wide pool for a config/autocommit combination"""
+    config = config or load_config()
+    key = (id(config), autocommit)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config, autocommit)
+        return _pools[key]
+
+@contextmanager
+def connection(config=None, autocommit=True):
+    """Borrow a pooled connection for the duration of a with-block"""
+    pool = get_pool(config, autocommit)
+    conn = pool.acquire()
+    discard = False
+    try:
+        yield conn
+    except pyodbc.Error:
+        discard = True
+        raise
+    finally:
+        pool.release(conn, discard=discard)
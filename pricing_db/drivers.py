@@ -0,0 +1,132 @@
+"""
+ODBC driver resolution with an on-disk cache
+The first process to find a working driver records it, so later processes
+connect with one attempt instead of probing every installed driver
+"""
+
+import os
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyodbc
+
+COMMON_DRIVERS = [
+    'ODBC Driver 18 for SQL Server',
+    'ODBC Driver 17 for SQL Server',
+    'ODBC Driver 13 for SQL Server',
+    'SQL Server Native Client 11.0',
+    'SQL Server',
+]
+
+DRIVER_CACHE_FILE = Path(
+    os.environ.get('PRICING_DB_DRIVER_CACHE')
+    or Path.home() / '.cache' / 'pricing-command-center' / 'odbc_driver.json'
+)
+
+def get_connection_string(config, driver_override=None):
+    """Build SQL Server connection string"""
+    db = config['database']
+    driver = driver_override or db['driver']
+
+    conn_str = (
+        f"DRIVER={{{driver}}};"
+        f"SERVER={db['server']},{db['port']};"
+        f"DATABASE={db['database']};"
+        f"UID={db['username']};"
+        f"PWD={db['password']};"
+    )
+
+    # TrustServerCertificate only for newer ODBC drivers
+    if 'ODBC Driver' in driver:
+        conn_str += "TrustServerCertificate=yes;"
+
+    return conn_str
+
+def _cache_key(config):
+    db = config['database']
+    return f"{db['server']},{db['port']}/{db['database']}"
+
+def _read_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_cache(cache):
+    """Best-effort atomic write; a read-only home dir just disables caching"""
+    try:
+        DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=DRIVER_CACHE_FILE.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, DRIVER_CACHE_FILE)
+    except OSError:
+        pass
+
+def get_cached_driver(config):
+    """Return the cached working driver for this server/database, if still installed"""
+    entry = _read_cache().get(_cache_key(config))
+    if entry and entry.get('driver') in pyodbc.drivers():
+        return entry['driver']
+    return None
+
+def cache_driver(config, driver):
+    """Record a driver that successfully connected"""
+    cache = _read_cache()
+    cache[_cache_key(config)] = {
+        'driver': driver,
+        'resolved_at': datetime.now(timezone.utc).isoformat(),
+    }
+    _write_cache(cache)
+
+def clear_driver_cache(config=None):
+    """Forget the cached driver for one server/database, or all of them"""
+    cache = _read_cache() if config else {}
+    if config:
+        cache.pop(_cache_key(config), None)
+    _write_cache(cache)
+
+def candidate_drivers(config):
+    """Configured driver first, then installed common drivers"""
+    available = pyodbc.drivers()
+    candidates = [config['database']['driver']]
+    for driver in COMMON_DRIVERS:
+        if driver in available and driver not in candidates:
+            candidates.append(driver)
+    return candidates
+
+def is_driver_error(error):
+    """
+    True when an error means the driver itself is unusable (missing/unloadable),
+    as opposed to the server being down or rejecting the login
+    """
+    sqlstate = error.args[0] if error.args else ''
+    message = str(error)
+    return (
+        str(sqlstate).startswith('IM')
+        or "Can't open lib" in message
+        or 'file not found' in message.lower()
+    )
+
+def resolve_driver(config, login_timeout=5):
+    """
+    Return (driver, connection) for the first working driver.
+    Probing stops at the first driver that reaches the server: a network or
+    login error is not a driver problem, so other drivers are not tried.
+    """
+    last_error = None
+    for driver in candidate_drivers(config):
+        try:
+            conn = pyodbc.connect(get_connection_string(config, driver), timeout=login_timeout)
+        except pyodbc.Error as e:
+            last_error = e
+            if is_driver_error(e):
+                continue
+            raise
+        cache_driver(config, driver)
+        return driver, conn
+
+    raise last_error or pyodbc.Error("Could not find a working ODBC driver")
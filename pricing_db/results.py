@@ -0,0 +1,89 @@
+"""
+Result shapes for query helpers
+A list of dicts allocates one dict per row and repeats every column name;
+for large reads the alternatives below hold the same data in far less memory:
+
+- dicts:   [{column: value}, ...] (the default everywhere)
+- tuples:  Rows(columns, rows) - one shared header, rows as the cursor's tuples
+- columns: {column: array} - NumPy arrays for numeric/date columns when NumPy
+           is installed (int64, float64, datetime64, bool; DECIMAL becomes
+           float64, NULLs become NaN/NaT), lists otherwise
+- iter_cursor: lazy batches from fetchmany, for results that need not be held at all
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterator, List, NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RESULT_SHAPES = ('dicts', 'tuples', 'columns')
+
+FETCH_BATCH = 5000
+
+# NumPy parses date/datetime objects one at a time (~3 µs each); integer offsets
+# from the epoch convert to datetime64 with a single cast
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = -2 ** 63
+
+class Rows(NamedTuple):
+    """Shared-header result: unpacks as columns, rows"""
+    columns: List[str]
+    rows: List[tuple]
+
+def _numpy_column(values: tuple) -> Any:
+    """One column as a typed NumPy array, or a list when its values are not uniform"""
+    present = [v for v in values if v is not None]
+    if not present:
+        return list(values)
+    kind = type(present[0])
+    if any(type(v) is not kind for v in present):
+        return list(values)
+    has_nulls = len(present) != len(values)
+    if kind is bool:
+        return list(values) if has_nulls else np.array(values, dtype=np.bool_)
+    if kind is int and not has_nulls:
+        return np.array(values, dtype=np.int64)
+    if kind in (int, float, Decimal):
+        if has_nulls:
+            return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        return np.array(list(map(float, values)), dtype=np.float64)
+    if kind is datetime:
+        if any(v.tzinfo is not None for v in present):
+            return list(values)
+        offsets = [_NAT if v is None else (v - _EPOCH) // _MICROSECOND for v in values]
+        return np.array(offsets, dtype=np.int64).view('datetime64[us]')
+    if kind is date:
+        offsets = [_NAT if v is None else v.toordinal() - _EPOCH_ORDINAL for v in values]
+        return np.array(offsets, dtype=np.int64).view('datetime64[D]')
+    return list(values)
+
+def to_columns(columns: Sequence[str], rows: Sequence[Sequence[Any]], use_numpy: bool = True) -> dict:
+    """Columnar dict {column: array or list}; use_numpy=False (or no NumPy) gives plain lists"""
+    data = list(zip(*rows)) if rows else [() for _ in columns]
+    if use_numpy and np is not None:
+        return {name: _numpy_column(values) for name, values in zip(columns, data)}
+    return {name: list(values) for name, values in zip(columns, data)}
+
+def shape_result(columns: Sequence[str], rows: Sequence[Sequence[Any]], shape: str = 'dicts') -> Any:
+    """Cursor rows in one of RESULT_SHAPES"""
+    if shape == 'dicts':
+        return [dict(zip(columns, row)) for row in rows]
+    if shape == 'tuples':
+        return Rows(list(columns), rows)
+    if shape == 'columns':
+        return to_columns(columns, rows)
+    raise ValueError(f"Unknown result shape {shape!r}; expected one of {', '.join(RESULT_SHAPES)}")
+
+def iter_cursor(cursor, batch_size: int = FETCH_BATCH) -> Iterator[tuple]:
+    """Rows from an executed cursor, fetched batch_size at a time"""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield from batch
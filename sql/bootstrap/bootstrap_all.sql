@@ -22,6 +22,11 @@ PRINT 'Schema creation complete.';
 PRINT '';
 GO
 
+PRINT 'Step 1.1: Enabling Query Store...';
+PRINT '';
+:r /workspace/sql/ddl/02_query_store.sql
+GO
+
 -- Step 2: Seed Data - Dimensions
 PRINT 'Step 2: Loading seed data...';
 PRINT '';
@@ -37,6 +42,10 @@ PRINT '  Step 2.3: Seeding products...';
 :r /workspace/sql/seeds/seed_products.sql
 GO
 
+PRINT '  Step 2.3.1: Seeding calendar...';
+:r /workspace/sql/seeds/seed_calendar.sql
+GO
+
 PRINT '  Step 2.4: Seeding pricing rules...';
 :r /workspace/sql/seeds/seed_pricing_rules.sql
 GO
@@ -53,10 +62,33 @@ PRINT '  Step 2.7: Seeding staging discount events...';
 :r /workspace/sql/seeds/seed_stg_discount_events.sql
 GO
 
+PRINT '  Step 2.7.1: Seeding staging product cost...';
+:r /workspace/sql/seeds/seed_stg_product_cost.sql
+GO
+
 PRINT 'Seed data load complete.';
 PRINT '';
 GO
 
+-- Step 2.8: Create Functions
+PRINT 'Step 2.8: Creating functions...';
+PRINT '';
+PRINT '  Step 2.8.1: Creating fn_partition_index_ddl...';
+:r /workspace/sql/functions/fn_partition_index_ddl.sql
+GO
+
+PRINT '  Step 2.8.2: Creating fn_net_price...';
+:r /workspace/sql/functions/fn_net_price.sql
+GO
+
+PRINT '  Step 2.8.3: Creating fn_pricing_bi_dataset...';
+:r /workspace/sql/functions/fn_pricing_bi_dataset.sql
+GO
+
+PRINT 'Functions creation complete.';
+PRINT '';
+GO
+
 -- Step 3: Create Stored Procedures
 PRINT 'Step 3: Creating stored procedures...';
 PRINT '';
@@ -64,6 +96,54 @@ PRINT '  Step 3.1: Creating sp_refresh_pricing_mart...';
 :r /workspace/sql/sprocs/sp_refresh_pricing_mart.sql
 GO
 
+PRINT '  Step 3.2: Creating sp_snapshot_query_plans...';
+:r /workspace/sql/sprocs/sp_snapshot_query_plans.sql
+GO
+
+PRINT '  Step 3.3: Creating sp_get_price_as_of...';
+:r /workspace/sql/sprocs/sp_get_price_as_of.sql
+GO
+
+PRINT '  Step 3.4: Creating sp_align_partitioned_table...';
+:r /workspace/sql/sprocs/sp_align_partitioned_table.sql
+GO
+
+PRINT '  Step 3.5: Creating sp_maintain_partitions...';
+:r /workspace/sql/sprocs/sp_maintain_partitions.sql
+GO
+
+PRINT '  Step 3.6: Creating sp_refresh_margin_impact...';
+:r /workspace/sql/sprocs/sp_refresh_margin_impact.sql
+GO
+
+PRINT '  Step 3.7: Creating sp_get_net_price...';
+:r /workspace/sql/sprocs/sp_get_net_price.sql
+GO
+
+PRINT '  Step 3.8: Creating sp_set_price_audit_mode...';
+:r /workspace/sql/sprocs/sp_set_price_audit_mode.sql
+GO
+
+PRINT '  Step 3.9: Creating sp_get_price_overrides...';
+:r /workspace/sql/sprocs/sp_get_price_overrides.sql
+GO
+
+PRINT '  Step 3.10: Creating sp_get_price_as_of_system_time...';
+:r /workspace/sql/sprocs/sp_get_price_as_of_system_time.sql
+GO
+
+PRINT '  Step 3.11: Creating sp_get_price_changes...';
+:r /workspace/sql/sprocs/sp_get_price_changes.sql
+GO
+
+PRINT '  Step 3.12: Creating sp_get_net_price_batch...';
+:r /workspace/sql/sprocs/sp_get_net_price_batch.sql
+GO
+
+PRINT '  Step 3.13: Creating sp_get_price_as_of_batch...';
+:r /workspace/sql/sprocs/sp_get_price_as_of_batch.sql
+GO
+
 PRINT 'Stored procedures creation complete.';
 PRINT '';
 GO
@@ -87,6 +167,10 @@ PRINT '  Step 4.4: Creating vw_pricing_bi_dataset...';
 :r /workspace/sql/views/vw_pricing_bi_dataset.sql
 GO
 
+PRINT '  Step 4.5: Creating vw_plan_regressions...';
+:r /workspace/sql/views/vw_plan_regressions.sql
+GO
+
 PRINT 'Views creation complete.';
 PRINT '';
 GO
@@ -108,6 +192,10 @@ PRINT '';
 :r /workspace/sql/indexes/index_changes.sql
 GO
 
+PRINT '  Step 6.1: Aligning partitioned facts and archives...';
+EXEC pricing.sp_maintain_partitions;
+GO
+
 PRINT 'Indexes step complete.';
 PRINT '';
 GO
@@ -127,7 +215,9 @@ FROM pricing.stg_sales
 UNION ALL
 SELECT 'stg_price_history', COUNT(*) FROM pricing.stg_price_history
 UNION ALL
-SELECT 'stg_discount_events', COUNT(*) FROM pricing.stg_discount_events;
+SELECT 'stg_discount_events', COUNT(*) FROM pricing.stg_discount_events
+UNION ALL
+SELECT 'stg_product_cost', COUNT(*) FROM pricing.stg_product_cost;
 GO
 
 PRINT '';
@@ -139,7 +229,11 @@ FROM pricing.fact_sales
 UNION ALL
 SELECT 'fact_price_history', COUNT(*) FROM pricing.fact_price_history
 UNION ALL
-SELECT 'fact_discount_events', COUNT(*) FROM pricing.fact_discount_events;
+SELECT 'fact_discount_events', COUNT(*) FROM pricing.fact_discount_events
+UNION ALL
+SELECT 'fact_product_cost', COUNT(*) FROM pricing.fact_product_cost
+UNION ALL
+SELECT 'fact_margin_impact', COUNT(*) FROM pricing.fact_margin_impact;
 GO
 
 PRINT '';
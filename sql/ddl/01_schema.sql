@@ -56,6 +56,25 @@ BEGIN
 END
 GO
 
+-- dim_calendar (one row per day; populated by sql/seeds/seed_calendar.sql)
+IF OBJECT_ID('pricing.dim_calendar', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.dim_calendar (
+        calendar_date DATE NOT NULL,
+        calendar_year SMALLINT NOT NULL,
+        calendar_quarter TINYINT NOT NULL,
+        calendar_month TINYINT NOT NULL,
+        day_of_month TINYINT NOT NULL,
+        -- ISO: 1 = Monday ... 7 = Sunday
+        day_of_week TINYINT NOT NULL,
+        iso_week TINYINT NOT NULL,
+        is_weekend BIT NOT NULL,
+        month_start_date DATE NOT NULL,
+        CONSTRAINT PK_dim_calendar PRIMARY KEY CLUSTERED (calendar_date)
+    );
+END
+GO
+
 -- dim_pricing_rule
 IF OBJECT_ID('pricing.dim_pricing_rule', 'U') IS NULL
 BEGIN
@@ -67,14 +86,57 @@ BEGIN
         start_date DATE NULL,
         end_date DATE NULL,
         is_active BIT NOT NULL DEFAULT 1,
-        CONSTRAINT PK_dim_pricing_rule PRIMARY KEY (rule_id)
+        sku VARCHAR(255) NULL,
+        region_code VARCHAR(10) NULL,
+        channel_code VARCHAR(10) NULL,
+        row_version ROWVERSION NOT NULL,
+        CONSTRAINT PK_dim_pricing_rule PRIMARY KEY (rule_id),
+        CONSTRAINT FK_dim_pricing_rule_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku),
+        CONSTRAINT FK_dim_pricing_rule_dim_region FOREIGN KEY (region_code) REFERENCES pricing.dim_region(region_code),
+        CONSTRAINT FK_dim_pricing_rule_dim_channel FOREIGN KEY (channel_code) REFERENCES pricing.dim_channel(channel_code)
     );
 END
 GO
 
+-- Rule scope (NULL = applies to every sku/region/channel) and change tracking
+-- for the API rule engine, on databases created before they existed
+IF COL_LENGTH('pricing.dim_pricing_rule', 'sku') IS NULL
+    ALTER TABLE pricing.dim_pricing_rule ADD
+        sku VARCHAR(255) NULL CONSTRAINT FK_dim_pricing_rule_dim_product REFERENCES pricing.dim_product(sku),
+        region_code VARCHAR(10) NULL CONSTRAINT FK_dim_pricing_rule_dim_region REFERENCES pricing.dim_region(region_code),
+        channel_code VARCHAR(10) NULL CONSTRAINT FK_dim_pricing_rule_dim_channel REFERENCES pricing.dim_channel(channel_code);
+GO
+
+IF COL_LENGTH('pricing.dim_pricing_rule', 'row_version') IS NULL
+    ALTER TABLE pricing.dim_pricing_rule ADD row_version ROWVERSION NOT NULL;
+GO
+
+-- Monthly partitioning for the large facts (RANGE RIGHT: each boundary is the first day of a month)
+-- Initial boundaries span 36 months back to 3 months ahead; pricing.sp_maintain_partitions rolls them forward
+IF NOT EXISTS (SELECT * FROM sys.partition_functions WHERE name = 'pf_pricing_month')
+BEGIN
+    DECLARE @Month DATE = DATEADD(MONTH, -36, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+    DECLARE @LastMonth DATE = DATEADD(MONTH, 3, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+    DECLARE @Boundaries NVARCHAR(MAX) = N'';
+    WHILE @Month <= @LastMonth
+    BEGIN
+        SET @Boundaries += CASE WHEN @Boundaries = N'' THEN N'' ELSE N', ' END
+            + N'''' + CONVERT(NCHAR(10), @Month, 23) + N'''';
+        SET @Month = DATEADD(MONTH, 1, @Month);
+    END
+    EXEC(N'CREATE PARTITION FUNCTION pf_pricing_month (DATE) AS RANGE RIGHT FOR VALUES (' + @Boundaries + N')');
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.partition_schemes WHERE name = 'ps_pricing_month')
+BEGIN
+    CREATE PARTITION SCHEME ps_pricing_month AS PARTITION pf_pricing_month ALL TO ([PRIMARY]);
+END
+GO
+
 -- Facts
 
--- fact_sales
+-- fact_sales (partitioned by sale_date)
 IF OBJECT_ID('pricing.fact_sales', 'U') IS NULL
 BEGIN
     CREATE TABLE pricing.fact_sales (
@@ -86,15 +148,15 @@ BEGIN
         qty INT NOT NULL,
         net_sales DECIMAL(18,2) NOT NULL,
         created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
-        CONSTRAINT PK_fact_sales PRIMARY KEY (sale_id),
+        CONSTRAINT PK_fact_sales PRIMARY KEY CLUSTERED (sale_date, sale_id),
         CONSTRAINT FK_fact_sales_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku),
         CONSTRAINT FK_fact_sales_dim_region FOREIGN KEY (region_code) REFERENCES pricing.dim_region(region_code),
         CONSTRAINT FK_fact_sales_dim_channel FOREIGN KEY (channel_code) REFERENCES pricing.dim_channel(channel_code)
-    );
+    ) ON ps_pricing_month (sale_date);
 END
 GO
 
--- fact_price_history
+-- fact_price_history (partitioned by effective_start)
 IF OBJECT_ID('pricing.fact_price_history', 'U') IS NULL
 BEGIN
     CREATE TABLE pricing.fact_price_history (
@@ -108,11 +170,49 @@ BEGIN
         effective_end DATE NULL,
         source_system NVARCHAR(100) NULL,
         created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
-        CONSTRAINT PK_fact_price_history PRIMARY KEY (price_hist_id),
+        row_version ROWVERSION NOT NULL,
+        CONSTRAINT PK_fact_price_history PRIMARY KEY CLUSTERED (effective_start, price_hist_id),
         CONSTRAINT FK_fact_price_history_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku),
         CONSTRAINT FK_fact_price_history_dim_region FOREIGN KEY (region_code) REFERENCES pricing.dim_region(region_code),
         CONSTRAINT FK_fact_price_history_dim_channel FOREIGN KEY (channel_code) REFERENCES pricing.dim_channel(channel_code)
-    );
+    ) ON ps_pricing_month (effective_start);
+END
+GO
+
+-- Archives: expired partitions are switched in by pricing.sp_maintain_partitions
+-- Columns must match the fact tables exactly; indexes are kept in sync by pricing.sp_align_partitioned_table
+IF OBJECT_ID('pricing.fact_sales_archive', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.fact_sales_archive (
+        sale_id BIGINT IDENTITY(1,1) NOT NULL,
+        sale_date DATE NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        qty INT NOT NULL,
+        net_sales DECIMAL(18,2) NOT NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_fact_sales_archive PRIMARY KEY CLUSTERED (sale_date, sale_id)
+    ) ON ps_pricing_month (sale_date);
+END
+GO
+
+IF OBJECT_ID('pricing.fact_price_history_archive', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.fact_price_history_archive (
+        price_hist_id BIGINT IDENTITY(1,1) NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        price DECIMAL(18,4) NOT NULL,
+        currency CHAR(3) NOT NULL,
+        effective_start DATE NOT NULL,
+        effective_end DATE NULL,
+        source_system NVARCHAR(100) NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        row_version ROWVERSION NOT NULL,
+        CONSTRAINT PK_fact_price_history_archive PRIMARY KEY CLUSTERED (effective_start, price_hist_id)
+    ) ON ps_pricing_month (effective_start);
 END
 GO
 
@@ -129,6 +229,7 @@ BEGIN
         start_date DATE NOT NULL,
         end_date DATE NOT NULL,
         created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        row_version ROWVERSION NOT NULL,
         CONSTRAINT PK_fact_discount_events PRIMARY KEY (discount_event_id),
         CONSTRAINT FK_fact_discount_events_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku),
         CONSTRAINT FK_fact_discount_events_dim_region FOREIGN KEY (region_code) REFERENCES pricing.dim_region(region_code),
@@ -137,6 +238,15 @@ BEGIN
 END
 GO
 
+-- Change markers for incremental readers (API price store); added to existing databases
+IF COL_LENGTH('pricing.fact_price_history', 'row_version') IS NULL
+    ALTER TABLE pricing.fact_price_history ADD row_version ROWVERSION NOT NULL;
+GO
+
+IF COL_LENGTH('pricing.fact_discount_events', 'row_version') IS NULL
+    ALTER TABLE pricing.fact_discount_events ADD row_version ROWVERSION NOT NULL;
+GO
+
 -- fact_margin_impact
 IF OBJECT_ID('pricing.fact_margin_impact', 'U') IS NULL
 BEGIN
@@ -150,6 +260,11 @@ BEGIN
         unit_cost DECIMAL(18,4) NOT NULL,
         margin_pct DECIMAL(9,4) NULL,
         created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        discount_type NVARCHAR(100) NULL,
+        discount_value DECIMAL(18,4) NULL,
+        net_price DECIMAL(18,4) NULL,
+        margin_amount DECIMAL(18,4) NULL,
+        etl_run_id BIGINT NULL,
         CONSTRAINT PK_fact_margin_impact PRIMARY KEY (impact_id),
         CONSTRAINT FK_fact_margin_impact_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku),
         CONSTRAINT FK_fact_margin_impact_dim_region FOREIGN KEY (region_code) REFERENCES pricing.dim_region(region_code),
@@ -158,6 +273,50 @@ BEGIN
 END
 GO
 
+-- Margin stage columns for databases created before sp_refresh_margin_impact
+IF COL_LENGTH('pricing.fact_margin_impact', 'discount_type') IS NULL
+    ALTER TABLE pricing.fact_margin_impact ADD
+        discount_type NVARCHAR(100) NULL,
+        discount_value DECIMAL(18,4) NULL,
+        net_price DECIMAL(18,4) NULL,
+        margin_amount DECIMAL(18,4) NULL,
+        etl_run_id BIGINT NULL;
+GO
+
+-- fact_product_cost (effective-dated unit cost per SKU)
+IF OBJECT_ID('pricing.fact_product_cost', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.fact_product_cost (
+        cost_id BIGINT IDENTITY(1,1) NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        unit_cost DECIMAL(18,4) NOT NULL,
+        effective_start DATE NOT NULL,
+        effective_end DATE NULL,
+        source_system NVARCHAR(100) NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        row_version ROWVERSION NOT NULL,
+        CONSTRAINT PK_fact_product_cost PRIMARY KEY (cost_id),
+        CONSTRAINT FK_fact_product_cost_dim_product FOREIGN KEY (sku) REFERENCES pricing.dim_product(sku)
+    );
+END
+GO
+
+-- margin_refresh_state (single row: fact_margin_impact watermark)
+IF OBJECT_ID('pricing.margin_refresh_state', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.margin_refresh_state (
+        state_id TINYINT NOT NULL,
+        last_row_version BINARY(8) NOT NULL,
+        window_start DATE NOT NULL,
+        window_end DATE NOT NULL,
+        last_etl_run_id BIGINT NULL,
+        refreshed_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_margin_refresh_state PRIMARY KEY (state_id),
+        CONSTRAINT CK_margin_refresh_state_single_row CHECK (state_id = 1)
+    );
+END
+GO
+
 -- Operational tables
 
 -- etl_run_history
@@ -177,6 +336,36 @@ BEGIN
 END
 GO
 
+-- etl_change_log: fact_price_history / fact_discount_events rows each refresh inserted or
+-- end-dated, written by OUTPUT clauses in sp_refresh_pricing_mart (read by /pricing/changes).
+-- No foreign keys: an OUTPUT INTO target cannot have any.
+IF OBJECT_ID('pricing.etl_change_log', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.etl_change_log (
+        change_id BIGINT IDENTITY(1,1) NOT NULL,
+        run_id BIGINT NOT NULL,
+        -- price | discount
+        entity VARCHAR(10) NOT NULL,
+        -- INSERTED | END_DATED | REOPENED
+        change_type VARCHAR(10) NOT NULL,
+        -- price_hist_id or discount_event_id
+        source_id BIGINT NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        price DECIMAL(18,4) NULL,
+        currency CHAR(3) NULL,
+        discount_type NVARCHAR(100) NULL,
+        discount_value DECIMAL(18,4) NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NULL,
+        previous_end_date DATE NULL,
+        logged_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_etl_change_log PRIMARY KEY CLUSTERED (change_id)
+    );
+END
+GO
+
 -- price_override_audit
 IF OBJECT_ID('pricing.price_override_audit', 'U') IS NULL
 BEGIN
@@ -195,6 +384,107 @@ BEGIN
 END
 GO
 
+-- dq_run_history (one row per dq/checks.py execution)
+IF OBJECT_ID('pricing.dq_run_history', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.dq_run_history (
+        dq_run_id BIGINT IDENTITY(1,1) NOT NULL,
+        generated_at DATETIME2 NOT NULL,
+        overall_status NVARCHAR(50) NOT NULL,
+        etl_run_id BIGINT NULL,
+        checks_failed INT NOT NULL DEFAULT 0,
+        checks_warned INT NOT NULL DEFAULT 0,
+        tier NVARCHAR(20) NULL,
+        CONSTRAINT PK_dq_run_history PRIMARY KEY (dq_run_id)
+    );
+END
+GO
+
+-- dq_check_history (per-check counts for each DQ run)
+IF OBJECT_ID('pricing.dq_check_history', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.dq_check_history (
+        dq_run_id BIGINT NOT NULL,
+        check_name NVARCHAR(255) NOT NULL,
+        status NVARCHAR(50) NOT NULL,
+        issue_count BIGINT NOT NULL,
+        is_critical BIT NOT NULL,
+        z_score FLOAT NULL,
+        runtime_ms FLOAT NULL,
+        CONSTRAINT PK_dq_check_history PRIMARY KEY (dq_run_id, check_name),
+        CONSTRAINT FK_dq_check_history_dq_run_history FOREIGN KEY (dq_run_id) REFERENCES pricing.dq_run_history(dq_run_id)
+    );
+END
+GO
+
+-- dq_metric_stats (streaming EWMA mean/variance per volume metric, updated once per sample)
+IF OBJECT_ID('pricing.dq_metric_stats', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.dq_metric_stats (
+        metric_name NVARCHAR(255) NOT NULL,
+        sample_count BIGINT NOT NULL DEFAULT 0,
+        ewma_mean FLOAT NOT NULL DEFAULT 0,
+        ewma_var FLOAT NOT NULL DEFAULT 0,
+        last_value FLOAT NULL,
+        last_z_score FLOAT NULL,
+        last_source_id BIGINT NULL,
+        updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_dq_metric_stats PRIMARY KEY (metric_name)
+    );
+END
+GO
+
+-- query_plan_capture (one row per Query Store snapshot, normally after each ETL run)
+IF OBJECT_ID('pricing.query_plan_capture', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.query_plan_capture (
+        capture_id BIGINT IDENTITY(1,1) NOT NULL,
+        etl_run_id BIGINT NULL,
+        captured_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        window_start DATETIME2 NOT NULL,
+        CONSTRAINT PK_query_plan_capture PRIMARY KEY (capture_id)
+    );
+END
+GO
+
+-- query_plan_snapshot (per watched object/query/plan runtime stats within a capture window)
+IF OBJECT_ID('pricing.query_plan_snapshot', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.query_plan_snapshot (
+        capture_id BIGINT NOT NULL,
+        object_name NVARCHAR(128) NOT NULL,
+        query_hash BINARY(8) NOT NULL,
+        query_plan_hash BINARY(8) NOT NULL,
+        query_id BIGINT NOT NULL,
+        plan_id BIGINT NOT NULL,
+        executions BIGINT NOT NULL,
+        avg_duration_ms FLOAT NOT NULL,
+        avg_cpu_ms FLOAT NOT NULL,
+        avg_logical_reads FLOAT NOT NULL,
+        is_dominant_plan BIT NOT NULL,
+        CONSTRAINT PK_query_plan_snapshot PRIMARY KEY (capture_id, object_name, query_hash, plan_id),
+        CONSTRAINT FK_query_plan_snapshot_query_plan_capture FOREIGN KEY (capture_id) REFERENCES pricing.query_plan_capture(capture_id)
+    );
+END
+GO
+
+-- query_plan_baseline (accepted plan and runtime per watched object/query)
+IF OBJECT_ID('pricing.query_plan_baseline', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.query_plan_baseline (
+        object_name NVARCHAR(128) NOT NULL,
+        query_hash BINARY(8) NOT NULL,
+        query_plan_hash BINARY(8) NOT NULL,
+        avg_duration_ms FLOAT NOT NULL,
+        avg_cpu_ms FLOAT NOT NULL,
+        avg_logical_reads FLOAT NOT NULL,
+        capture_id BIGINT NOT NULL,
+        accepted_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_query_plan_baseline PRIMARY KEY (object_name, query_hash)
+    );
+END
+GO
+
 -- Staging tables (no FKs)
 
 -- stg_sales
@@ -246,6 +536,25 @@ BEGIN
 END
 GO
 
+-- stg_product_cost
+IF OBJECT_ID('pricing.stg_product_cost', 'U') IS NULL
+BEGIN
+    CREATE TABLE pricing.stg_product_cost (
+        sku VARCHAR(255) NULL,
+        unit_cost DECIMAL(18,4) NULL,
+        effective_start DATE NULL,
+        effective_end DATE NULL,
+        source_system NVARCHAR(100) NULL,
+        loaded_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+END
+GO
+
+-- Widen stg_product_cost.sku for databases created with VARCHAR(50)
+IF COL_LENGTH('pricing.stg_product_cost', 'sku') < 255
+    ALTER TABLE pricing.stg_product_cost ALTER COLUMN sku VARCHAR(255) NULL;
+GO
+
 -- Nonclustered indexes
 
 -- Index for current price lookups (effective_end IS NULL for current prices)
@@ -260,6 +569,61 @@ BEGIN
 END
 GO
 
+-- Indexes for incremental (row_version) reads
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_price_history_row_version' AND object_id = OBJECT_ID('pricing.fact_price_history'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_fact_price_history_row_version
+    ON pricing.fact_price_history (row_version);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_discount_events_row_version' AND object_id = OBJECT_ID('pricing.fact_discount_events'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_fact_discount_events_row_version
+    ON pricing.fact_discount_events (row_version);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_product_cost_row_version' AND object_id = OBJECT_ID('pricing.fact_product_cost'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_fact_product_cost_row_version
+    ON pricing.fact_product_cost (row_version);
+END
+GO
+
+-- Index for cost-as-of lookups in the margin stage
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_product_cost_as_of' AND object_id = OBJECT_ID('pricing.fact_product_cost'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_fact_product_cost_as_of
+    ON pricing.fact_product_cost (sku, effective_start DESC)
+    INCLUDE (effective_end, unit_cost);
+END
+GO
+
+-- One margin row per key and day; also serves snapshot reads by date
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UX_fact_margin_impact_key' AND object_id = OBJECT_ID('pricing.fact_margin_impact'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE UNIQUE NONCLUSTERED INDEX UX_fact_margin_impact_key
+    ON pricing.fact_margin_impact (as_of_date, region_code, channel_code, sku)
+    INCLUDE (price, discount_type, discount_value, net_price, unit_cost, margin_amount, margin_pct);
+END
+GO
+
 -- Index for sales by date
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_sales_sale_date' AND object_id = OBJECT_ID('pricing.fact_sales'))
 BEGIN
@@ -282,4 +646,62 @@ BEGIN
 END
 GO
 
+-- Index for DQ trend lookups (latest runs first)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_dq_run_history_generated_at' AND object_id = OBJECT_ID('pricing.dq_run_history'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_dq_run_history_generated_at
+    ON pricing.dq_run_history (generated_at DESC)
+    INCLUDE (overall_status, etl_run_id);
+END
+GO
+
+-- Index for latest-capture lookups in plan regression detection
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_query_plan_snapshot_dominant' AND object_id = OBJECT_ID('pricing.query_plan_snapshot'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_query_plan_snapshot_dominant
+    ON pricing.query_plan_snapshot (object_name, query_hash, capture_id)
+    INCLUDE (query_plan_hash, executions, avg_duration_ms, avg_cpu_ms, avg_logical_reads)
+    WHERE is_dominant_plan = 1;
+END
+GO
+
+-- Index for per-check trend lookups
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_dq_check_history_check_name' AND object_id = OBJECT_ID('pricing.dq_check_history'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_dq_check_history_check_name
+    ON pricing.dq_check_history (check_name, dq_run_id)
+    INCLUDE (status, issue_count, z_score, runtime_ms);
+END
+GO
+
+-- Index for /pricing/overrides in TRIGGER audit mode (sku + time window)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_price_override_audit_sku_changed_at' AND object_id = OBJECT_ID('pricing.price_override_audit'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_price_override_audit_sku_changed_at
+    ON pricing.price_override_audit (sku, changed_at)
+    INCLUDE (region_code, channel_code, old_price, new_price, changed_by, reason);
+END
+GO
 
+-- Index for change feed starting points (first change after a run)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_etl_change_log_run_id' AND object_id = OBJECT_ID('pricing.etl_change_log'))
+BEGIN
+    -- Ensure required SET options for CREATE INDEX under sqlcmd
+    SET ANSI_NULLS ON;
+    SET QUOTED_IDENTIFIER ON;
+    CREATE NONCLUSTERED INDEX IX_etl_change_log_run_id
+    ON pricing.etl_change_log (run_id, change_id);
+END
+GO
@@ -0,0 +1,26 @@
+-- Enable Query Store on PricingDWH for plan regression tracking
+-- Captured plans/runtime stats are snapshotted by pricing.sp_snapshot_query_plans
+USE PricingDWH;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.database_query_store_options
+    WHERE actual_state_desc = 'READ_WRITE'
+)
+BEGIN
+    ALTER DATABASE PricingDWH SET QUERY_STORE = ON;
+    ALTER DATABASE PricingDWH SET QUERY_STORE (
+        OPERATION_MODE = READ_WRITE,
+        QUERY_CAPTURE_MODE = AUTO,
+        DATA_FLUSH_INTERVAL_SECONDS = 60,
+        INTERVAL_LENGTH_MINUTES = 15,
+        MAX_STORAGE_SIZE_MB = 256,
+        CLEANUP_POLICY = (STALE_QUERY_THRESHOLD_DAYS = 30),
+        SIZE_BASED_CLEANUP_MODE = AUTO
+    );
+END
+GO
+
+SELECT actual_state_desc, desired_state_desc, query_capture_mode_desc
+FROM sys.database_query_store_options;
+GO
@@ -0,0 +1,20 @@
+USE PricingDWH;
+GO
+
+PRINT 'Creating functions...';
+GO
+
+-- Create/update fn_partition_index_ddl
+:r sql/functions/fn_partition_index_ddl.sql
+GO
+
+-- Create/update fn_net_price
+:r sql/functions/fn_net_price.sql
+GO
+
+-- Create/update fn_pricing_bi_dataset (uses fn_net_price)
+:r sql/functions/fn_pricing_bi_dataset.sql
+GO
+
+PRINT 'Functions created.';
+GO
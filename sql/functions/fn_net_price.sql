@@ -0,0 +1,33 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Net price after one discount: PERCENT takes @discount_value percent off,
+-- any other type takes @discount_value off as an amount; never below zero.
+-- Same arithmetic as api/price_store.py (net_scaled), so SQL and API agree to 4 dp.
+-- Schema-bound and free of data access, so SQL Server 2019+ inlines it.
+CREATE OR ALTER FUNCTION pricing.fn_net_price (
+    @price DECIMAL(18,4),
+    @discount_type NVARCHAR(100),
+    @discount_value DECIMAL(18,4)
+)
+RETURNS DECIMAL(18,4)
+WITH SCHEMABINDING
+AS
+BEGIN
+    RETURN CAST(
+        CASE
+            WHEN @discount_value IS NULL THEN @price
+            WHEN @discount_type = 'PERCENT' AND @discount_value >= 100 THEN 0
+            WHEN @discount_type = 'PERCENT' THEN @price * (1 - @discount_value / 100.0)
+            WHEN @discount_value >= @price THEN 0
+            ELSE @price - @discount_value
+        END AS DECIMAL(18,4));
+END;
+GO
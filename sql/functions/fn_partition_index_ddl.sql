@@ -0,0 +1,77 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- CREATE INDEX statement that re-creates a nonclustered (rowstore or columnstore)
+-- index of @object_id on @target_table, aligned to ps_pricing_month(@partition_column).
+-- Used to move indexes onto the partition scheme and to mirror them on archive tables.
+CREATE OR ALTER FUNCTION pricing.fn_partition_index_ddl (
+    @object_id INT,
+    @index_id INT,
+    @target_table NVARCHAR(300),
+    @partition_column SYSNAME
+)
+RETURNS NVARCHAR(MAX)
+AS
+BEGIN
+    DECLARE @IndexName SYSNAME;
+    DECLARE @IndexType TINYINT;
+    DECLARE @IsUnique BIT;
+    DECLARE @FilterDefinition NVARCHAR(MAX);
+    DECLARE @KeyColumns NVARCHAR(MAX);
+    DECLARE @IncludedColumns NVARCHAR(MAX);
+
+    SELECT
+        @IndexName = name,
+        @IndexType = type,
+        @IsUnique = is_unique,
+        @FilterDefinition = filter_definition
+    FROM sys.indexes
+    WHERE object_id = @object_id AND index_id = @index_id;
+
+    IF @IndexType NOT IN (2, 6)
+        RETURN NULL;
+
+    IF @IndexType = 6
+    BEGIN
+        -- Columnstore: column list in definition order
+        SELECT @KeyColumns = STRING_AGG(CONVERT(NVARCHAR(MAX), QUOTENAME(c.name)), N', ')
+            WITHIN GROUP (ORDER BY ic.index_column_id)
+        FROM sys.index_columns ic
+        INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        WHERE ic.object_id = @object_id AND ic.index_id = @index_id;
+
+        RETURN N'CREATE NONCLUSTERED COLUMNSTORE INDEX ' + QUOTENAME(@IndexName)
+            + N' ON ' + @target_table + N' (' + @KeyColumns + N')'
+            + ISNULL(N' WHERE ' + @FilterDefinition, N'')
+            + N' ON ps_pricing_month (' + QUOTENAME(@partition_column) + N');';
+    END
+
+    SELECT @KeyColumns = STRING_AGG(
+            CONVERT(NVARCHAR(MAX), QUOTENAME(c.name) + CASE WHEN ic.is_descending_key = 1 THEN N' DESC' ELSE N'' END),
+            N', ')
+        WITHIN GROUP (ORDER BY ic.key_ordinal)
+    FROM sys.index_columns ic
+    INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE ic.object_id = @object_id AND ic.index_id = @index_id AND ic.key_ordinal > 0;
+
+    SELECT @IncludedColumns = STRING_AGG(CONVERT(NVARCHAR(MAX), QUOTENAME(c.name)), N', ')
+        WITHIN GROUP (ORDER BY ic.index_column_id)
+    FROM sys.index_columns ic
+    INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE ic.object_id = @object_id AND ic.index_id = @index_id AND ic.is_included_column = 1;
+
+    RETURN N'CREATE ' + CASE WHEN @IsUnique = 1 THEN N'UNIQUE ' ELSE N'' END
+        + N'NONCLUSTERED INDEX ' + QUOTENAME(@IndexName)
+        + N' ON ' + @target_table + N' (' + @KeyColumns + N')'
+        + ISNULL(N' INCLUDE (' + @IncludedColumns + N')', N'')
+        + ISNULL(N' WHERE ' + @FilterDefinition, N'')
+        + N' ON ps_pricing_month (' + QUOTENAME(@partition_column) + N');';
+END;
+GO
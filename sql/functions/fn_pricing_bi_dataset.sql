@@ -0,0 +1,121 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- vw_pricing_bi_dataset for one region/channel and a date range, any dates in dim_calendar.
+-- Same columns and rules as the view, but inline, so the region/channel/date arguments
+-- are seek predicates on every fact read instead of filters applied after the view has
+-- computed all 60 days for every key:
+--   keys     - active products with sales, prices or discounts in the slice or the 60 days
+--              before @to_date (the view's rule, relative to the slice instead of GETDATE())
+--   price    - latest version in effect on the day (TOP 1 per key and day)
+--   discount - highest discount_value active on the day, then earliest start_date, then id
+-- Days outside dim_calendar return no rows.
+CREATE OR ALTER FUNCTION pricing.fn_pricing_bi_dataset (
+    @from_date DATE,
+    @to_date DATE,
+    @region_code VARCHAR(10),
+    @channel_code VARCHAR(10)
+)
+RETURNS TABLE
+AS
+RETURN
+WITH Bounds AS (
+    SELECT CASE
+        WHEN @from_date < DATEADD(DAY, -60, @to_date) THEN @from_date
+        ELSE DATEADD(DAY, -60, @to_date)
+    END AS activity_from
+),
+ActivityKeys AS (
+    SELECT fs.sku
+    FROM Bounds b
+    INNER JOIN pricing.fact_sales fs
+        ON fs.sale_date >= b.activity_from
+        AND fs.sale_date <= @to_date
+    WHERE fs.region_code = @region_code
+        AND fs.channel_code = @channel_code
+    UNION
+    SELECT ph.sku
+    FROM Bounds b
+    INNER JOIN pricing.fact_price_history ph
+        ON ph.effective_start <= @to_date
+        AND (ph.effective_end IS NULL OR ph.effective_end >= b.activity_from)
+    WHERE ph.region_code = @region_code
+        AND ph.channel_code = @channel_code
+    UNION
+    SELECT de.sku
+    FROM Bounds b
+    INNER JOIN pricing.fact_discount_events de
+        ON de.start_date <= @to_date
+        AND de.end_date >= b.activity_from
+    WHERE de.region_code = @region_code
+        AND de.channel_code = @channel_code
+)
+SELECT
+    cal.calendar_date AS as_of_date,
+    dp.sku,
+    dp.product_name,
+    dp.category,
+    dp.brand,
+    dr.region_code,
+    dr.region_name,
+    dc.channel_code,
+    dc.channel_name,
+    ISNULL(pa.current_price, 0) AS current_price,
+    ISNULL(pa.currency, 'USD') AS currency,
+    da.active_discount_type,
+    da.active_discount_value,
+    pricing.fn_net_price(pa.current_price, da.active_discount_type, da.active_discount_value) AS net_price,
+    ISNULL(sd.daily_sales_qty, 0) AS daily_sales_qty,
+    ISNULL(sd.daily_net_sales, 0) AS daily_net_sales,
+    CASE WHEN pa.current_price IS NULL THEN 1 ELSE 0 END AS dq_missing_price_flag
+FROM pricing.dim_calendar cal
+CROSS JOIN ActivityKeys ak
+INNER JOIN pricing.dim_product dp ON dp.sku = ak.sku
+INNER JOIN pricing.dim_region dr ON dr.region_code = @region_code
+INNER JOIN pricing.dim_channel dc ON dc.channel_code = @channel_code
+OUTER APPLY (
+    SELECT TOP (1)
+        ph.price AS current_price,
+        ph.currency
+    FROM pricing.fact_price_history ph
+    WHERE ph.sku = ak.sku
+        AND ph.region_code = @region_code
+        AND ph.channel_code = @channel_code
+        AND ph.effective_start <= cal.calendar_date
+        AND (ph.effective_end IS NULL OR ph.effective_end >= cal.calendar_date)
+    ORDER BY ph.effective_start DESC, ph.created_at DESC, ph.price_hist_id DESC
+) pa
+OUTER APPLY (
+    SELECT TOP (1)
+        de.discount_type AS active_discount_type,
+        de.discount_value AS active_discount_value
+    FROM pricing.fact_discount_events de
+    WHERE de.sku = ak.sku
+        AND de.region_code = @region_code
+        AND de.channel_code = @channel_code
+        AND de.start_date <= cal.calendar_date
+        AND de.end_date >= cal.calendar_date
+    ORDER BY de.discount_value DESC, de.start_date ASC, de.discount_event_id ASC
+) da
+OUTER APPLY (
+    -- Scalar aggregate: always one row, NULL sums when there were no sales
+    SELECT
+        SUM(fs.qty) AS daily_sales_qty,
+        SUM(fs.net_sales) AS daily_net_sales
+    FROM pricing.fact_sales fs
+    WHERE fs.sale_date = cal.calendar_date
+        AND fs.region_code = @region_code
+        AND fs.channel_code = @channel_code
+        AND fs.sku = ak.sku
+) sd
+WHERE cal.calendar_date >= @from_date
+    AND cal.calendar_date <= @to_date
+    AND dp.is_active = 1;
+GO
@@ -13,6 +13,15 @@ BEGIN
 END
 GO
 
+-- Columnstore for fact_sales: Batch-mode daily aggregation (vw_sales_daily) with segment elimination on sale_date
+-- Rowstore IX_fact_sales_perf_date_region_channel stays for single-day seeks; see performance_proofs/run_sales_daily_benchmark.py
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'NCCI_fact_sales_daily' AND object_id = OBJECT_ID('pricing.fact_sales'))
+BEGIN
+    CREATE NONCLUSTERED COLUMNSTORE INDEX NCCI_fact_sales_daily
+    ON pricing.fact_sales (sale_date, sku, region_code, channel_code, qty, net_sales);
+END
+GO
+
 -- Index for fact_discount_events: Supports active discount lookups with date range filtering
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_discount_events_perf_region_channel_sku_dates' AND object_id = OBJECT_ID('pricing.fact_discount_events'))
 BEGIN
@@ -31,6 +40,16 @@ BEGIN
 END
 GO
 
+-- Index for fact_price_history: Supports point-in-time (as-of) lookups
+-- Equality on the series key, then a backward range seek on effective_start
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_price_history_as_of' AND object_id = OBJECT_ID('pricing.fact_price_history'))
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_fact_price_history_as_of
+    ON pricing.fact_price_history (sku, region_code, channel_code, effective_start DESC)
+    INCLUDE (effective_end, price, currency);
+END
+GO
+
 PRINT 'Performance indexes created.';
 GO
 
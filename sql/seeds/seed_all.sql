@@ -21,6 +21,10 @@ PRINT 'Step 3: Seeding products...';
 :r sql/seeds/seed_products.sql
 GO
 
+PRINT 'Step 3.1: Seeding calendar...';
+:r sql/seeds/seed_calendar.sql
+GO
+
 PRINT 'Step 4: Seeding pricing rules...';
 :r sql/seeds/seed_pricing_rules.sql
 GO
@@ -37,6 +41,10 @@ PRINT 'Step 7: Seeding staging discount events...';
 :r sql/seeds/seed_stg_discount_events.sql
 GO
 
+PRINT 'Step 8: Seeding staging product cost...';
+:r sql/seeds/seed_stg_product_cost.sql
+GO
+
 PRINT '';
 PRINT 'Seed data load complete.';
 GO
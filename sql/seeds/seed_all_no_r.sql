@@ -38,7 +38,7 @@ MERGE pricing.dim_channel AS target
 USING (
     SELECT 'ONLINE' AS channel_code, 'Online Store' AS channel_name
     UNION ALL SELECT 'RETAIL', 'Retail Stores'
-    UNION ALL SELECT 'DISTRIBUTOR', 'Distributor Network'
+    UNION ALL SELECT 'DIST', 'Distributor Network'
     UNION ALL SELECT 'DIRECT', 'Direct Sales'
 ) AS source
 ON target.channel_code = source.channel_code
@@ -126,6 +126,39 @@ WHEN NOT MATCHED THEN
     VALUES (source.sku, source.product_name, source.category, source.brand, source.is_active);
 GO
 
+-- ============================================================================
+-- Step 3.1: Seeding calendar
+-- ============================================================================
+PRINT 'Step 3.1: Seeding calendar...';
+GO
+
+-- One row per day from 2000-01-01 through 2050-12-31; existing days are left alone
+DECLARE @from_date DATE = '2000-01-01';
+DECLARE @to_date DATE = '2050-12-31';
+
+INSERT INTO pricing.dim_calendar
+    (calendar_date, calendar_year, calendar_quarter, calendar_month, day_of_month,
+     day_of_week, iso_week, is_weekend, month_start_date)
+SELECT
+    d.calendar_date,
+    YEAR(d.calendar_date),
+    DATEPART(QUARTER, d.calendar_date),
+    MONTH(d.calendar_date),
+    DAY(d.calendar_date),
+    -- 1900-01-01 was a Monday, so this is independent of SET DATEFIRST
+    DATEDIFF(DAY, '19000101', d.calendar_date) % 7 + 1,
+    DATEPART(ISO_WEEK, d.calendar_date),
+    CASE WHEN DATEDIFF(DAY, '19000101', d.calendar_date) % 7 >= 5 THEN 1 ELSE 0 END,
+    DATEFROMPARTS(YEAR(d.calendar_date), MONTH(d.calendar_date), 1)
+FROM (
+    SELECT DATEADD(DAY, gs.value, @from_date) AS calendar_date
+    FROM GENERATE_SERIES(0, DATEDIFF(DAY, @from_date, @to_date)) gs
+) d
+WHERE NOT EXISTS (
+    SELECT 1 FROM pricing.dim_calendar c WHERE c.calendar_date = d.calendar_date
+);
+GO
+
 -- ============================================================================
 -- Step 4: Seeding pricing rules
 -- ============================================================================
@@ -135,17 +168,17 @@ GO
 MERGE pricing.dim_pricing_rule AS target
 USING (
     VALUES
-    ('Volume Discount Tier 1', 'VOLUME', 1, '2024-01-01', '2025-12-31', 1),
-    ('Competitive Match Policy', 'COMPETITIVE', 2, '2024-06-01', '2025-06-30', 1),
-    ('Seasonal Promotion Q1', 'SEASONAL', 3, '2025-01-01', '2025-03-31', 1),
-    ('Channel Pricing Online', 'CHANNEL', 2, '2024-01-01', NULL, 1),
-    ('Emergency Pricing Override', 'OVERRIDE', 1, '2024-01-01', '2025-12-31', 1),
-    ('End of Life Discount', 'EOL', 4, '2024-09-01', '2024-12-31', 0),
-    ('New Product Launch', 'LAUNCH', 2, '2025-01-15', '2025-04-15', 1),
-    ('Regional Adjustment NE', 'REGIONAL', 5, '2024-03-01', '2025-03-01', 1),
-    ('Bulk Order Discount', 'VOLUME', 3, '2024-01-01', NULL, 1),
-    ('Contract Pricing Tier', 'CONTRACT', 1, '2024-01-01', '2025-12-31', 1)
-) AS source (rule_name, rule_type, priority, start_date, end_date, is_active)
+    ('Volume Discount Tier 1', 'VOLUME', 1, '2024-01-01', '2025-12-31', 1, NULL, NULL, 'DIST'),
+    ('Competitive Match Policy', 'COMPETITIVE', 2, '2024-06-01', '2025-06-30', 1, NULL, NULL, NULL),
+    ('Seasonal Promotion Q1', 'SEASONAL', 3, '2025-01-01', '2025-03-31', 1, NULL, NULL, NULL),
+    ('Channel Pricing Online', 'CHANNEL', 2, '2024-01-01', NULL, 1, NULL, NULL, 'ONLINE'),
+    ('Emergency Pricing Override', 'OVERRIDE', 1, '2024-01-01', '2025-12-31', 1, 'SKU-10021', NULL, NULL),
+    ('End of Life Discount', 'EOL', 4, '2024-09-01', '2024-12-31', 0, NULL, NULL, NULL),
+    ('New Product Launch', 'LAUNCH', 2, '2025-01-15', '2025-04-15', 1, 'SKU-10050', NULL, NULL),
+    ('Regional Adjustment NE', 'REGIONAL', 5, '2024-03-01', '2025-03-01', 1, NULL, 'NE', NULL),
+    ('Bulk Order Discount', 'VOLUME', 3, '2024-01-01', NULL, 1, NULL, NULL, 'DIST'),
+    ('Contract Pricing Tier', 'CONTRACT', 1, '2024-01-01', '2025-12-31', 1, NULL, NULL, 'DIRECT')
+) AS source (rule_name, rule_type, priority, start_date, end_date, is_active, sku, region_code, channel_code)
 ON target.rule_name = source.rule_name
 WHEN MATCHED THEN
     UPDATE SET
@@ -153,10 +186,14 @@ WHEN MATCHED THEN
         priority = source.priority,
         start_date = source.start_date,
         end_date = source.end_date,
-        is_active = source.is_active
+        is_active = source.is_active,
+        sku = source.sku,
+        region_code = source.region_code,
+        channel_code = source.channel_code
 WHEN NOT MATCHED THEN
-    INSERT (rule_name, rule_type, priority, start_date, end_date, is_active)
-    VALUES (source.rule_name, source.rule_type, source.priority, source.start_date, source.end_date, source.is_active);
+    INSERT (rule_name, rule_type, priority, start_date, end_date, is_active, sku, region_code, channel_code)
+    VALUES (source.rule_name, source.rule_type, source.priority, source.start_date, source.end_date, source.is_active,
+            source.sku, source.region_code, source.channel_code);
 GO
 
 -- ============================================================================
@@ -184,7 +221,7 @@ BEGIN
     DECLARE @RegionCode VARCHAR(10) = (SELECT code FROM @RegionCodes WHERE idx = @RegionNum);
     DECLARE @ChannelNum INT = (ABS(CHECKSUM(NEWID())) % 4) + 1;
     DECLARE @ChannelCodes TABLE (idx INT, code VARCHAR(10));
-    INSERT INTO @ChannelCodes VALUES (1, 'ONLINE'), (2, 'RETAIL'), (3, 'DISTRIBUTOR'), (4, 'DIRECT');
+    INSERT INTO @ChannelCodes VALUES (1, 'ONLINE'), (2, 'RETAIL'), (3, 'DIST'), (4, 'DIRECT');
     DECLARE @ChannelCode VARCHAR(10) = (SELECT code FROM @ChannelCodes WHERE idx = @ChannelNum);
     DECLARE @Qty INT = (ABS(CHECKSUM(NEWID())) % 100) + 1;
     DECLARE @UnitPrice DECIMAL(18,2) = CAST((ABS(CHECKSUM(NEWID())) % 50000 + 1000) AS DECIMAL(18,2)) / 100.0;
@@ -213,7 +250,7 @@ DECLARE @SkuCounter INT = 1;
 DECLARE @RegionCodes TABLE (code VARCHAR(10));
 INSERT INTO @RegionCodes VALUES ('NE'), ('SE'), ('MW'), ('SW'), ('W'), ('Central');
 DECLARE @ChannelCodes TABLE (code VARCHAR(10));
-INSERT INTO @ChannelCodes VALUES ('ONLINE'), ('RETAIL'), ('DISTRIBUTOR'), ('DIRECT');
+INSERT INTO @ChannelCodes VALUES ('ONLINE'), ('RETAIL'), ('DIST'), ('DIRECT');
 
 -- Create price history for each SKU/Region/Channel combination
 WHILE @SkuCounter <= 55
@@ -292,11 +329,11 @@ INSERT INTO pricing.stg_price_history
 VALUES
     (NULL, 'NE', 'ONLINE', 99.99, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('INVALID-SKU-99999', 'SE', 'RETAIL', 149.50, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
-    ('', 'MW', 'DISTRIBUTOR', 199.00, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
+    ('', 'MW', 'DIST', 199.00, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('SKU-XXXXX', 'SW', 'DIRECT', 249.75, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('SKU-99999', 'W', 'ONLINE', 299.99, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     (NULL, 'Central', 'RETAIL', 89.50, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
-    ('BAD-SKU-001', 'NE', 'DISTRIBUTOR', 179.25, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
+    ('BAD-SKU-001', 'NE', 'DIST', 179.25, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('', 'SE', 'DIRECT', 219.00, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('SKU-NULL', 'MW', 'ONLINE', 159.99, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS'),
     ('INVALID', 'SW', 'RETAIL', 269.50, 'USD', @BadDataBaseDate, NULL, 'PRICING_SYS');
@@ -329,7 +366,7 @@ DECLARE @SkuCounter INT = 1;
 DECLARE @RegionCodes TABLE (code VARCHAR(10));
 INSERT INTO @RegionCodes VALUES ('NE'), ('SE'), ('MW'), ('SW'), ('W'), ('Central');
 DECLARE @ChannelCodes TABLE (code VARCHAR(10));
-INSERT INTO @ChannelCodes VALUES ('ONLINE'), ('RETAIL'), ('DISTRIBUTOR'), ('DIRECT');
+INSERT INTO @ChannelCodes VALUES ('ONLINE'), ('RETAIL'), ('DIST'), ('DIRECT');
 DECLARE @DiscountTypes TABLE (type NVARCHAR(100));
 INSERT INTO @DiscountTypes VALUES ('PERCENT'), ('FLAT');
 
@@ -383,6 +420,51 @@ VALUES
     (@OverlapSku, @OverlapRegion, @OverlapChannel, 'FLAT', 75.0, DATEADD(DAY, 1, @OverlapBase), DATEADD(DAY, 14, @OverlapBase));
 GO
 
+-- ============================================================================
+-- Step 8: Seeding staging product cost
+-- ============================================================================
+PRINT 'Step 8: Seeding staging product cost...';
+GO
+
+TRUNCATE TABLE pricing.stg_product_cost;
+GO
+
+-- Generate unit cost per SKU: 45-75% of its average staged list price,
+-- with a mid-period cost change for every third SKU
+DECLARE @BaseDate DATE = DATEADD(DAY, -120, CAST(GETDATE() AS DATE));
+DECLARE @ChangeDate DATE = DATEADD(DAY, -30, CAST(GETDATE() AS DATE));
+
+DECLARE @SkuCost TABLE (sku VARCHAR(255) PRIMARY KEY, sku_num INT, unit_cost DECIMAL(18,4));
+
+INSERT INTO @SkuCost (sku, sku_num, unit_cost)
+SELECT
+    sku,
+    ROW_NUMBER() OVER (ORDER BY sku),
+    CAST(AVG(price) * (45 + ABS(CHECKSUM(NEWID())) % 31) / 100.0 AS DECIMAL(18,4))
+FROM pricing.stg_price_history
+WHERE sku IN (SELECT sku FROM pricing.dim_product)
+    AND price >= 0
+GROUP BY sku;
+
+INSERT INTO pricing.stg_product_cost
+    (sku, unit_cost, effective_start, effective_end, source_system)
+SELECT sku, unit_cost, @BaseDate,
+       CASE WHEN sku_num % 3 = 0 THEN DATEADD(DAY, -1, @ChangeDate) END,
+       'COST_SYS'
+FROM @SkuCost
+UNION ALL
+SELECT sku, CAST(unit_cost * 1.08 AS DECIMAL(18,4)), @ChangeDate, NULL, 'COST_SYS'
+FROM @SkuCost
+WHERE sku_num % 3 = 0;
+
+-- Intentionally inject bad data: negative cost and unknown SKU
+INSERT INTO pricing.stg_product_cost
+    (sku, unit_cost, effective_start, effective_end, source_system)
+VALUES
+    ('SKU-10001', -5.0000, @ChangeDate, NULL, 'COST_SYS'),
+    ('SKU-99999', 12.5000, @BaseDate, NULL, 'COST_SYS');
+GO
+
 PRINT '';
 PRINT 'Seed data load complete.';
 GO
@@ -0,0 +1,29 @@
+USE PricingDWH;
+GO
+
+-- One row per day from 2000-01-01 through 2050-12-31; existing days are left alone
+DECLARE @from_date DATE = '2000-01-01';
+DECLARE @to_date DATE = '2050-12-31';
+
+INSERT INTO pricing.dim_calendar
+    (calendar_date, calendar_year, calendar_quarter, calendar_month, day_of_month,
+     day_of_week, iso_week, is_weekend, month_start_date)
+SELECT
+    d.calendar_date,
+    YEAR(d.calendar_date),
+    DATEPART(QUARTER, d.calendar_date),
+    MONTH(d.calendar_date),
+    DAY(d.calendar_date),
+    -- 1900-01-01 was a Monday, so this is independent of SET DATEFIRST
+    DATEDIFF(DAY, '19000101', d.calendar_date) % 7 + 1,
+    DATEPART(ISO_WEEK, d.calendar_date),
+    CASE WHEN DATEDIFF(DAY, '19000101', d.calendar_date) % 7 >= 5 THEN 1 ELSE 0 END,
+    DATEFROMPARTS(YEAR(d.calendar_date), MONTH(d.calendar_date), 1)
+FROM (
+    SELECT DATEADD(DAY, gs.value, @from_date) AS calendar_date
+    FROM GENERATE_SERIES(0, DATEDIFF(DAY, @from_date, @to_date)) gs
+) d
+WHERE NOT EXISTS (
+    SELECT 1 FROM pricing.dim_calendar c WHERE c.calendar_date = d.calendar_date
+);
+GO
@@ -0,0 +1,41 @@
+USE PricingDWH;
+GO
+
+TRUNCATE TABLE pricing.stg_product_cost;
+GO
+
+-- Generate unit cost per SKU: 45-75% of its average staged list price,
+-- with a mid-period cost change for every third SKU
+DECLARE @BaseDate DATE = DATEADD(DAY, -120, CAST(GETDATE() AS DATE));
+DECLARE @ChangeDate DATE = DATEADD(DAY, -30, CAST(GETDATE() AS DATE));
+
+DECLARE @SkuCost TABLE (sku VARCHAR(255) PRIMARY KEY, sku_num INT, unit_cost DECIMAL(18,4));
+
+INSERT INTO @SkuCost (sku, sku_num, unit_cost)
+SELECT
+    sku,
+    ROW_NUMBER() OVER (ORDER BY sku),
+    CAST(AVG(price) * (45 + ABS(CHECKSUM(NEWID())) % 31) / 100.0 AS DECIMAL(18,4))
+FROM pricing.stg_price_history
+WHERE sku IN (SELECT sku FROM pricing.dim_product)
+    AND price >= 0
+GROUP BY sku;
+
+INSERT INTO pricing.stg_product_cost
+    (sku, unit_cost, effective_start, effective_end, source_system)
+SELECT sku, unit_cost, @BaseDate,
+       CASE WHEN sku_num % 3 = 0 THEN DATEADD(DAY, -1, @ChangeDate) END,
+       'COST_SYS'
+FROM @SkuCost
+UNION ALL
+SELECT sku, CAST(unit_cost * 1.08 AS DECIMAL(18,4)), @ChangeDate, NULL, 'COST_SYS'
+FROM @SkuCost
+WHERE sku_num % 3 = 0;
+
+-- Intentionally inject bad data: negative cost and unknown SKU
+INSERT INTO pricing.stg_product_cost
+    (sku, unit_cost, effective_start, effective_end, source_system)
+VALUES
+    ('SKU-10001', -5.0000, @ChangeDate, NULL, 'COST_SYS'),
+    ('SKU-99999', 12.5000, @BaseDate, NULL, 'COST_SYS');
+GO
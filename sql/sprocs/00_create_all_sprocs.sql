@@ -8,6 +8,54 @@ GO
 :r sql/sprocs/sp_refresh_pricing_mart.sql
 GO
 
+-- Create/update sp_snapshot_query_plans
+:r sql/sprocs/sp_snapshot_query_plans.sql
+GO
+
+-- Create/update sp_get_price_as_of
+:r sql/sprocs/sp_get_price_as_of.sql
+GO
+
+-- Create/update sp_align_partitioned_table
+:r sql/sprocs/sp_align_partitioned_table.sql
+GO
+
+-- Create/update sp_maintain_partitions
+:r sql/sprocs/sp_maintain_partitions.sql
+GO
+
+-- Create/update sp_refresh_margin_impact
+:r sql/sprocs/sp_refresh_margin_impact.sql
+GO
+
+-- Create/update sp_get_net_price
+:r sql/sprocs/sp_get_net_price.sql
+GO
+
+-- Create/update sp_set_price_audit_mode
+:r sql/sprocs/sp_set_price_audit_mode.sql
+GO
+
+-- Create/update sp_get_price_overrides
+:r sql/sprocs/sp_get_price_overrides.sql
+GO
+
+-- Create/update sp_get_price_as_of_system_time
+:r sql/sprocs/sp_get_price_as_of_system_time.sql
+GO
+
+-- Create/update sp_get_price_changes
+:r sql/sprocs/sp_get_price_changes.sql
+GO
+
+-- Create/update sp_get_net_price_batch
+:r sql/sprocs/sp_get_net_price_batch.sql
+GO
+
+-- Create/update sp_get_price_as_of_batch
+:r sql/sprocs/sp_get_price_as_of_batch.sql
+GO
+
 PRINT 'Stored procedures created.';
 GO
 
@@ -0,0 +1,124 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Keeps pricing.<table> and pricing.<table>_archive switch-compatible on ps_pricing_month:
+-- 1. A table created before partitioning (clustered PK on the id alone) is moved onto the
+--    scheme: its nonclustered indexes are scripted, dropped and re-created aligned, and the
+--    PK becomes CLUSTERED (<partition column>, <id>)
+-- 2. The archive gets exactly the fact table's nonclustered indexes (SWITCH requires it)
+CREATE OR ALTER PROCEDURE pricing.sp_align_partitioned_table
+    @table_name SYSNAME,
+    @partition_column SYSNAME
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @Table NVARCHAR(300) = N'pricing.' + QUOTENAME(@table_name);
+    DECLARE @Archive NVARCHAR(300) = N'pricing.' + QUOTENAME(@table_name + N'_archive');
+    DECLARE @ObjectId INT = OBJECT_ID(@Table);
+    DECLARE @ArchiveId INT = OBJECT_ID(@Archive);
+    DECLARE @PkName SYSNAME;
+    DECLARE @PkColumns NVARCHAR(MAX);
+    DECLARE @Sql NVARCHAR(MAX);
+    DECLARE @Indexes TABLE (index_name SYSNAME, create_sql NVARCHAR(MAX));
+    DECLARE @Actions TABLE (action NVARCHAR(50), table_name SYSNAME, detail NVARCHAR(4000));
+
+    IF @ObjectId IS NULL OR @ArchiveId IS NULL
+    BEGIN
+        RAISERROR('pricing.%s or its _archive table does not exist. Run sql/ddl/01_schema.sql.', 16, 1, @table_name);
+        RETURN;
+    END
+
+    -- 1. Move a pre-partitioning table onto the scheme
+    IF NOT EXISTS (
+        SELECT 1
+        FROM sys.indexes i
+        INNER JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+        WHERE i.object_id = @ObjectId AND i.index_id <= 1
+    )
+    BEGIN
+        BEGIN TRY
+            BEGIN TRANSACTION;
+
+            INSERT INTO @Indexes (index_name, create_sql)
+            SELECT name, pricing.fn_partition_index_ddl(@ObjectId, index_id, @Table, @partition_column)
+            FROM sys.indexes
+            WHERE object_id = @ObjectId AND type IN (2, 6) AND is_primary_key = 0;
+
+            SELECT @Sql = STRING_AGG(CONVERT(NVARCHAR(MAX), N'DROP INDEX ' + QUOTENAME(index_name) + N' ON ' + @Table + N';'), NCHAR(10))
+            FROM @Indexes;
+            IF @Sql IS NOT NULL
+                EXEC sys.sp_executesql @Sql;
+
+            SELECT @PkName = name
+            FROM sys.key_constraints
+            WHERE parent_object_id = @ObjectId AND type = 'PK';
+
+            SELECT @PkColumns = STRING_AGG(CONVERT(NVARCHAR(MAX), QUOTENAME(c.name)), N', ')
+                WITHIN GROUP (ORDER BY ic.key_ordinal)
+            FROM sys.indexes i
+            INNER JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = @ObjectId AND i.is_primary_key = 1 AND c.name <> @partition_column;
+
+            SET @Sql = N'ALTER TABLE ' + @Table + N' DROP CONSTRAINT ' + QUOTENAME(@PkName) + N';'
+                + N' ALTER TABLE ' + @Table + N' ADD CONSTRAINT ' + QUOTENAME(@PkName)
+                + N' PRIMARY KEY CLUSTERED (' + QUOTENAME(@partition_column) + N', ' + @PkColumns + N')'
+                + N' ON ps_pricing_month (' + QUOTENAME(@partition_column) + N');';
+            EXEC sys.sp_executesql @Sql;
+
+            SET @Sql = NULL;
+            SELECT @Sql = STRING_AGG(create_sql, NCHAR(10)) FROM @Indexes;
+            IF @Sql IS NOT NULL
+                EXEC sys.sp_executesql @Sql;
+
+            COMMIT TRANSACTION;
+        END TRY
+        BEGIN CATCH
+            IF @@TRANCOUNT > 0
+                ROLLBACK TRANSACTION;
+
+            DECLARE @ErrorMsg NVARCHAR(4000) = ERROR_MESSAGE();
+            DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
+            DECLARE @ErrorState INT = ERROR_STATE();
+            RAISERROR(@ErrorMsg, @ErrorSeverity, @ErrorState);
+            RETURN;
+        END CATCH
+
+        INSERT INTO @Actions VALUES ('PARTITIONED', @table_name,
+            CONCAT('Clustered on ps_pricing_month(', @partition_column, '); ', (SELECT COUNT(*) FROM @Indexes), ' index(es) re-created aligned'));
+    END
+
+    -- 2. Archive index parity: drop extras, add missing
+    SET @Sql = NULL;
+    SELECT @Sql = STRING_AGG(CONVERT(NVARCHAR(MAX), N'DROP INDEX ' + QUOTENAME(a.name) + N' ON ' + @Archive + N';'), NCHAR(10))
+    FROM sys.indexes a
+    WHERE a.object_id = @ArchiveId AND a.type IN (2, 6)
+        AND NOT EXISTS (SELECT 1 FROM sys.indexes t WHERE t.object_id = @ObjectId AND t.name = a.name AND t.type = a.type);
+    IF @Sql IS NOT NULL
+    BEGIN
+        EXEC sys.sp_executesql @Sql;
+        INSERT INTO @Actions VALUES ('ARCHIVE_INDEX_DROPPED', @table_name + N'_archive', @Sql);
+    END
+
+    SET @Sql = NULL;
+    SELECT @Sql = STRING_AGG(pricing.fn_partition_index_ddl(@ObjectId, t.index_id, @Archive, @partition_column), NCHAR(10))
+    FROM sys.indexes t
+    WHERE t.object_id = @ObjectId AND t.type IN (2, 6)
+        AND NOT EXISTS (SELECT 1 FROM sys.indexes a WHERE a.object_id = @ArchiveId AND a.name = t.name AND a.type = t.type);
+    IF @Sql IS NOT NULL
+    BEGIN
+        EXEC sys.sp_executesql @Sql;
+        INSERT INTO @Actions VALUES ('ARCHIVE_INDEX_CREATED', @table_name + N'_archive', @Sql);
+    END
+
+    SELECT action, table_name, detail FROM @Actions;
+END;
+GO
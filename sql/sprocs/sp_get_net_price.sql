@@ -0,0 +1,64 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- List price in effect for one series on a date (same rule as sp_get_price_as_of)
+-- plus the winning active discount and the resulting net price.
+-- Winning discount: highest discount_value, then earliest start_date, then lowest
+-- discount_event_id - the vw_pricing_bi_dataset ordering made deterministic.
+CREATE OR ALTER PROCEDURE pricing.sp_get_net_price
+    @sku VARCHAR(255),
+    @region_code VARCHAR(10),
+    @channel_code VARCHAR(10),
+    @as_of_date DATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT
+        p.sku,
+        p.region_code,
+        p.channel_code,
+        @as_of_date AS as_of_date,
+        p.price AS list_price,
+        p.currency,
+        d.discount_event_id,
+        d.discount_type,
+        d.discount_value,
+        pricing.fn_net_price(p.price, d.discount_type, d.discount_value) AS net_price
+    FROM (
+        SELECT TOP (1)
+            sku,
+            region_code,
+            channel_code,
+            price,
+            currency
+        FROM pricing.fact_price_history
+        WHERE sku = @sku
+            AND region_code = @region_code
+            AND channel_code = @channel_code
+            AND effective_start <= @as_of_date
+            AND (effective_end IS NULL OR effective_end >= @as_of_date)
+        ORDER BY effective_start DESC, price_hist_id DESC
+    ) p
+    OUTER APPLY (
+        SELECT TOP (1)
+            de.discount_event_id,
+            de.discount_type,
+            de.discount_value
+        FROM pricing.fact_discount_events de
+        WHERE de.sku = p.sku
+            AND de.region_code = p.region_code
+            AND de.channel_code = p.channel_code
+            AND de.start_date <= @as_of_date
+            AND de.end_date >= @as_of_date
+        ORDER BY de.discount_value DESC, de.start_date ASC, de.discount_event_id ASC
+    ) d;
+END;
+GO
@@ -0,0 +1,70 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- sp_get_net_price for many (sku, region_code, channel_code, as_of_date) items in one
+-- set-based call. @items is a JSON array of [sku, region_code, channel_code, "YYYY-MM-DD"]
+-- arrays; item_index is the item's position in it. Items with no list price in effect
+-- return no row. Same list price and winning discount rules as sp_get_net_price.
+CREATE OR ALTER PROCEDURE pricing.sp_get_net_price_batch
+    @items NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT
+        CAST(j.[key] AS INT) AS item_index,
+        p.sku,
+        p.region_code,
+        p.channel_code,
+        i.as_of_date,
+        p.price AS list_price,
+        p.currency,
+        d.discount_event_id,
+        d.discount_type,
+        d.discount_value,
+        pricing.fn_net_price(p.price, d.discount_type, d.discount_value) AS net_price
+    FROM OPENJSON(@items) j
+    CROSS APPLY OPENJSON(j.[value]) WITH (
+        sku VARCHAR(255) '$[0]',
+        region_code VARCHAR(10) '$[1]',
+        channel_code VARCHAR(10) '$[2]',
+        as_of_date DATE '$[3]'
+    ) i
+    CROSS APPLY (
+        SELECT TOP (1)
+            ph.sku,
+            ph.region_code,
+            ph.channel_code,
+            ph.price,
+            ph.currency
+        FROM pricing.fact_price_history ph
+        WHERE ph.sku = i.sku
+            AND ph.region_code = i.region_code
+            AND ph.channel_code = i.channel_code
+            AND ph.effective_start <= i.as_of_date
+            AND (ph.effective_end IS NULL OR ph.effective_end >= i.as_of_date)
+        ORDER BY ph.effective_start DESC, ph.price_hist_id DESC
+    ) p
+    OUTER APPLY (
+        SELECT TOP (1)
+            de.discount_event_id,
+            de.discount_type,
+            de.discount_value
+        FROM pricing.fact_discount_events de
+        WHERE de.sku = p.sku
+            AND de.region_code = p.region_code
+            AND de.channel_code = p.channel_code
+            AND de.start_date <= i.as_of_date
+            AND de.end_date >= i.as_of_date
+        ORDER BY de.discount_value DESC, de.start_date ASC, de.discount_event_id ASC
+    ) d
+    ORDER BY item_index;
+END;
+GO
@@ -0,0 +1,40 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Effective price for one series on a date.
+-- Seeks IX_fact_price_history_as_of backwards from @as_of_date; the latest
+-- interval that started on or before the date and has not ended wins.
+CREATE OR ALTER PROCEDURE pricing.sp_get_price_as_of
+    @sku VARCHAR(255),
+    @region_code VARCHAR(10),
+    @channel_code VARCHAR(10),
+    @as_of_date DATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT TOP (1)
+        sku,
+        region_code,
+        channel_code,
+        @as_of_date AS as_of_date,
+        price,
+        currency,
+        effective_start,
+        effective_end
+    FROM pricing.fact_price_history
+    WHERE sku = @sku
+        AND region_code = @region_code
+        AND channel_code = @channel_code
+        AND effective_start <= @as_of_date
+        AND (effective_end IS NULL OR effective_end >= @as_of_date)
+    ORDER BY effective_start DESC, price_hist_id DESC;
+END;
+GO
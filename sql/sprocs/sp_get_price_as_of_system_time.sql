@@ -0,0 +1,58 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Effective price for one series on @as_of_date, as fact_price_history stood at @system_time (UTC).
+-- Same ordering as pricing.sp_get_price_as_of. Requires TEMPORAL audit mode
+-- (pricing.sp_set_price_audit_mode); FOR SYSTEM_TIME AS OF reads the current table through
+-- IX_fact_price_history_as_of and the versions table through IX_fact_price_history_versions_sku_valid_to.
+CREATE OR ALTER PROCEDURE pricing.sp_get_price_as_of_system_time
+    @sku VARCHAR(255),
+    @region_code VARCHAR(10),
+    @channel_code VARCHAR(10),
+    @as_of_date DATE,
+    @system_time DATETIME2
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.tables
+        WHERE object_id = OBJECT_ID(N'pricing.fact_price_history') AND temporal_type = 2
+    )
+    BEGIN
+        RAISERROR('pricing.fact_price_history is not system-versioned. Run pricing.sp_set_price_audit_mode ''TEMPORAL''.', 16, 1);
+        RETURN;
+    END
+
+    -- Dynamic: FOR SYSTEM_TIME does not compile against a non-temporal table
+    EXEC sys.sp_executesql N'
+        SELECT TOP (1)
+            sku,
+            region_code,
+            channel_code,
+            @as_of_date AS as_of_date,
+            price,
+            currency,
+            effective_start,
+            effective_end,
+            @system_time AS system_time
+        FROM pricing.fact_price_history FOR SYSTEM_TIME AS OF @system_time
+        WHERE sku = @sku
+            AND region_code = @region_code
+            AND channel_code = @channel_code
+            AND effective_start <= @as_of_date
+            AND (effective_end IS NULL OR effective_end >= @as_of_date)
+        ORDER BY effective_start DESC, price_hist_id DESC;',
+        N'@sku VARCHAR(255), @region_code VARCHAR(10), @channel_code VARCHAR(10),
+          @as_of_date DATE, @system_time DATETIME2',
+        @sku = @sku, @region_code = @region_code, @channel_code = @channel_code,
+        @as_of_date = @as_of_date, @system_time = @system_time;
+END;
+GO
@@ -0,0 +1,59 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Change feed page: pricing.etl_change_log rows from SUCCESS runs after @since_run_id,
+-- in change_id order, starting after @after_change_id (the cursor of the previous page).
+-- sp_refresh_pricing_mart holds the 'pricing_refresh' application lock for its whole
+-- transaction, so refreshes commit one after another, change_id order is run order and
+-- a cursor stays valid across later runs.
+-- First page (@after_change_id NULL): one seek on IX_etl_change_log_run_id finds where
+-- the first later run starts; every page is then a range seek on the clustered key.
+CREATE OR ALTER PROCEDURE pricing.sp_get_price_changes
+    @since_run_id BIGINT,
+    @after_change_id BIGINT = NULL,
+    @limit INT = 1000
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @after_change_id IS NULL
+    BEGIN
+        SELECT TOP (1) @after_change_id = change_id - 1
+        FROM pricing.etl_change_log
+        WHERE run_id > @since_run_id
+        ORDER BY run_id, change_id;
+        -- Still NULL when no later run has changes: the page below is empty
+    END
+
+    SELECT TOP (@limit)
+        cl.change_id,
+        cl.run_id,
+        cl.entity,
+        cl.change_type,
+        cl.source_id,
+        cl.sku,
+        cl.region_code,
+        cl.channel_code,
+        cl.price,
+        cl.currency,
+        cl.discount_type,
+        cl.discount_value,
+        cl.start_date,
+        cl.end_date,
+        cl.previous_end_date
+    FROM pricing.etl_change_log cl
+    INNER JOIN pricing.etl_run_history r
+        ON r.run_id = cl.run_id
+        AND r.status = 'SUCCESS'
+    WHERE cl.change_id > @after_change_id
+        AND cl.run_id > @since_run_id
+    ORDER BY cl.change_id;
+END;
+GO
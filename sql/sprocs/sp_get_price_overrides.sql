@@ -0,0 +1,97 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Manual price changes for one SKU in [@from_time, @to_time) (UTC), newest first.
+-- Reads whichever audit pricing.sp_set_price_audit_mode has switched on:
+-- TEMPORAL - a version in pricing.fact_price_history_versions whose successor (same
+--            price_hist_id, valid_from = its valid_to) is a current-price row with a different
+--            price. ETL updates only move effective_end, so they never qualify.
+--            Seeks IX_fact_price_history_versions_sku_valid_to; changed_by is not recorded.
+-- TRIGGER  - pricing.price_override_audit, seeking IX_price_override_audit_sku_changed_at
+CREATE OR ALTER PROCEDURE pricing.sp_get_price_overrides
+    @sku VARCHAR(255),
+    @from_time DATETIME2,
+    @to_time DATETIME2,
+    @region_code VARCHAR(10) = NULL,
+    @channel_code VARCHAR(10) = NULL,
+    @limit INT = 100
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF EXISTS (
+        SELECT 1 FROM sys.tables
+        WHERE object_id = OBJECT_ID(N'pricing.fact_price_history') AND temporal_type = 2
+    )
+    BEGIN
+        -- Dynamic: the versions table and hidden period columns only exist in TEMPORAL mode
+        EXEC sys.sp_executesql N'
+            SELECT TOP (@limit)
+                h.sku,
+                h.region_code,
+                h.channel_code,
+                h.price_hist_id,
+                h.price AS old_price,
+                n.price AS new_price,
+                CAST(NULL AS NVARCHAR(256)) AS changed_by,
+                h.valid_to AS changed_at,
+                CAST(NULL AS NVARCHAR(4000)) AS reason,
+                ''TEMPORAL'' AS audit_source
+            FROM pricing.fact_price_history_versions h
+            CROSS APPLY (
+                SELECT TOP (1) v.price, v.effective_end
+                FROM (
+                    SELECT c.price, c.effective_end
+                    FROM pricing.fact_price_history c
+                    WHERE c.effective_start = h.effective_start
+                        AND c.price_hist_id = h.price_hist_id
+                        AND c.valid_from = h.valid_to
+                    UNION ALL
+                    SELECT hv.price, hv.effective_end
+                    FROM pricing.fact_price_history_versions hv
+                    WHERE hv.price_hist_id = h.price_hist_id
+                        AND hv.valid_from = h.valid_to
+                ) v
+            ) n
+            WHERE h.sku = @sku
+                AND h.valid_to >= @from_time
+                AND h.valid_to < @to_time
+                AND (@region_code IS NULL OR h.region_code = @region_code)
+                AND (@channel_code IS NULL OR h.channel_code = @channel_code)
+                AND n.effective_end IS NULL
+                AND n.price <> h.price
+            ORDER BY h.valid_to DESC, h.price_hist_id DESC;',
+            N'@sku VARCHAR(255), @from_time DATETIME2, @to_time DATETIME2,
+              @region_code VARCHAR(10), @channel_code VARCHAR(10), @limit INT',
+            @sku = @sku, @from_time = @from_time, @to_time = @to_time,
+            @region_code = @region_code, @channel_code = @channel_code, @limit = @limit;
+        RETURN;
+    END
+
+    SELECT TOP (@limit)
+        sku,
+        region_code,
+        channel_code,
+        CAST(NULL AS BIGINT) AS price_hist_id,
+        old_price,
+        new_price,
+        changed_by,
+        changed_at,
+        reason,
+        'TRIGGER' AS audit_source
+    FROM pricing.price_override_audit
+    WHERE sku = @sku
+        AND changed_at >= @from_time
+        AND changed_at < @to_time
+        AND (@region_code IS NULL OR region_code = @region_code)
+        AND (@channel_code IS NULL OR channel_code = @channel_code)
+    ORDER BY changed_at DESC, audit_id DESC;
+END;
+GO
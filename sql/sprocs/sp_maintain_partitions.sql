@@ -0,0 +1,217 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Sliding-window maintenance for the monthly partitions of fact_sales (sale_date)
+-- and fact_price_history (effective_start):
+-- 1. Align tables/archives (pricing.sp_align_partitioned_table)
+-- 2. Pre-create boundaries through @future_months ahead (splits of the empty tail: metadata-only)
+-- 3. With @retention_months, switch partitions older than the window into the _archive tables.
+--    Price history partitions still holding a price in effect on/after the cutoff are kept,
+--    and price history is not switched at all once it has system-time period columns.
+-- 4. Rebuild indexes only for the last @hot_months partitions that are fragmented past
+--    @rebuild_frag_pct or have uncompressed columnstore delta rows
+-- Returns one row per action taken.
+CREATE OR ALTER PROCEDURE pricing.sp_maintain_partitions
+    @future_months INT = 3,
+    @retention_months INT = NULL,
+    @hot_months INT = 2,
+    @rebuild_frag_pct FLOAT = 30
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @ThisMonth DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+    DECLARE @Boundary DATE;
+    DECLARE @Cutoff DATE;
+    DECLARE @TableName SYSNAME;
+    DECLARE @PartitionColumn SYSNAME;
+    DECLARE @PartitionNumber INT;
+    DECLARE @Sql NVARCHAR(MAX);
+    DECLARE @Fragmentation FLOAT;
+    DECLARE @DeltaRows BIGINT;
+    DECLARE @WorkId INT;
+    DECLARE @Actions TABLE (
+        action_id INT IDENTITY(1,1),
+        action NVARCHAR(50),
+        table_name SYSNAME NULL,
+        partition_number INT NULL,
+        boundary DATE NULL,
+        detail NVARCHAR(4000) NULL
+    );
+    DECLARE @Work TABLE (
+        work_id INT IDENTITY(1,1),
+        table_name SYSNAME,
+        partition_column SYSNAME,
+        partition_number INT,
+        boundary DATE NULL
+    );
+    DECLARE @Tables TABLE (table_name SYSNAME, partition_column SYSNAME);
+    INSERT INTO @Tables VALUES (N'fact_sales', N'sale_date'), (N'fact_price_history', N'effective_start');
+
+    -- 1. Alignment
+    INSERT INTO @Actions (action, table_name, detail)
+    EXEC pricing.sp_align_partitioned_table N'fact_sales', N'sale_date';
+    INSERT INTO @Actions (action, table_name, detail)
+    EXEC pricing.sp_align_partitioned_table N'fact_price_history', N'effective_start';
+
+    -- 2. Future boundaries
+    SELECT @Boundary = CAST(MAX(prv.value) AS DATE)
+    FROM sys.partition_range_values prv
+    INNER JOIN sys.partition_functions pf ON pf.function_id = prv.function_id
+    WHERE pf.name = 'pf_pricing_month';
+
+    IF @Boundary IS NULL
+    BEGIN
+        RAISERROR('Partition function pf_pricing_month not found. Run sql/ddl/01_schema.sql.', 16, 1);
+        RETURN;
+    END
+
+    WHILE @Boundary < DATEADD(MONTH, @future_months, @ThisMonth)
+    BEGIN
+        SET @Boundary = DATEADD(MONTH, 1, @Boundary);
+        ALTER PARTITION SCHEME ps_pricing_month NEXT USED [PRIMARY];
+        ALTER PARTITION FUNCTION pf_pricing_month() SPLIT RANGE (@Boundary);
+        INSERT INTO @Actions (action, boundary, detail) VALUES ('SPLIT', @Boundary, 'Pre-created month');
+    END
+
+    -- 3. Switch out expired months
+    IF @retention_months IS NOT NULL
+    BEGIN
+        SET @Cutoff = DATEADD(MONTH, -@retention_months, @ThisMonth);
+
+        -- RANGE RIGHT: partition N holds values below boundary N
+        INSERT INTO @Work (table_name, partition_column, partition_number, boundary)
+        SELECT t.table_name, t.partition_column, p.partition_number, CAST(prv.value AS DATE)
+        FROM @Tables t
+        INNER JOIN sys.partitions p
+            ON p.object_id = OBJECT_ID(N'pricing.' + t.table_name)
+            AND p.index_id = 1
+            AND p.rows > 0
+        INNER JOIN sys.partition_functions pf ON pf.name = 'pf_pricing_month'
+        INNER JOIN sys.partition_range_values prv
+            ON prv.function_id = pf.function_id
+            AND prv.boundary_id = p.partition_number
+        WHERE CAST(prv.value AS DATE) <= @Cutoff
+        ORDER BY t.table_name, p.partition_number;
+
+        SET @WorkId = 0;
+        WHILE 1 = 1
+        BEGIN
+            SELECT TOP (1)
+                @WorkId = work_id,
+                @TableName = table_name,
+                @PartitionNumber = partition_number,
+                @Boundary = boundary
+            FROM @Work
+            WHERE work_id > @WorkId
+            ORDER BY work_id;
+            IF @@ROWCOUNT = 0
+                BREAK;
+
+            -- SWITCH OUT of a system-versioned table is not allowed, and the hidden period
+            -- columns no longer match the archive; TEMPORAL mode ages out via history retention
+            IF @TableName = N'fact_price_history' AND COL_LENGTH('pricing.fact_price_history', 'valid_from') IS NOT NULL
+            BEGIN
+                INSERT INTO @Actions (action, table_name, partition_number, boundary, detail)
+                VALUES ('SKIPPED', @TableName, @PartitionNumber, @Boundary,
+                        'Has system-time period columns (pricing.sp_set_price_audit_mode); not switch-compatible with the archive');
+                CONTINUE;
+            END
+
+            IF @TableName = N'fact_price_history' AND EXISTS (
+                SELECT 1
+                FROM pricing.fact_price_history
+                WHERE $PARTITION.pf_pricing_month(effective_start) = @PartitionNumber
+                    AND (effective_end IS NULL OR effective_end >= @Cutoff)
+            )
+            BEGIN
+                INSERT INTO @Actions (action, table_name, partition_number, boundary, detail)
+                VALUES ('SKIPPED', @TableName, @PartitionNumber, @Boundary, 'Holds prices still in effect after the cutoff');
+                CONTINUE;
+            END
+
+            IF EXISTS (
+                SELECT 1 FROM sys.partitions
+                WHERE object_id = OBJECT_ID(N'pricing.' + @TableName + N'_archive')
+                    AND index_id = 1
+                    AND partition_number = @PartitionNumber
+                    AND rows > 0
+            )
+            BEGIN
+                INSERT INTO @Actions (action, table_name, partition_number, boundary, detail)
+                VALUES ('SKIPPED', @TableName, @PartitionNumber, @Boundary,
+                        'Archive partition already holds rows (late-arriving data); move manually');
+                CONTINUE;
+            END
+
+            SET @Sql = N'ALTER TABLE pricing.' + QUOTENAME(@TableName)
+                + N' SWITCH PARTITION ' + CAST(@PartitionNumber AS NVARCHAR(10))
+                + N' TO pricing.' + QUOTENAME(@TableName + N'_archive')
+                + N' PARTITION ' + CAST(@PartitionNumber AS NVARCHAR(10)) + N';';
+            EXEC sys.sp_executesql @Sql;
+            INSERT INTO @Actions (action, table_name, partition_number, boundary, detail)
+            VALUES ('SWITCHED_OUT', @TableName, @PartitionNumber, @Boundary, CONCAT('Rows before ', @Boundary, ' moved to archive'));
+        END
+    END
+
+    -- 4. Rebuild hot partitions that need it
+    DELETE FROM @Work;
+    INSERT INTO @Work (table_name, partition_column, partition_number)
+    SELECT t.table_name, t.partition_column, p.partition_number
+    FROM @Tables t
+    INNER JOIN sys.partitions p
+        ON p.object_id = OBJECT_ID(N'pricing.' + t.table_name)
+        AND p.index_id = 1
+        AND p.rows > 0
+    WHERE p.partition_number BETWEEN $PARTITION.pf_pricing_month(DATEADD(MONTH, 1 - @hot_months, @ThisMonth))
+                                 AND $PARTITION.pf_pricing_month(@ThisMonth)
+    ORDER BY t.table_name, p.partition_number;
+
+    SET @WorkId = 0;
+    WHILE 1 = 1
+    BEGIN
+        SELECT TOP (1)
+            @WorkId = work_id,
+            @TableName = table_name,
+            @PartitionNumber = partition_number
+        FROM @Work
+        WHERE work_id > @WorkId
+        ORDER BY work_id;
+        IF @@ROWCOUNT = 0
+            BREAK;
+
+        SELECT @Fragmentation = ISNULL(MAX(avg_fragmentation_in_percent), 0)
+        FROM sys.dm_db_index_physical_stats(
+            DB_ID(), OBJECT_ID(N'pricing.' + @TableName), NULL, @PartitionNumber, 'LIMITED')
+        WHERE index_type_desc IN ('CLUSTERED INDEX', 'NONCLUSTERED INDEX')
+            AND page_count >= 8;
+
+        SELECT @DeltaRows = ISNULL(SUM(total_rows), 0)
+        FROM sys.dm_db_column_store_row_group_physical_stats
+        WHERE object_id = OBJECT_ID(N'pricing.' + @TableName)
+            AND partition_number = @PartitionNumber
+            AND state_desc IN ('OPEN', 'CLOSED');
+
+        IF @Fragmentation >= @rebuild_frag_pct OR @DeltaRows > 0
+        BEGIN
+            SET @Sql = N'ALTER INDEX ALL ON pricing.' + QUOTENAME(@TableName)
+                + N' REBUILD PARTITION = ' + CAST(@PartitionNumber AS NVARCHAR(10)) + N';';
+            EXEC sys.sp_executesql @Sql;
+            INSERT INTO @Actions (action, table_name, partition_number, detail)
+            VALUES ('REBUILT', @TableName, @PartitionNumber,
+                    CONCAT('Fragmentation ', CAST(@Fragmentation AS DECIMAL(5,1)), '%, delta rows ', @DeltaRows));
+        END
+    END
+
+    SELECT action, table_name, partition_number, boundary, detail
+    FROM @Actions
+    ORDER BY action_id;
+END;
+GO
@@ -0,0 +1,265 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Maintain pricing.fact_margin_impact: one row per (sku, region_code, channel_code, as_of_date)
+-- over the last @history_days days, from the effective list price, the winning active discount
+-- (same ordering as sp_get_net_price and vw_pricing_bi_dataset) and the effective unit cost.
+-- Net price comes from pricing.fn_net_price.
+-- Incremental runs only recompute key-days covered by price, discount or cost rows whose
+-- row_version moved since the previous refresh, plus days that entered the window.
+-- Rows deleted or switched out of the source facts are not detected; run with @full = 1 after that.
+CREATE OR ALTER PROCEDURE pricing.sp_refresh_margin_impact
+    @etl_run_id BIGINT = NULL,
+    @history_days INT = 90,
+    @full BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @Today DATE = CAST(GETDATE() AS DATE);
+    DECLARE @WindowStart DATE;
+    DECLARE @LastRowVersion BINARY(8);
+    DECLARE @LastWindowStart DATE;
+    DECLARE @LastWindowEnd DATE;
+    DECLARE @HighRowVersion BINARY(8);
+    DECLARE @Mode VARCHAR(20) = 'INCREMENTAL';
+    DECLARE @KeyDaysAffected INT = 0;
+    DECLARE @RowsDeleted INT = 0;
+    DECLARE @RowsInserted INT = 0;
+
+    IF @history_days IS NULL OR @history_days < 1
+    BEGIN
+        RAISERROR('@history_days must be at least 1.', 16, 1);
+        RETURN;
+    END
+
+    SET @WindowStart = DATEADD(DAY, 1 - @history_days, @Today);
+
+    CREATE TABLE #calendar (
+        as_of_date DATE NOT NULL PRIMARY KEY
+    );
+
+    CREATE TABLE #ranges (
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        range_start DATE NOT NULL,
+        range_end DATE NOT NULL
+    );
+
+    CREATE TABLE #affected (
+        as_of_date DATE NOT NULL,
+        sku VARCHAR(255) NOT NULL,
+        region_code VARCHAR(10) NOT NULL,
+        channel_code VARCHAR(10) NOT NULL,
+        PRIMARY KEY (as_of_date, region_code, channel_code, sku)
+    );
+
+    INSERT INTO #calendar (as_of_date)
+    SELECT DATEADD(DAY, n, @WindowStart)
+    FROM (
+        SELECT TOP (@history_days) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS n
+        FROM sys.all_objects a
+        CROSS JOIN sys.all_objects b
+    ) numbers;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        -- Serialize refreshes on the watermark row
+        SELECT
+            @LastRowVersion = last_row_version,
+            @LastWindowStart = window_start,
+            @LastWindowEnd = window_end
+        FROM pricing.margin_refresh_state WITH (UPDLOCK, HOLDLOCK)
+        WHERE state_id = 1;
+
+        -- Rows below this are committed; the next refresh starts here
+        SET @HighRowVersion = MIN_ACTIVE_ROWVERSION();
+
+        IF @full = 1 OR @LastRowVersion IS NULL
+            SET @Mode = 'FULL';
+
+        IF @Mode = 'FULL'
+        BEGIN
+            INSERT INTO #ranges (sku, region_code, channel_code, range_start, range_end)
+            SELECT DISTINCT sku, region_code, channel_code, @WindowStart, @Today
+            FROM pricing.fact_price_history
+            WHERE effective_start <= @Today
+                AND (effective_end IS NULL OR effective_end >= @WindowStart);
+        END
+        ELSE
+        BEGIN
+            -- New or re-dated prices (the ETL overlap fix updates effective_end, which bumps row_version)
+            INSERT INTO #ranges (sku, region_code, channel_code, range_start, range_end)
+            SELECT sku, region_code, channel_code, effective_start, ISNULL(effective_end, @Today)
+            FROM pricing.fact_price_history
+            WHERE row_version >= @LastRowVersion
+                AND row_version < @HighRowVersion;
+
+            -- New discounts
+            INSERT INTO #ranges (sku, region_code, channel_code, range_start, range_end)
+            SELECT sku, region_code, channel_code, start_date, end_date
+            FROM pricing.fact_discount_events
+            WHERE row_version >= @LastRowVersion
+                AND row_version < @HighRowVersion;
+
+            -- New or re-dated costs apply to every region/channel priced for the SKU
+            INSERT INTO #ranges (sku, region_code, channel_code, range_start, range_end)
+            SELECT k.sku, k.region_code, k.channel_code, pc.effective_start, ISNULL(pc.effective_end, @Today)
+            FROM pricing.fact_product_cost pc
+            INNER JOIN (
+                SELECT DISTINCT sku, region_code, channel_code
+                FROM pricing.fact_price_history
+                WHERE effective_end IS NULL OR effective_end >= @WindowStart
+            ) k ON k.sku = pc.sku
+            WHERE pc.row_version >= @LastRowVersion
+                AND pc.row_version < @HighRowVersion;
+
+            -- Days that entered the window since the previous refresh
+            INSERT INTO #ranges (sku, region_code, channel_code, range_start, range_end)
+            SELECT k.sku, k.region_code, k.channel_code, nd.range_start, nd.range_end
+            FROM (
+                SELECT DISTINCT sku, region_code, channel_code
+                FROM pricing.fact_price_history
+                WHERE effective_start <= @Today
+                    AND (effective_end IS NULL OR effective_end >= @WindowStart)
+            ) k
+            CROSS JOIN (VALUES
+                (DATEADD(DAY, 1, @LastWindowEnd), @Today),
+                (@WindowStart, DATEADD(DAY, -1, @LastWindowStart))
+            ) nd (range_start, range_end)
+            WHERE nd.range_start <= nd.range_end;
+        END
+
+        -- Expand ranges to key-days inside the window
+        INSERT INTO #affected (as_of_date, sku, region_code, channel_code)
+        SELECT DISTINCT cal.as_of_date, r.sku, r.region_code, r.channel_code
+        FROM #ranges r
+        INNER JOIN #calendar cal
+            ON cal.as_of_date >= r.range_start
+            AND cal.as_of_date <= r.range_end;
+
+        SET @KeyDaysAffected = @@ROWCOUNT;
+
+        IF @Mode = 'FULL'
+        BEGIN
+            SELECT @RowsDeleted = COUNT(*) FROM pricing.fact_margin_impact;
+            TRUNCATE TABLE pricing.fact_margin_impact;
+        END
+        ELSE
+        BEGIN
+            DELETE m
+            FROM pricing.fact_margin_impact m
+            INNER JOIN #affected a
+                ON a.as_of_date = m.as_of_date
+                AND a.region_code = m.region_code
+                AND a.channel_code = m.channel_code
+                AND a.sku = m.sku;
+
+            SET @RowsDeleted = @@ROWCOUNT;
+
+            -- Slide the window
+            DELETE FROM pricing.fact_margin_impact
+            WHERE as_of_date < @WindowStart OR as_of_date > @Today;
+
+            SET @RowsDeleted = @RowsDeleted + @@ROWCOUNT;
+        END
+
+        -- Key-days without a price or a cost produce no row (unit_cost is NOT NULL)
+        INSERT INTO pricing.fact_margin_impact
+            (sku, region_code, channel_code, as_of_date, price, discount_type, discount_value,
+             net_price, unit_cost, margin_amount, margin_pct, etl_run_id)
+        SELECT
+            a.sku,
+            a.region_code,
+            a.channel_code,
+            a.as_of_date,
+            p.price,
+            d.discount_type,
+            d.discount_value,
+            n.net_price,
+            c.unit_cost,
+            n.net_price - c.unit_cost,
+            CASE
+                WHEN n.net_price > 0 AND ABS((n.net_price - c.unit_cost) * 100.0 / n.net_price) < 100000
+                THEN CAST((n.net_price - c.unit_cost) * 100.0 / n.net_price AS DECIMAL(9,4))
+            END,
+            @etl_run_id
+        FROM #affected a
+        CROSS APPLY (
+            SELECT TOP (1) ph.price
+            FROM pricing.fact_price_history ph
+            WHERE ph.sku = a.sku
+                AND ph.region_code = a.region_code
+                AND ph.channel_code = a.channel_code
+                AND ph.effective_start <= a.as_of_date
+                AND (ph.effective_end IS NULL OR ph.effective_end >= a.as_of_date)
+            ORDER BY ph.effective_start DESC, ph.created_at DESC, ph.price_hist_id DESC
+        ) p
+        CROSS APPLY (
+            SELECT TOP (1) pc.unit_cost
+            FROM pricing.fact_product_cost pc
+            WHERE pc.sku = a.sku
+                AND pc.effective_start <= a.as_of_date
+                AND (pc.effective_end IS NULL OR pc.effective_end >= a.as_of_date)
+            ORDER BY pc.effective_start DESC, pc.created_at DESC, pc.cost_id DESC
+        ) c
+        OUTER APPLY (
+            SELECT TOP (1) de.discount_type, de.discount_value
+            FROM pricing.fact_discount_events de
+            WHERE de.sku = a.sku
+                AND de.region_code = a.region_code
+                AND de.channel_code = a.channel_code
+                AND de.start_date <= a.as_of_date
+                AND de.end_date >= a.as_of_date
+            ORDER BY de.discount_value DESC, de.start_date ASC, de.discount_event_id ASC
+        ) d
+        CROSS APPLY (
+            SELECT pricing.fn_net_price(p.price, d.discount_type, d.discount_value) AS net_price
+        ) n;
+
+        SET @RowsInserted = @@ROWCOUNT;
+
+        UPDATE pricing.margin_refresh_state
+        SET last_row_version = @HighRowVersion,
+            window_start = @WindowStart,
+            window_end = @Today,
+            last_etl_run_id = @etl_run_id,
+            refreshed_at = SYSUTCDATETIME()
+        WHERE state_id = 1;
+
+        IF @@ROWCOUNT = 0
+            INSERT INTO pricing.margin_refresh_state
+                (state_id, last_row_version, window_start, window_end, last_etl_run_id)
+            VALUES (1, @HighRowVersion, @WindowStart, @Today, @etl_run_id);
+
+        COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+
+        DECLARE @ErrorMsg NVARCHAR(4000) = ERROR_MESSAGE();
+        DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
+        DECLARE @ErrorState INT = ERROR_STATE();
+        RAISERROR(@ErrorMsg, @ErrorSeverity, @ErrorState);
+        RETURN;
+    END CATCH
+
+    SELECT
+        @Mode AS mode,
+        @WindowStart AS window_start,
+        @Today AS window_end,
+        @KeyDaysAffected AS key_days_affected,
+        @RowsDeleted AS rows_deleted,
+        @RowsInserted AS rows_inserted;
+END;
+GO
@@ -25,10 +25,20 @@ BEGIN
     DECLARE @DiscountRowsInserted INT = 0;
     DECLARE @PriceHistoryRowsInserted INT = 0;
     DECLARE @PriceHistoryRowsRejected INT = 0;
+    DECLARE @CostRowsInserted INT = 0;
+    DECLARE @CostRowsRejected INT = 0;
+    DECLARE @LockResult INT;
     
     BEGIN TRY
         BEGIN TRANSACTION;
         
+        -- One refresh at a time (run_etl.py, the audit and manual EXECs can all start one),
+        -- held until commit: etl_change_log change_id order must be run commit order for
+        -- pricing.sp_get_price_changes cursors to stay valid
+        EXEC @LockResult = sp_getapplock @Resource = 'pricing_refresh', @LockMode = 'Exclusive', @LockOwner = 'Transaction';
+        IF @LockResult < 0
+            RAISERROR('Could not acquire the pricing_refresh application lock (sp_getapplock returned %d)', 16, 1, @LockResult);
+        
         -- Create ETL run record
         INSERT INTO pricing.etl_run_history 
             (pipeline_name, started_at, status, rows_loaded, rows_rejected)
@@ -69,6 +79,13 @@ BEGIN
         -- Load fact_discount_events from staging (deduplicated)
         INSERT INTO pricing.fact_discount_events
             (sku, region_code, channel_code, discount_type, discount_value, start_date, end_date)
+        OUTPUT
+            @RunId, 'discount', 'INSERTED', inserted.discount_event_id,
+            inserted.sku, inserted.region_code, inserted.channel_code,
+            inserted.discount_type, inserted.discount_value, inserted.start_date, inserted.end_date
+        INTO pricing.etl_change_log
+            (run_id, entity, change_type, source_id, sku, region_code, channel_code,
+             discount_type, discount_value, start_date, end_date)
         SELECT DISTINCT
             stg.sku,
             stg.region_code,
@@ -113,6 +130,13 @@ BEGIN
         -- Insert valid price history rows
         INSERT INTO pricing.fact_price_history
             (sku, region_code, channel_code, price, currency, effective_start, effective_end, source_system)
+        OUTPUT
+            @RunId, 'price', 'INSERTED', inserted.price_hist_id,
+            inserted.sku, inserted.region_code, inserted.channel_code,
+            inserted.price, inserted.currency, inserted.effective_start, inserted.effective_end
+        INTO pricing.etl_change_log
+            (run_id, entity, change_type, source_id, sku, region_code, channel_code,
+             price, currency, start_date, end_date)
         SELECT DISTINCT
             stg.sku,
             stg.region_code,
@@ -171,11 +195,84 @@ BEGIN
                 END
                 ELSE NULL
             END
+        -- Closed (or reopened) versions go to the change feed with their previous end date
+        OUTPUT
+            @RunId, 'price',
+            CASE WHEN inserted.effective_end IS NULL THEN 'REOPENED' ELSE 'END_DATED' END,
+            inserted.price_hist_id, inserted.sku, inserted.region_code, inserted.channel_code,
+            inserted.price, inserted.currency, inserted.effective_start, inserted.effective_end,
+            deleted.effective_end
+        INTO pricing.etl_change_log
+            (run_id, entity, change_type, source_id, sku, region_code, channel_code,
+             price, currency, start_date, end_date, previous_end_date)
         FROM pricing.fact_price_history fph
         INNER JOIN PriceHistoryOrdered pho ON fph.price_hist_id = pho.price_hist_id
         WHERE (pho.next_effective_start IS NOT NULL AND (fph.effective_end IS NULL OR fph.effective_end <> DATEADD(DAY, -1, pho.next_effective_start)))
             OR (pho.next_effective_start IS NULL AND fph.effective_end IS NOT NULL);
         
+        -- Load fact_product_cost from staging with validation (same rules as price history)
+        SELECT @CostRowsRejected = COUNT(*)
+        FROM pricing.stg_product_cost stg
+        WHERE stg.sku IS NULL
+            OR LTRIM(RTRIM(ISNULL(stg.sku, ''))) = ''
+            OR NOT EXISTS (SELECT 1 FROM pricing.dim_product dp WHERE dp.sku = stg.sku)
+            OR stg.unit_cost IS NULL
+            OR stg.unit_cost < 0
+            OR stg.effective_start IS NULL;
+        
+        SET @RowsRejected = @RowsRejected + @CostRowsRejected;
+        
+        INSERT INTO pricing.fact_product_cost
+            (sku, unit_cost, effective_start, effective_end, source_system)
+        SELECT DISTINCT
+            stg.sku,
+            stg.unit_cost,
+            stg.effective_start,
+            stg.effective_end,
+            stg.source_system
+        FROM pricing.stg_product_cost stg
+        WHERE stg.sku IS NOT NULL
+            AND LTRIM(RTRIM(stg.sku)) <> ''
+            AND EXISTS (SELECT 1 FROM pricing.dim_product dp WHERE dp.sku = stg.sku)
+            AND stg.unit_cost >= 0
+            AND stg.effective_start IS NOT NULL
+            AND NOT EXISTS (
+                SELECT 1
+                FROM pricing.fact_product_cost fact
+                WHERE fact.sku = stg.sku
+                    AND fact.unit_cost = stg.unit_cost
+                    AND fact.effective_start = stg.effective_start
+                    AND ISNULL(fact.effective_end, '9999-12-31') = ISNULL(stg.effective_end, '9999-12-31')
+            );
+        
+        SET @CostRowsInserted = @@ROWCOUNT;
+        SET @RowsLoaded = @RowsLoaded + @CostRowsInserted;
+        
+        -- Fix overlapping effective_end dates for product cost
+        WITH CostOrdered AS (
+            SELECT 
+                cost_id,
+                LEAD(effective_start) OVER (
+                    PARTITION BY sku
+                    ORDER BY effective_start, created_at, cost_id
+                ) AS next_effective_start
+            FROM pricing.fact_product_cost
+        )
+        UPDATE fpc
+        SET effective_end = CASE 
+                WHEN co.next_effective_start IS NOT NULL 
+                THEN CASE 
+                    WHEN DATEADD(DAY, -1, co.next_effective_start) < fpc.effective_start 
+                    THEN fpc.effective_start 
+                    ELSE DATEADD(DAY, -1, co.next_effective_start) 
+                END
+                ELSE NULL
+            END
+        FROM pricing.fact_product_cost fpc
+        INNER JOIN CostOrdered co ON fpc.cost_id = co.cost_id
+        WHERE (co.next_effective_start IS NOT NULL AND (fpc.effective_end IS NULL OR fpc.effective_end <> DATEADD(DAY, -1, co.next_effective_start)))
+            OR (co.next_effective_start IS NULL AND fpc.effective_end IS NOT NULL);
+        
         -- Update ETL run history with success
         UPDATE pricing.etl_run_history
         SET finished_at = SYSUTCDATETIME(),
@@ -0,0 +1,122 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Switch how changes to pricing.fact_price_history are audited:
+-- TRIGGER  - pricing.trg_log_price_override writes pricing.price_override_audit on UPDATE
+--            (skipped when SESSION_CONTEXT('is_etl') = 1)
+-- TEMPORAL - the table is system-versioned into pricing.fact_price_history_versions and the
+--            trigger is disabled. Prior row versions are kept by the engine with no trigger
+--            work, FOR SYSTEM_TIME AS OF queries become possible, and @history_retention_months
+--            lets SQL Server age out old versions.
+-- Period columns (valid_from/valid_to) are HIDDEN, so existing column lists are unaffected.
+-- Switching back to TRIGGER keeps the period columns and the versions table (as a plain table).
+-- Returns the resulting state.
+CREATE OR ALTER PROCEDURE pricing.sp_set_price_audit_mode
+    @mode VARCHAR(20),
+    @history_retention_months INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @ObjectId INT = OBJECT_ID(N'pricing.fact_price_history');
+    DECLARE @IsTemporal BIT;
+    DECLARE @Retention NVARCHAR(100) = N'';
+    DECLARE @Sql NVARCHAR(MAX);
+
+    SET @mode = UPPER(LTRIM(RTRIM(@mode)));
+    IF @mode IS NULL OR @mode NOT IN ('TRIGGER', 'TEMPORAL')
+    BEGIN
+        RAISERROR('@mode must be TRIGGER or TEMPORAL.', 16, 1);
+        RETURN;
+    END
+
+    IF @history_retention_months IS NOT NULL AND @history_retention_months < 1
+    BEGIN
+        RAISERROR('@history_retention_months must be at least 1.', 16, 1);
+        RETURN;
+    END
+
+    IF @history_retention_months IS NOT NULL
+        SET @Retention = N', HISTORY_RETENTION_PERIOD = ' + CAST(@history_retention_months AS NVARCHAR(10)) + N' MONTHS';
+
+    SELECT @IsTemporal = CASE WHEN temporal_type = 2 THEN 1 ELSE 0 END
+    FROM sys.tables
+    WHERE object_id = @ObjectId;
+
+    BEGIN TRY
+        IF @mode = 'TEMPORAL'
+        BEGIN
+            IF COL_LENGTH('pricing.fact_price_history', 'valid_from') IS NULL
+                EXEC sys.sp_executesql N'
+                    ALTER TABLE pricing.fact_price_history ADD
+                        valid_from DATETIME2 GENERATED ALWAYS AS ROW START HIDDEN NOT NULL
+                            CONSTRAINT DF_fact_price_history_valid_from DEFAULT SYSUTCDATETIME(),
+                        valid_to DATETIME2 GENERATED ALWAYS AS ROW END HIDDEN NOT NULL
+                            CONSTRAINT DF_fact_price_history_valid_to DEFAULT CONVERT(DATETIME2, ''9999-12-31 23:59:59.9999999''),
+                        PERIOD FOR SYSTEM_TIME (valid_from, valid_to);';
+
+            -- The versions table is created by SQL Server (clustered on valid_to, valid_from) on first use
+            IF @IsTemporal = 0
+                SET @Sql = N'ALTER TABLE pricing.fact_price_history SET (SYSTEM_VERSIONING = ON ('
+                    + N'HISTORY_TABLE = pricing.fact_price_history_versions, DATA_CONSISTENCY_CHECK = ON'
+                    + @Retention + N'));';
+            ELSE IF @history_retention_months IS NOT NULL
+                SET @Sql = N'ALTER TABLE pricing.fact_price_history SET (SYSTEM_VERSIONING = ON ('
+                    + STUFF(@Retention, 1, 2, N'') + N'));';
+            IF @Sql IS NOT NULL
+                EXEC sys.sp_executesql @Sql;
+
+            -- Overrides by sku + time window, and the AS OF branch over the versions table
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_price_history_versions_sku_valid_to' AND object_id = OBJECT_ID('pricing.fact_price_history_versions'))
+                EXEC sys.sp_executesql N'
+                    CREATE NONCLUSTERED INDEX IX_fact_price_history_versions_sku_valid_to
+                    ON pricing.fact_price_history_versions (sku, valid_to)
+                    INCLUDE (region_code, channel_code, price, currency, effective_start, effective_end, price_hist_id, valid_from);';
+
+            -- Finding the version that replaced a row (same price_hist_id, valid_from = its valid_to)
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_fact_price_history_versions_version' AND object_id = OBJECT_ID('pricing.fact_price_history_versions'))
+                EXEC sys.sp_executesql N'
+                    CREATE NONCLUSTERED INDEX IX_fact_price_history_versions_version
+                    ON pricing.fact_price_history_versions (price_hist_id, valid_from)
+                    INCLUDE (price, effective_end);';
+
+            IF OBJECT_ID('pricing.trg_log_price_override', 'TR') IS NOT NULL
+                DISABLE TRIGGER pricing.trg_log_price_override ON pricing.fact_price_history;
+        END
+        ELSE
+        BEGIN
+            IF @IsTemporal = 1
+                EXEC sys.sp_executesql N'ALTER TABLE pricing.fact_price_history SET (SYSTEM_VERSIONING = OFF);';
+
+            IF OBJECT_ID('pricing.trg_log_price_override', 'TR') IS NOT NULL
+                ENABLE TRIGGER pricing.trg_log_price_override ON pricing.fact_price_history;
+        END
+    END TRY
+    BEGIN CATCH
+        DECLARE @ErrorMsg NVARCHAR(4000) = ERROR_MESSAGE();
+        DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
+        DECLARE @ErrorState INT = ERROR_STATE();
+        RAISERROR(@ErrorMsg, @ErrorSeverity, @ErrorState);
+        RETURN;
+    END CATCH
+
+    SELECT
+        CASE WHEN t.temporal_type = 2 THEN 'TEMPORAL' ELSE 'TRIGGER' END AS mode,
+        OBJECT_SCHEMA_NAME(t.history_table_id) + '.' + OBJECT_NAME(t.history_table_id) AS history_table,
+        CASE WHEN t.history_retention_period = -1 OR t.history_retention_period IS NULL THEN NULL
+             ELSE CONCAT(t.history_retention_period, ' ', t.history_retention_period_unit_desc) END AS history_retention,
+        CAST(CASE WHEN tr.is_disabled = 0 THEN 1 ELSE 0 END AS BIT) AS trigger_enabled
+    FROM sys.tables t
+    LEFT JOIN sys.triggers tr
+        ON tr.parent_id = t.object_id
+        AND tr.name = 'trg_log_price_override'
+    WHERE t.object_id = @ObjectId;
+END;
+GO
@@ -0,0 +1,162 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Snapshot Query Store plans and runtime stats for the API sprocs and views.
+-- Stats are aggregated over the window since the previous capture (first capture: last 24h).
+-- Queries seen for the first time are added to pricing.query_plan_baseline;
+-- @accept_current = 1 re-baselines every watched query to this capture.
+CREATE OR ALTER PROCEDURE pricing.sp_snapshot_query_plans
+    @etl_run_id BIGINT = NULL,
+    @accept_current BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @CaptureId BIGINT;
+    DECLARE @WindowStart DATETIME2;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.database_query_store_options
+        WHERE actual_state_desc IN ('READ_WRITE', 'READ_ONLY')
+    )
+    BEGIN
+        RAISERROR('Query Store is not enabled on this database. Run sql/ddl/02_query_store.sql.', 16, 1);
+        RETURN;
+    END
+
+    -- Make recently executed plans visible to the DMVs
+    EXEC sys.sp_query_store_flush_db;
+
+    SELECT @WindowStart = ISNULL(MAX(captured_at), DATEADD(HOUR, -24, SYSUTCDATETIME()))
+    FROM pricing.query_plan_capture;
+
+    BEGIN TRY
+    BEGIN TRANSACTION;
+
+    INSERT INTO pricing.query_plan_capture (etl_run_id, captured_at, window_start)
+    VALUES (@etl_run_id, SYSUTCDATETIME(), @WindowStart);
+
+    SET @CaptureId = SCOPE_IDENTITY();
+
+    WITH Watched AS (
+        SELECT object_name, watched_object_id, text_pattern
+        FROM (VALUES
+            (N'sp_get_current_price', OBJECT_ID('pricing.sp_get_current_price'), NULL),
+            (N'sp_get_price_history', OBJECT_ID('pricing.sp_get_price_history'), NULL),
+            (N'sp_get_price_as_of', OBJECT_ID('pricing.sp_get_price_as_of'), NULL),
+            (N'sp_get_price_as_of_batch', OBJECT_ID('pricing.sp_get_price_as_of_batch'), NULL),
+            (N'sp_get_net_price', OBJECT_ID('pricing.sp_get_net_price'), NULL),
+            (N'sp_get_net_price_batch', OBJECT_ID('pricing.sp_get_net_price_batch'), NULL),
+            (N'sp_get_price_overrides', OBJECT_ID('pricing.sp_get_price_overrides'), NULL),
+            (N'sp_get_price_changes', OBJECT_ID('pricing.sp_get_price_changes'), NULL),
+            (N'vw_pricing_bi_dataset', NULL, N'%pricing.vw_pricing_bi_dataset%'),
+            (N'fn_pricing_bi_dataset', NULL, N'%pricing.fn_pricing_bi_dataset%'),
+            (N'vw_sales_daily', NULL, N'%pricing.vw_sales_daily%'),
+            (N'vw_discount_active', NULL, N'%pricing.vw_discount_active%')
+        ) w (object_name, watched_object_id, text_pattern)
+    ),
+    WatchedQueries AS (
+        SELECT w.object_name, q.query_id, q.query_hash
+        FROM sys.query_store_query q
+        INNER JOIN sys.query_store_query_text qt ON qt.query_text_id = q.query_text_id
+        INNER JOIN Watched w
+            ON (w.watched_object_id IS NOT NULL AND q.object_id = w.watched_object_id)
+            -- View usage comes from ad hoc API queries (object_id = 0); this excludes
+            -- module code such as this procedure, whose text mentions the view names
+            OR (w.text_pattern IS NOT NULL AND q.object_id = 0 AND qt.query_sql_text LIKE w.text_pattern)
+    ),
+    PlanStats AS (
+        SELECT
+            wq.object_name,
+            wq.query_hash,
+            p.query_plan_hash,
+            wq.query_id,
+            p.plan_id,
+            SUM(rs.count_executions) AS executions,
+            SUM(rs.avg_duration * rs.count_executions) / NULLIF(SUM(rs.count_executions), 0) / 1000.0 AS avg_duration_ms,
+            SUM(rs.avg_cpu_time * rs.count_executions) / NULLIF(SUM(rs.count_executions), 0) / 1000.0 AS avg_cpu_ms,
+            SUM(rs.avg_logical_io_reads * rs.count_executions) / NULLIF(SUM(rs.count_executions), 0) AS avg_logical_reads
+        FROM WatchedQueries wq
+        INNER JOIN sys.query_store_plan p ON p.query_id = wq.query_id
+        INNER JOIN sys.query_store_runtime_stats rs ON rs.plan_id = p.plan_id
+        WHERE rs.last_execution_time >= @WindowStart
+        GROUP BY wq.object_name, wq.query_hash, p.query_plan_hash, wq.query_id, p.plan_id
+    )
+    INSERT INTO pricing.query_plan_snapshot
+        (capture_id, object_name, query_hash, query_plan_hash, query_id, plan_id,
+         executions, avg_duration_ms, avg_cpu_ms, avg_logical_reads, is_dominant_plan)
+    SELECT
+        @CaptureId,
+        object_name,
+        query_hash,
+        query_plan_hash,
+        query_id,
+        plan_id,
+        executions,
+        ISNULL(avg_duration_ms, 0),
+        ISNULL(avg_cpu_ms, 0),
+        ISNULL(avg_logical_reads, 0),
+        CASE WHEN ROW_NUMBER() OVER (
+            PARTITION BY object_name, query_hash
+            ORDER BY executions DESC, plan_id DESC
+        ) = 1 THEN 1 ELSE 0 END
+    FROM PlanStats
+    WHERE executions > 0;
+
+    -- Re-baseline on request
+    IF @accept_current = 1
+    BEGIN
+        DELETE b
+        FROM pricing.query_plan_baseline b
+        INNER JOIN pricing.query_plan_snapshot s
+            ON s.object_name = b.object_name
+            AND s.query_hash = b.query_hash
+            AND s.capture_id = @CaptureId
+            AND s.is_dominant_plan = 1;
+    END
+
+    -- Seed baselines for queries seen for the first time
+    INSERT INTO pricing.query_plan_baseline
+        (object_name, query_hash, query_plan_hash, avg_duration_ms, avg_cpu_ms, avg_logical_reads, capture_id)
+    SELECT
+        s.object_name,
+        s.query_hash,
+        s.query_plan_hash,
+        s.avg_duration_ms,
+        s.avg_cpu_ms,
+        s.avg_logical_reads,
+        s.capture_id
+    FROM pricing.query_plan_snapshot s
+    WHERE s.capture_id = @CaptureId
+        AND s.is_dominant_plan = 1
+        AND NOT EXISTS (
+            SELECT 1 FROM pricing.query_plan_baseline b
+            WHERE b.object_name = s.object_name AND b.query_hash = s.query_hash
+        );
+
+    COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+
+        DECLARE @ErrorMsg NVARCHAR(4000) = ERROR_MESSAGE();
+        DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
+        DECLARE @ErrorState INT = ERROR_STATE();
+        RAISERROR(@ErrorMsg, @ErrorSeverity, @ErrorState);
+        RETURN;
+    END CATCH
+
+    SELECT
+        @CaptureId AS capture_id,
+        @WindowStart AS window_start,
+        (SELECT COUNT(*) FROM pricing.query_plan_snapshot WHERE capture_id = @CaptureId) AS plans_captured;
+END;
+GO
@@ -20,6 +20,10 @@ GO
 :r sql/views/vw_pricing_bi_dataset.sql
 GO
 
+-- Create/update vw_plan_regressions
+:r sql/views/vw_plan_regressions.sql
+GO
+
 PRINT 'Views created.';
 GO
 
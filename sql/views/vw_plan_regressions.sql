@@ -0,0 +1,46 @@
+USE PricingDWH;
+GO
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET ARITHABORT ON;
+GO
+
+-- Latest Query Store capture vs accepted baseline, per watched object/query.
+-- Thresholds are applied by the consumer (audit/audit_all.py).
+CREATE OR ALTER VIEW pricing.vw_plan_regressions
+AS
+WITH LatestCapture AS (
+    SELECT TOP (1) capture_id, etl_run_id, captured_at
+    FROM pricing.query_plan_capture
+    ORDER BY capture_id DESC
+)
+SELECT
+    lc.capture_id,
+    lc.etl_run_id,
+    lc.captured_at,
+    s.object_name,
+    s.query_hash,
+    s.query_id,
+    s.plan_id,
+    s.executions,
+    b.query_plan_hash AS baseline_plan_hash,
+    s.query_plan_hash AS current_plan_hash,
+    CASE WHEN s.query_plan_hash <> b.query_plan_hash THEN 1 ELSE 0 END AS plan_changed,
+    b.avg_duration_ms AS baseline_duration_ms,
+    s.avg_duration_ms AS current_duration_ms,
+    s.avg_duration_ms / NULLIF(b.avg_duration_ms, 0) AS duration_ratio,
+    b.avg_logical_reads AS baseline_logical_reads,
+    s.avg_logical_reads AS current_logical_reads,
+    s.avg_logical_reads / NULLIF(b.avg_logical_reads, 0) AS reads_ratio,
+    b.accepted_at AS baseline_accepted_at
+FROM LatestCapture lc
+INNER JOIN pricing.query_plan_snapshot s
+    ON s.capture_id = lc.capture_id
+    AND s.is_dominant_plan = 1
+INNER JOIN pricing.query_plan_baseline b
+    ON b.object_name = s.object_name
+    AND b.query_hash = s.query_hash;
+GO
@@ -96,7 +96,7 @@ DiscountAsOf AS (
         de.discount_value AS active_discount_value,
         ROW_NUMBER() OVER (
             PARTITION BY de.sku, de.region_code, de.channel_code, ds.as_of_date
-            ORDER BY de.discount_value DESC, de.start_date ASC
+            ORDER BY de.discount_value DESC, de.start_date ASC, de.discount_event_id ASC
         ) AS rn
     FROM DateSeries ds
     INNER JOIN pricing.fact_discount_events de
@@ -128,6 +128,7 @@ SELECT
     ISNULL(pa.currency, 'USD') AS currency,
     da.active_discount_type,
     da.active_discount_value,
+    pricing.fn_net_price(pa.current_price, da.active_discount_type, da.active_discount_value) AS net_price,
     ISNULL(sd.daily_sales_qty, 0) AS daily_sales_qty,
     ISNULL(sd.daily_net_sales, 0) AS daily_net_sales,
     CASE WHEN pa.current_price IS NULL THEN 1 ELSE 0 END AS dq_missing_price_flag
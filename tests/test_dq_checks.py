@@ -0,0 +1,31 @@
+"""
+Check selection for dq/checks.py tiers and budgets
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'dq'))
+
+from checks import CHECK_REGISTRY, select_checks
+
+CRITICAL = {c['name'] for c in CHECK_REGISTRY if c['severity'] == 'critical'}
+
+def names(entries):
+    return {entry['name'] for entry in entries}
+
+def test_fast_tier_with_zero_budget_runs_every_critical_check():
+    selected, skipped = select_checks('fast', 0, {})
+    assert 'Overlapping Effective Ranges' in names(selected)
+    assert names(selected) == CRITICAL
+    assert not CRITICAL & names(skipped)
+
+def test_deep_tier_skips_non_critical_checks_over_budget():
+    selected, skipped = select_checks('deep', 0, {})
+    assert names(selected) == CRITICAL
+    assert names(skipped) == {'Overlapping Active Discounts'}
+
+def test_unbounded_budget_runs_the_whole_tier():
+    selected, skipped = select_checks('deep', None, {})
+    assert names(selected) == CRITICAL | {'Overlapping Active Discounts'}
+    assert skipped == []